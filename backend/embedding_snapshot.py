@@ -0,0 +1,264 @@
+"""
+Memory-mapped embedding snapshots for fast worker startup
+
+Each Chroma collection gets three files in the Chroma directory:
+
+    <collection>.snapshot  header + float32 matrix + row norms + sorted ids
+    <collection>.journal   JSON lines of upserts written after the snapshot
+    <collection>.seq       last journal sequence number handed out
+
+The snapshot header records the sequence number it covers (its version). A
+worker maps the snapshot read-only, which costs the same regardless of how
+many vectors it holds, and replays only journal entries newer than that
+version. Journal and sequence files are only written under the Chroma write
+lock (see ``embedding_writer.interprocess_lock``).
+"""
+
+import json
+import os
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b'RPEMB\x00\x01\x00'
+# magic, version (journal seq covered), dimension, row count
+HEADER = struct.Struct('<8sQII')
+HEADER_SIZE = 64
+ID_DTYPE = np.dtype('S64')
+
+def snapshot_path(directory: str, collection: str) -> str:
+    return os.path.join(directory, f'{collection}.snapshot')
+
+def journal_path(directory: str, collection: str) -> str:
+    return os.path.join(directory, f'{collection}.journal')
+
+def _seq_path(directory: str, collection: str) -> str:
+    return os.path.join(directory, f'{collection}.seq')
+
+def read_header(path: str) -> Optional[Tuple[int, int, int]]:
+    """``(version, dim, count)`` of a snapshot file, or None if it is missing or invalid"""
+    try:
+        with open(path, 'rb') as snapshot_file:
+            magic, version, dim, count = HEADER.unpack(snapshot_file.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != SNAPSHOT_MAGIC:
+        return None
+    return version, dim, count
+
+def current_seq(directory: str, collection: str) -> int:
+    try:
+        with open(_seq_path(directory, collection)) as seq_file:
+            return int(seq_file.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def _replace_file(path: str, write):
+    """Write ``path`` through a temporary file so readers never see a partial file"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as tmp_file:
+        write(tmp_file)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, path)
+
+def append_journal(directory: str, collection: str,
+                   items: Iterable[Tuple[str, List[float]]]) -> int:
+    """Append upserts to the journal and return the last sequence number used
+    
+    Must be called while holding the Chroma write lock.
+    """
+    seq = current_seq(directory, collection)
+    lines = []
+    for doc_id, embedding in items:
+        seq += 1
+        lines.append(json.dumps({'seq': seq, 'id': doc_id, 'embedding': embedding}) + '\n')
+    
+    with open(journal_path(directory, collection), 'a') as journal_file:
+        journal_file.writelines(lines)
+    _replace_file(_seq_path(directory, collection), lambda f: f.write(str(seq).encode()))
+    return seq
+
+def read_journal(path: str, offset: int = 0, after_seq: int = 0):
+    """Journal entries newer than ``after_seq`` starting at byte ``offset``
+    
+    Returns ``(entries, new_offset)``. A trailing line still being written
+    is left for the next read.
+    """
+    entries = []
+    try:
+        with open(path, 'rb') as journal_file:
+            journal_file.seek(offset)
+            for line in journal_file:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                entry = json.loads(line)
+                if entry['seq'] > after_seq:
+                    entries.append(entry)
+    except FileNotFoundError:
+        pass
+    return entries, offset
+
+def write_snapshot(directory: str, collection: str, ids: List[str],
+                   vectors: np.ndarray, version: int):
+    """Write a snapshot of ``ids``/``vectors`` covering journal entries up to ``version``
+    
+    Rows are sorted by id so readers can look ids up with a binary search
+    instead of building an index at startup.
+    """
+    ids_array = np.array(ids, dtype=ID_DTYPE)
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+    order = np.argsort(ids_array, kind='stable')
+    ids_array, vectors = ids_array[order], vectors[order]
+    norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+    
+    def write(snapshot_file):
+        header = HEADER.pack(SNAPSHOT_MAGIC, version, vectors.shape[1], len(ids_array))
+        snapshot_file.write(header.ljust(HEADER_SIZE, b'\x00'))
+        snapshot_file.write(vectors.tobytes())
+        snapshot_file.write(norms.tobytes())
+        snapshot_file.write(ids_array.tobytes())
+    
+    _replace_file(snapshot_path(directory, collection), write)
+
+def reset_journal(directory: str, collection: str, version: int):
+    """Start a new, empty journal after a snapshot covering ``version``
+    
+    The journal is replaced (new inode) rather than truncated so readers can
+    tell that their byte offset no longer applies.
+    """
+    _replace_file(journal_path(directory, collection), lambda f: None)
+    _replace_file(_seq_path(directory, collection), lambda f: f.write(str(version).encode()))
+
+def compact(directory: str, collection: str):
+    """Fold the journal into a new snapshot. Must hold the Chroma write lock."""
+    vectors: Dict[str, np.ndarray] = {}
+    snapshot = EmbeddingSnapshot.open(directory, collection)
+    for row, doc_id in enumerate(snapshot.ids):
+        vectors[doc_id.decode()] = snapshot.matrix[row]
+    vectors.update(snapshot.overlay)
+    
+    version = max(snapshot.applied_seq, current_seq(directory, collection))
+    if vectors:
+        write_snapshot(directory, collection, list(vectors), np.stack(list(vectors.values())), version)
+    reset_journal(directory, collection, version)
+
+def pending_changes(directory: str, collection: str) -> int:
+    """Journal entries not yet folded into the snapshot"""
+    header = read_header(snapshot_path(directory, collection))
+    return current_seq(directory, collection) - (header[0] if header else 0)
+
+class EmbeddingSnapshot:
+    """Read-only view of a collection: mapped snapshot plus replayed journal"""
+    
+    def __init__(self, directory: str, collection: str):
+        self.directory = directory
+        self.collection = collection
+        self.version = 0
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.ids = np.zeros(0, dtype=ID_DTYPE)
+        # Journal upserts applied on top of the snapshot
+        self.overlay: Dict[str, np.ndarray] = {}
+        self.applied_seq = 0
+        self._journal_inode = None
+        self._journal_offset = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def open(cls, directory: str, collection: str) -> 'EmbeddingSnapshot':
+        snapshot = cls(directory, collection)
+        snapshot._map()
+        snapshot.refresh()
+        return snapshot
+    
+    def _map(self):
+        path = snapshot_path(self.directory, self.collection)
+        header = read_header(path)
+        if header is None:
+            return
+        
+        version, dim, count = header
+        matrix_bytes = count * dim * 4
+        if count:
+            self.matrix = np.memmap(path, dtype=np.float32, mode='r',
+                                    offset=HEADER_SIZE, shape=(count, dim))
+            self.norms = np.memmap(path, dtype=np.float32, mode='r',
+                                   offset=HEADER_SIZE + matrix_bytes, shape=(count,))
+            self.ids = np.memmap(path, dtype=ID_DTYPE, mode='r',
+                                 offset=HEADER_SIZE + matrix_bytes + count * 4, shape=(count,))
+        self.version = version
+        self.applied_seq = max(self.applied_seq, version)
+    
+    def refresh(self) -> int:
+        """Apply journal entries written since the last refresh; returns how many"""
+        with self._lock:
+            path = journal_path(self.directory, self.collection)
+            try:
+                inode = os.stat(path).st_ino
+            except FileNotFoundError:
+                return 0
+            
+            if inode != self._journal_inode:
+                # The journal was compacted into a newer snapshot
+                header = read_header(snapshot_path(self.directory, self.collection))
+                if header and header[0] > self.version:
+                    self.overlay = {}
+                    self._map()
+                self._journal_inode = inode
+                self._journal_offset = 0
+            
+            entries, self._journal_offset = read_journal(
+                path, self._journal_offset, after_seq=self.applied_seq
+            )
+            for entry in entries:
+                self.overlay[entry['id']] = np.asarray(entry['embedding'], dtype=np.float32)
+                self.applied_seq = entry['seq']
+            return len(entries)
+    
+    def __len__(self):
+        return len(self.ids) + sum(1 for doc_id in self.overlay if self._row(doc_id) is None)
+    
+    def _row(self, doc_id: str) -> Optional[int]:
+        key = doc_id.encode()
+        row = int(np.searchsorted(self.ids, key))
+        if row < len(self.ids) and self.ids[row] == key:
+            return row
+        return None
+    
+    def get(self, doc_id: str) -> Optional[np.ndarray]:
+        if doc_id in self.overlay:
+            return self.overlay[doc_id]
+        row = self._row(doc_id)
+        return None if row is None else np.asarray(self.matrix[row])
+    
+    def query(self, vector: np.ndarray, limit: int = 5) -> List[Tuple[str, float]]:
+        """Ids and cosine similarities of the ``limit`` nearest vectors"""
+        vector = np.asarray(vector, dtype=np.float32)
+        vector_norm = np.linalg.norm(vector)
+        if vector_norm == 0:
+            return []
+        
+        candidates = []
+        if len(self.ids):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = (self.matrix @ vector) / (self.norms * vector_norm)
+            scores = np.nan_to_num(scores, nan=0.0)
+            # Rows superseded by the journal are scored from the overlay instead
+            for doc_id in self.overlay:
+                row = self._row(doc_id)
+                if row is not None:
+                    scores[row] = -np.inf
+            top = np.argsort(-scores)[:limit]
+            candidates = [(self.ids[row].decode(), float(scores[row])) for row in top
+                          if np.isfinite(scores[row])]
+        
+        for doc_id, embedding in self.overlay.items():
+            norm = np.linalg.norm(embedding) * vector_norm
+            candidates.append((doc_id, float(embedding @ vector / norm) if norm else 0.0))
+        
+        candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+        return candidates[:limit]
@@ -0,0 +1,232 @@
+"""
+Batched, single-writer channel for ChromaDB upserts
+
+Request threads enqueue embeddings and return immediately. One daemon thread
+per process drains the queue and upserts in batches, and an exclusive file
+lock in the Chroma directory keeps several gunicorn workers from writing to
+the same PersistentClient files at the same time. Items of a failed upsert
+are retried with a later batch after an exponential backoff, up to
+``max_retries`` times; ``on_dropped`` is told about the ones given up on.
+"""
+
+import atexit
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from embedding_snapshot import append_journal, compact, pending_changes
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingUpsert:
+    collection: str
+    id: str
+    embedding: List[float]
+    metadata: Dict
+    attempts: int = 0
+
+
+@contextmanager
+def interprocess_lock(lock_path: str):
+    """Exclusive lock shared by every process using the same Chroma directory"""
+    if fcntl is None:
+        yield
+        return
+    
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class ChromaWriter:
+    """Queue of pending upserts flushed in batches by a single background thread"""
+    
+    def __init__(self, collections: Dict, lock_path: str,
+                 batch_size: int = 64, flush_interval: float = 2.0,
+                 journal_dir: Optional[str] = None, compact_after: int = 0,
+                 max_retries: int = 3, retry_backoff: float = 1.0,
+                 on_dropped: Optional[Callable[[str, List[PendingUpsert]], None]] = None):
+        self.collections = collections
+        self.lock_path = lock_path
+        # Written batches are also journaled for embedding_snapshot readers
+        self.journal_dir = journal_dir
+        self.compact_after = compact_after
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.on_dropped = on_dropped
+        # (due time, sequence, item) of failed upserts waiting for their retry;
+        # only the writer thread (or _drain once it has stopped) touches it
+        self._retries: List[Tuple[float, int, PendingUpsert]] = []
+        self._retry_sequence = itertools.count()
+        # PendingUpsert, a flush request (Event set once everything before it
+        # is written) or None to stop the writer thread
+        self._queue: "queue.Queue[Union[PendingUpsert, threading.Event, None]]" = queue.Queue()
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='chroma-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def enqueue(self, collection: str, id: str, embedding: List[float], metadata: Dict):
+        self._queue.put(PendingUpsert(collection, id, embedding, metadata))
+    
+    def _due_retries(self) -> List[PendingUpsert]:
+        now = time.monotonic()
+        due = []
+        while self._retries and self._retries[0][0] <= now:
+            due.append(heapq.heappop(self._retries)[2])
+        return due
+    
+    def _retry_wait(self) -> Optional[float]:
+        """Seconds until the next retry is due (None: wait for the queue alone)"""
+        if not self._retries:
+            return None
+        return max(0.0, self._retries[0][0] - time.monotonic())
+    
+    def _run(self):
+        while True:
+            batch = self._due_retries()
+            if not batch:
+                try:
+                    item = self._queue.get(timeout=self._retry_wait())
+                except queue.Empty:
+                    continue  # a retry is due
+                if item is None:
+                    return
+                if isinstance(item, threading.Event):
+                    item.set()
+                    continue
+                batch = [item]
+            
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(batch)
+                    return
+                if isinstance(item, threading.Event):
+                    # Everything queued before the flush request is in this batch
+                    self._write(batch)
+                    item.set()
+                    batch = []
+                    break
+                batch.append(item)
+            
+            if batch:
+                self._write(batch)
+    
+    def _write(self, batch: List[PendingUpsert]):
+        # Last write wins for an id queued more than once in the same batch
+        by_collection: Dict[str, Dict[str, PendingUpsert]] = {}
+        for item in batch:
+            by_collection.setdefault(item.collection, {})[item.id] = item
+        
+        with self._flush_lock, interprocess_lock(self.lock_path):
+            for name, items in by_collection.items():
+                try:
+                    self.collections[name].upsert(
+                        ids=list(items),
+                        embeddings=[item.embedding for item in items.values()],
+                        metadatas=[item.metadata for item in items.values()]
+                    )
+                except Exception as e:
+                    self._retry(name, items, e)
+                    continue
+                
+                if self.journal_dir:
+                    self._journal(name, items)
+    
+    def _retry(self, name: str, items: Dict[str, PendingUpsert], error: Exception):
+        """Schedule the items of a failed upsert again, dropping those out of retries"""
+        dropped = []
+        for item in items.values():
+            item.attempts += 1
+            if item.attempts <= self.max_retries:
+                due = time.monotonic() + self.retry_backoff * 2 ** (item.attempts - 1)
+                heapq.heappush(self._retries, (due, next(self._retry_sequence), item))
+            else:
+                dropped.append(item)
+        logger.error(
+            f"Failed to upsert {len(items)} embeddings into {name} ({len(items) - len(dropped)} queued again, "
+            f"{len(dropped)} dropped after {self.max_retries} retries): {str(error)}"
+        )
+        if dropped and self.on_dropped:
+            try:
+                self.on_dropped(name, dropped)
+            except Exception as e:
+                logger.error(f"on_dropped failed for {name}: {str(e)}")
+    
+    def _journal(self, name: str, items: Dict[str, PendingUpsert]):
+        try:
+            append_journal(self.journal_dir, name,
+                           [(doc_id, item.embedding) for doc_id, item in items.items()])
+            if self.compact_after and pending_changes(self.journal_dir, name) >= self.compact_after:
+                compact(self.journal_dir, name)
+        except Exception as e:
+            logger.error(f"Failed to journal embeddings for {name}: {str(e)}")
+    
+    def flush(self):
+        """Wait until everything queued so far is written (used at shutdown and by commands)
+        
+        The writer thread does the writing, including the batch it is
+        holding. Items that failed and are waiting for a retry are not
+        waited for.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(timeout=0.1):
+            if not self._thread.is_alive():
+                # Stopped by close(); write what is left from this thread
+                self._drain()
+                return
+    
+    def _drain(self):
+        """Write the queue from the calling thread once the writer thread has stopped
+        
+        Pending retries are tried straight away rather than after their backoff.
+        """
+        while True:
+            batch = [item for due, sequence, item in self._retries]
+            self._retries = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is not None:
+                    batch.append(item)
+            if not batch:
+                return
+            # Failures are scheduled again and picked up by the next pass
+            self._write(batch)
+    
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=self.flush_interval + 5)
+        if not self._thread.is_alive():
+            self._drain()
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
 
 
 class EvaluationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'evaluations'
+
+    def ready(self):
+        from . import score_stats
+
+        # Keep JobScoreStats in step with every evaluation write
+        evaluation = self.get_model('Evaluation')
+        post_init.connect(score_stats.remember_score, sender=evaluation)
+        post_save.connect(score_stats.update_stats_on_save, sender=evaluation)
+        pre_delete.connect(score_stats.collect_deleted_score, sender=evaluation)
+        post_delete.connect(score_stats.update_stats_on_delete, sender=evaluation)
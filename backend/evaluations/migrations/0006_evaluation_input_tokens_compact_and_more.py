@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0005_jobapplication'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluation',
+            name='input_tokens_compact',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='evaluation',
+            name='input_tokens_raw',
+            field=models.IntegerField(default=0),
+        ),
+    ]
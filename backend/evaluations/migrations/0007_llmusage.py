@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0006_evaluation_input_tokens_compact_and_more'),
+        ('jobs', '0004_jobdescription_parser_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(max_length=50)),
+                ('call_type', models.CharField(choices=[('chat', 'Chat Completion'), ('embedding', 'Embedding')], max_length=20)),
+                ('model', models.CharField(max_length=100)),
+                ('prompt_tokens', models.IntegerField(default=0)),
+                ('completion_tokens', models.IntegerField(default=0)),
+                ('cached_tokens', models.IntegerField(default=0)),
+                ('latency', models.FloatField(default=0.0)),
+                ('retries', models.IntegerField(default=0)),
+                ('estimated_cost', models.DecimalField(decimal_places=6, default=0, max_digits=12)),
+                ('succeeded', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('evaluation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='llm_usage', to='evaluations.evaluation')),
+                ('job_description', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_usage', to='jobs.jobdescription')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
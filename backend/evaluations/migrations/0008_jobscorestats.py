@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:37
+
+import django.db.models.deletion
+import evaluations.models
+from django.db import migrations, models
+
+
+def build_score_stats(apps, schema_editor):
+    # Same calculation as evaluations.score_stats.rebuild_score_stats, on the
+    # historical models
+    Evaluation = apps.get_model('evaluations', 'Evaluation')
+    JobScoreStats = apps.get_model('evaluations', 'JobScoreStats')
+
+    rebuilt = {}
+    for job_id, score in Evaluation.objects.values_list('job_description_id', 'overall_score').iterator():
+        stats = rebuilt.setdefault(job_id, JobScoreStats(job_description_id=job_id, histogram=[0] * 10))
+        stats.applicant_count += 1
+        stats.matched_count += score >= 50
+        stats.high_match_count += score >= 70
+        stats.histogram[min(max(score, 0) // 10, 9)] += 1
+        stats.score_sum += score
+        stats.max_score = max(stats.max_score, score)
+    JobScoreStats.objects.bulk_create(rebuilt.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0007_llmusage'),
+        ('jobs', '0005_jobdescription_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobScoreStats',
+            fields=[
+                ('job_description', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_stats', serialize=False, to='jobs.jobdescription')),
+                ('applicant_count', models.PositiveIntegerField(default=0)),
+                ('matched_count', models.PositiveIntegerField(default=0)),
+                ('high_match_count', models.PositiveIntegerField(default=0)),
+                ('histogram', models.JSONField(default=evaluations.models.empty_histogram)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('max_score', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_score_stats, migrations.RunPython.noop),
+    ]
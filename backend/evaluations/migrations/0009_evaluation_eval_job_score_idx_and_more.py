@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0008_jobscorestats'),
+        ('jobs', '0005_jobdescription_blob'),
+        ('resumes', '0010_resume_blob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evaluation',
+            index=models.Index(fields=['job_description', '-overall_score', '-id'], name='eval_job_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evaluation',
+            index=models.Index(fields=['-overall_score', '-id'], name='eval_score_idx'),
+        ),
+    ]
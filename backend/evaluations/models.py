@@ -79,6 +79,8 @@ class Evaluation(models.Model):
     
     # Processing metadata
     processing_time = models.FloatField(default=0.0)  # in seconds
+    input_tokens_raw = models.IntegerField(default=0)  # estimated tokens of the uncompacted resume + job text
+    input_tokens_compact = models.IntegerField(default=0)  # estimated tokens actually sent after compaction
     llm_processing_successful = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -89,6 +91,12 @@ class Evaluation(models.Model):
     class Meta:
         unique_together = ['resume', 'job_description']
         ordering = ['-overall_score', '-created_at']
+        indexes = [
+            # Candidate ranking and export for one job, read in score order
+            models.Index(fields=['job_description', '-overall_score', '-id'], name='eval_job_score_idx'),
+            # Evaluation list ordering and the score-threshold counters
+            models.Index(fields=['-overall_score', '-id'], name='eval_score_idx'),
+        ]
 
     @property
     def recommendation_color(self):
@@ -101,6 +109,45 @@ class Evaluation(models.Model):
         }
         return color_map.get(self.recommendation, 'default')
 
+SCORE_BUCKETS = 10  # score histogram buckets of 10 points; 100 falls in the last one
+
+def empty_histogram():
+    return [0] * SCORE_BUCKETS
+
+class JobScoreStats(models.Model):
+    """Running score statistics for one job, kept in step with its evaluations by evaluations.score_stats"""
+    job_description = models.OneToOneField(
+        JobDescription,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_stats'
+    )
+    applicant_count = models.PositiveIntegerField(default=0)
+    matched_count = models.PositiveIntegerField(default=0)  # overall_score >= MATCH_SCORE_THRESHOLD
+    high_match_count = models.PositiveIntegerField(default=0)  # overall_score >= HIGH_MATCH_SCORE_THRESHOLD
+    histogram = models.JSONField(default=empty_histogram)  # evaluation count per score bucket
+    score_sum = models.BigIntegerField(default=0)
+    max_score = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.job_description_id} - {self.applicant_count} applicants"
+
+    @property
+    def mean_score(self):
+        if not self.applicant_count:
+            return 0.0
+        return round(self.score_sum / self.applicant_count, 2)
+
+    def percentile(self, score):
+        """Share of applicants (0-100) scoring below ``score``, interpolated within its bucket"""
+        if not self.applicant_count:
+            return 0.0
+        bucket = min(max(score, 0) // 10, SCORE_BUCKETS - 1)
+        below = sum(self.histogram[:bucket])
+        within = (min(max(score, 0), 100) - bucket * 10) / 10
+        return round((below + self.histogram[bucket] * within) / self.applicant_count * 100, 1)
+
 class EvaluationLog(models.Model):
     """Track evaluation history and debugging"""
     evaluation = models.ForeignKey(Evaluation, on_delete=models.CASCADE)
@@ -111,4 +158,37 @@ class EvaluationLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.evaluation.id} - {self.step} - {self.status}"
\ No newline at end of file
+        return f"{self.evaluation.id} - {self.step} - {self.status}"
+
+class LLMUsage(models.Model):
+    """Structured token, cost and latency record for one LLM or embedding call"""
+    CALL_TYPE_CHOICES = [
+        ('chat', 'Chat Completion'),
+        ('embedding', 'Embedding'),
+    ]
+    
+    evaluation = models.ForeignKey(Evaluation, on_delete=models.CASCADE, related_name='llm_usage')
+    job_description = models.ForeignKey(
+        JobDescription,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='llm_usage'
+    )
+    operation = models.CharField(max_length=50)  # analyze_resume, extract_skills, embedding
+    call_type = models.CharField(max_length=20, choices=CALL_TYPE_CHOICES)
+    model = models.CharField(max_length=100)
+    prompt_tokens = models.IntegerField(default=0)
+    completion_tokens = models.IntegerField(default=0)
+    cached_tokens = models.IntegerField(default=0)
+    latency = models.FloatField(default=0.0)  # in seconds, including retries
+    retries = models.IntegerField(default=0)
+    estimated_cost = models.DecimalField(max_digits=12, decimal_places=6, default=0)  # USD
+    succeeded = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.evaluation_id} - {self.operation} - {self.model}"
+
+    class Meta:
+        ordering = ['-created_at']
@@ -0,0 +1,212 @@
+# evaluations/prompt_compaction.py
+"""
+Build compact, section-aware LLM inputs from parsed resumes and job descriptions
+"""
+
+import re
+from dataclasses import dataclass
+
+from resumes.utils import segment_resume
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Resume sections sent to the LLM, in prompt order. The ``header`` section
+# (name, email, phone, links) is never sent.
+RESUME_PROMPT_SECTIONS = [
+    ('summary', 'Summary'),
+    ('experience', 'Experience'),
+    ('projects', 'Projects'),
+    ('education', 'Education'),
+    ('skills', 'Skills'),
+    ('certifications', 'Certifications'),
+]
+
+CONTACT_PATTERN = re.compile(
+    r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}'   # email
+    r'|(?:https?://|www\.)\S+'                          # links
+    r'|\b(?:linkedin|github)\.com/\S*',
+    re.IGNORECASE
+)
+
+PHONE_PATTERN = re.compile(r'\+?\(?\d[\d \t().-]{7,}\d')
+YEAR_RANGE_PATTERN = re.compile(r'(?:19|20)\d\d\s*[-–]\s*(?:19|20)\d\d')
+
+BOILERPLATE_PATTERN = re.compile(
+    r'^(?:references? (?:are )?available(?: up)?on request'
+    r'|declaration'
+    r'|i hereby declare\b.*'
+    r'|page \d+(?: of \d+)?'
+    r'|curriculum vitae|resume'
+    r'|(?:we are )?(?:an )?equal opportunity employer\b.*'
+    r'|job description)\.?$',
+    re.IGNORECASE
+)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def _strip_phone(match):
+    """Drop phone numbers but keep date ranges such as '2019 - 2023'"""
+    candidate = match.group()
+    digits = sum(char.isdigit() for char in candidate)
+    if 10 <= digits <= 15 and not YEAR_RANGE_PATTERN.search(candidate):
+        return ''
+    return candidate
+
+
+_encoding = None
+
+
+def estimate_tokens(text):
+    """Count tokens with tiktoken when available, otherwise ~4 characters per token"""
+    global _encoding
+
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding('o200k_base')
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def compact_lines(text, seen=None):
+    """Collapse whitespace and drop contact details, boilerplate and repeated lines"""
+    seen = set() if seen is None else seen
+    lines = []
+    for line in text.splitlines():
+        line = CONTACT_PATTERN.sub('', line)
+        line = PHONE_PATTERN.sub(_strip_phone, line)
+        line = WHITESPACE_PATTERN.sub(' ', line).strip(' \t•*-|,;')
+        if not line or BOILERPLATE_PATTERN.match(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def compact_resume_text(resume):
+    """Resume prompt text built from its parsed sections"""
+    text = resume.raw_text or ''
+    sections = resume.sections or segment_resume(text)
+
+    seen = set()
+    blocks = []
+    for name, label in RESUME_PROMPT_SECTIONS:
+        body = '\n'.join(
+            text[section['start']:section['end']]
+            for section in sections
+            if section['name'] == name
+        )
+        lines = compact_lines(body, seen)
+
+        if name == 'skills':
+            # Parsed skill keywords are cheaper than prose; add any the section missed
+            listed = ' '.join(lines).lower()
+            extra = [skill for skill in resume.skills if skill.lower() not in listed]
+            if extra:
+                lines.append(', '.join(extra))
+
+        if lines:
+            blocks.append(f'{label}:\n' + '\n'.join(lines))
+
+    if not blocks:
+        # Unsegmented resume: fall back to the cleaned-up full text
+        blocks = compact_lines(text)
+
+    return '\n\n'.join(blocks)
+
+
+def _job_fields(job):
+    return [
+        ('Role', job.role_title or job.title),
+        ('Company', job.company_name),
+        ('Experience required', job.experience_required),
+        ('Location', job.location),
+        ('Must-have skills', ', '.join(sorted(job.must_have_skills))),
+        ('Good-to-have skills', ', '.join(sorted(job.good_to_have_skills))),
+        ('Qualifications', ', '.join(sorted(job.qualifications))),
+    ]
+
+
+def raw_job_text(job):
+    """What is sent for a job without compaction: its description, or its fields when it has none"""
+    if job.raw_text:
+        return job.raw_text
+    return '\n'.join(f'{label}: {value}' for label, value in _job_fields(job) if value)
+
+
+def compact_job_text(job):
+    """Job prompt text: structured requirements first, then the cleaned-up description
+
+    Lists are sorted so the same job always produces byte-identical text.
+    """
+    fields = _job_fields(job)
+    structured = [f'{label}: {value}' for label, value in fields if value]
+
+    # Skip description lines that only repeat the structured values
+    seen = {line.lower() for line in structured}
+    seen.update(value.lower() for label, value in fields if value)
+    description = compact_lines(job.raw_text or '', seen)
+
+    blocks = ['\n'.join(structured)]
+    if description:
+        blocks.append('Description:\n' + '\n'.join(description))
+    return '\n\n'.join(blocks)
+
+
+@dataclass
+class CompactPrompt:
+    """Compacted LLM inputs together with their token accounting"""
+    resume_text: str
+    job_text: str
+    original_tokens: int
+    compact_tokens: int
+
+    @property
+    def saved_tokens(self):
+        return self.original_tokens - self.compact_tokens
+
+    @property
+    def savings_percent(self):
+        if not self.original_tokens:
+            return 0.0
+        return round(self.saved_tokens / self.original_tokens * 100, 1)
+
+
+def _smaller(compacted, raw):
+    """(text, tokens) of the compacted text, or of the raw text when compaction did not shrink it
+
+    Section labels and the structured job fields can outweigh what is
+    removed from a short input.
+    """
+    compacted_tokens, raw_tokens = estimate_tokens(compacted), estimate_tokens(raw)
+    if compacted_tokens < raw_tokens:
+        return compacted, compacted_tokens
+    return raw, raw_tokens
+
+
+def compact_for_evaluation(resume, job):
+    """Compact a resume/job pair and measure tokens saved against the raw texts
+
+    Each text is only replaced by its compacted form when that is smaller,
+    so the prompt never grows.
+    """
+    resume_raw = resume.raw_text or ''
+    job_raw = raw_job_text(job)
+    resume_text, resume_tokens = _smaller(compact_resume_text(resume), resume_raw)
+    job_text, job_tokens = _smaller(compact_job_text(job), job_raw)
+
+    return CompactPrompt(
+        resume_text=resume_text,
+        job_text=job_text,
+        original_tokens=estimate_tokens(resume_raw) + estimate_tokens(job_raw),
+        compact_tokens=resume_tokens + job_tokens,
+    )
@@ -0,0 +1,184 @@
+# evaluations/score_stats.py
+"""
+Incrementally maintained per-job score statistics
+
+Every saved or deleted Evaluation adjusts its job's JobScoreStats row from
+post_save / post_delete receivers, so counters, the score histogram and
+mean/max are a single-row read. The receivers run in the writer's
+transaction: Django wraps deletes (cascades included) in one, and the
+views save evaluations inside ``transaction.atomic()``. A delete that
+removes many evaluations at once (a resume or job cascade) updates each
+job once. ``manage.py rebuild_score_stats`` recomputes the table from the
+evaluations themselves.
+"""
+
+import threading
+import weakref
+
+from django.db import transaction
+from django.db.models import Max
+
+from utils.versioning import bump_versions
+from jobs.models import HIGH_MATCH_SCORE_THRESHOLD, MATCH_SCORE_THRESHOLD
+from .models import SCORE_BUCKETS, Evaluation, JobScoreStats, empty_histogram
+
+# Deletes in progress on this thread, with the evaluation ids still to be
+# announced and the scores they remove per job
+_deletes = threading.local()
+
+def score_bucket(score):
+    return min(max(score, 0) // 10, SCORE_BUCKETS - 1)
+
+
+def _apply(stats, score, sign):
+    stats.applicant_count += sign
+    stats.matched_count += sign * (score >= MATCH_SCORE_THRESHOLD)
+    stats.high_match_count += sign * (score >= HIGH_MATCH_SCORE_THRESHOLD)
+    stats.histogram[score_bucket(score)] += sign
+    stats.score_sum += sign * score
+
+
+def record_score_change(job_id, old_score=None, new_score=None):
+    """Move one evaluation's score into the job's stats (None for a new / deleted evaluation)"""
+    record_score_changes(
+        job_id,
+        removed=[] if old_score is None else [old_score],
+        added=[] if new_score is None else [new_score]
+    )
+
+
+def record_score_changes(job_id, removed=(), added=()):
+    """Take ``removed`` scores out of the job's stats and put ``added`` in, with one row lock"""
+    with transaction.atomic():
+        if added:
+            JobScoreStats.objects.get_or_create(job_description_id=job_id)
+        stats = JobScoreStats.objects.select_for_update().filter(job_description_id=job_id).first()
+        if stats is None:
+            # Nothing recorded for the job, or it is being deleted along with its stats
+            return
+        if len(stats.histogram) != SCORE_BUCKETS:
+            stats.histogram = empty_histogram()
+
+        for score in removed:
+            _apply(stats, score, -1)
+        for score in added:
+            _apply(stats, score, 1)
+
+        if added and max(added) >= stats.max_score:
+            stats.max_score = max(added)
+        elif removed and max(removed) >= stats.max_score:
+            # The maximum left; find the next one (indexed by job and score)
+            stats.max_score = Evaluation.objects.filter(job_description_id=job_id).aggregate(
+                max_score=Max('overall_score')
+            )['max_score'] or 0
+        stats.save()
+
+
+def rebuild_score_stats(job_ids=None):
+    """Recompute JobScoreStats from the evaluations; returns the number of jobs written"""
+    evaluations = Evaluation.objects.all()
+    if job_ids is not None:
+        evaluations = evaluations.filter(job_description_id__in=job_ids)
+
+    rebuilt = {}
+    for job_id, score in evaluations.values_list('job_description_id', 'overall_score').iterator():
+        stats = rebuilt.get(job_id)
+        if stats is None:
+            stats = rebuilt[job_id] = JobScoreStats(job_description_id=job_id, histogram=empty_histogram())
+        _apply(stats, score, 1)
+        stats.max_score = max(stats.max_score, score)
+
+    with transaction.atomic():
+        stale = JobScoreStats.objects.all()
+        if job_ids is not None:
+            stale = stale.filter(job_description_id__in=job_ids)
+        stale.delete()
+        JobScoreStats.objects.bulk_create(rebuilt.values(), batch_size=500)
+        bump_versions('evaluations')
+    return len(rebuilt)
+
+
+def remember_score(sender, instance, **kwargs):
+    """post_init: keep the loaded score so a later save can tell what changed"""
+    # Read from __dict__ so a deferred score is not fetched just for this
+    instance._stats_score = instance.__dict__.get('overall_score')
+    instance._stats_job_id = instance.__dict__.get('job_description_id')
+
+
+def update_stats_on_save(sender, instance, created, **kwargs):
+    old_score = None if created else instance._stats_score
+    old_job_id = instance.job_description_id if created else instance._stats_job_id
+    new_score = instance.overall_score
+
+    if not created and (old_score is None or old_job_id is None):
+        # Loaded without its score (deferred); recount this job instead
+        rebuild_score_stats([instance.job_description_id])
+    elif old_job_id != instance.job_description_id:
+        record_score_change(old_job_id, old_score=old_score)
+        record_score_change(instance.job_description_id, new_score=new_score)
+    elif created or old_score != new_score:
+        record_score_change(instance.job_description_id, old_score, new_score)
+
+    instance._stats_score = new_score
+    instance._stats_job_id = instance.job_description_id
+
+
+def _pending_deletes():
+    """(weak reference to the delete's origin, batch) pairs; a delete that failed midway drops out with its origin"""
+    if not hasattr(_deletes, 'batches'):
+        _deletes.batches = []
+    _deletes.batches = [(origin, batch) for origin, batch in _deletes.batches if origin() is not None]
+    return _deletes.batches
+
+
+def collect_deleted_score(sender, instance, origin=None, **kwargs):
+    """pre_delete: note the evaluation's score under the delete it belongs to
+
+    Django sends pre_delete for every collected object before deleting any
+    of them, so a cascade has gathered all its evaluations by the time the
+    first post_delete arrives.
+    """
+    if origin is None:
+        return
+    batches = _pending_deletes()
+    for batch_origin, batch in batches:
+        if batch_origin() is origin:
+            break
+    else:
+        batch = {'ids': set(), 'removed': {}, 'rebuild': set()}
+        batches.append((weakref.ref(origin), batch))
+
+    batch['ids'].add(instance.pk)
+    if instance._stats_score is None:
+        batch['rebuild'].add(instance.job_description_id)
+    else:
+        batch['removed'].setdefault(instance.job_description_id, []).append(instance._stats_score)
+
+
+def update_stats_on_delete(sender, instance, origin=None, **kwargs):
+    """post_delete: the first one of a delete updates every job it touched"""
+    batches = _pending_deletes()
+    for position, (batch_origin, batch) in enumerate(batches):
+        if batch_origin() is origin and instance.pk in batch['ids']:
+            break
+    else:
+        # Not collected in pre_delete; update for this row alone
+        if instance._stats_score is None:
+            rebuild_score_stats([instance.job_description_id])
+        else:
+            record_score_change(instance.job_description_id, old_score=instance._stats_score)
+        return
+
+    if batch['removed'] or batch['rebuild']:
+        # All rows of the delete are gone already; later receivers have nothing to do
+        for job_id, scores in batch['removed'].items():
+            if job_id not in batch['rebuild']:
+                record_score_changes(job_id, removed=scores)
+        if batch['rebuild']:
+            rebuild_score_stats(batch['rebuild'])
+        batch['removed'] = {}
+        batch['rebuild'] = set()
+
+    batch['ids'].discard(instance.pk)
+    if not batch['ids']:
+        del batches[position]
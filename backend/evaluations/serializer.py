@@ -3,8 +3,9 @@ from rest_framework import serializers
 from .models import Evaluation, EvaluationLog
 from resumes.serializer import ResumeSerializer
 from jobs.serializers import JobDescriptionSerializer
+from utils.fieldsets import SparseFieldsetMixin
 
-class EvaluationSerializer(serializers.ModelSerializer):
+class EvaluationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     resume_details = ResumeSerializer(source='resume', read_only=True)
     job_details = JobDescriptionSerializer(source='job_description', read_only=True)
     
@@ -16,15 +17,19 @@ class EvaluationSerializer(serializers.ModelSerializer):
             'experience_score', 'education_score', 'semantic_similarity_score',
             'recommendation', 'strengths', 'areas_for_improvement', 'detailed_feedback',
             'matched_skills', 'missing_skills', 'recommendations', 'llm_processing_successful',
-            'processing_time', 'created_at'
+            'processing_time', 'input_tokens_raw', 'input_tokens_compact', 'created_at'
         ]
         read_only_fields = [
             'overall_score', 'hard_skills_score', 'soft_skills_score', 
             'experience_score', 'education_score', 'semantic_similarity_score',
             'recommendation', 'strengths', 'areas_for_improvement', 'detailed_feedback',
             'matched_skills', 'missing_skills', 'recommendations', 'llm_processing_successful',
-            'processing_time', 'created_at'
+            'processing_time', 'input_tokens_raw', 'input_tokens_compact', 'created_at'
         ]
+        # utils.fieldsets; the legacy feedback column is never returned
+        expandable_fields = ['resume_details', 'job_details', 'detailed_feedback']
+        deferrable_fields = ['detailed_feedback', 'strengths', 'areas_for_improvement',
+                             'recommendations', 'matched_skills', 'missing_skills', 'feedback']
 
 class EvaluationCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,3 +1,406 @@
-from django.test import TestCase
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from embedding_writer import ChromaWriter
+from jobs.models import JobDescription
+from llm_services import AnalysisResult, EmbeddingService, EnhancedScoringService, StageGraph
+from llm_usage import CallUsage, estimate_cost
+from resumes.models import Resume
+from .models import Evaluation, JobApplication, JobScoreStats, LLMUsage
+from .prompt_compaction import compact_for_evaluation
+from .score_stats import rebuild_score_stats
+
+User = get_user_model()
+
+
+class EstimateCostTests(SimpleTestCase):
+    def test_dated_snapshot_priced_as_base_model(self):
+        self.assertAlmostEqual(estimate_cost('gpt-4o-mini-2024-07-18', 10000, 1000), 0.0021)
+        self.assertEqual(
+            estimate_cost('gpt-4o-mini-2024-07-18', 10000, 1000),
+            estimate_cost('gpt-4o-mini', 10000, 1000)
+        )
+
+    def test_longest_priced_name_wins(self):
+        # Not priced as 'gpt-4o'
+        self.assertAlmostEqual(estimate_cost('gpt-4o-mini-2024-07-18', 1_000_000, 0), 0.15)
+        self.assertAlmostEqual(estimate_cost('gpt-4o-2024-08-06', 1_000_000, 0), 2.50)
+
+    def test_unpriced_model_costs_nothing_and_warns(self):
+        with self.assertLogs('llm_usage', level='WARNING'):
+            self.assertEqual(estimate_cost('unpriced-test-model', 1000, 1000), 0.0)
+
+
+class FakeCollection:
+    """Records upserts; fails the first ``failures`` calls"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.upserts = []
+        self.stored = {}
+
+    def upsert(self, ids, embeddings, metadatas):
+        self.upserts.append(ids)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('chroma unavailable')
+        self.stored.update(zip(ids, embeddings))
+
+
+class ChromaWriterTests(SimpleTestCase):
+    def writer(self, collection, **kwargs):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        writer = ChromaWriter({'resumes': collection}, f'{directory.name}/lock', **kwargs)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_flush_writes_the_batch_the_thread_holds(self):
+        collection = FakeCollection()
+        # A long interval: the writer thread sits on a partial batch
+        writer = self.writer(collection, batch_size=100, flush_interval=60)
+        for i in range(3):
+            writer.enqueue('resumes', str(i), [float(i)], {})
+
+        writer.flush()
+        self.assertEqual(collection.stored, {'0': [0.0], '1': [1.0], '2': [2.0]})
+        self.assertTrue(writer._thread.is_alive())
+
+    def wait_for_upserts(self, collection, count):
+        deadline = time.monotonic() + 5
+        while len(collection.upserts) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_failed_upsert_is_retried(self):
+        collection = FakeCollection(failures=2)
+        writer = self.writer(collection, flush_interval=0.01, max_retries=3, retry_backoff=0.01)
+        with self.assertLogs('embedding_writer', level='ERROR'):
+            writer.enqueue('resumes', 'a', [1.0], {})
+            self.wait_for_upserts(collection, 3)
+            writer.flush()
+
+        self.assertEqual(collection.stored, {'a': [1.0]})
+        self.assertEqual(len(collection.upserts), 3)
+
+    def test_retry_waits_for_its_backoff(self):
+        collection = FakeCollection(failures=1)
+        writer = self.writer(collection, flush_interval=0.01, retry_backoff=60)
+        with self.assertLogs('embedding_writer', level='ERROR'):
+            writer.enqueue('resumes', 'a', [1.0], {})
+            writer.flush()
+            writer.enqueue('resumes', 'b', [2.0], {})
+            writer.flush()
+        self.assertEqual(collection.upserts, [['a'], ['b']])
+
+        # Closing tries the pending retry without waiting
+        writer.close()
+        self.assertEqual(collection.stored, {'b': [2.0], 'a': [1.0]})
+
+    def test_retries_are_bounded_and_dropped_items_reported(self):
+        collection = FakeCollection(failures=100)
+        on_dropped = mock.Mock()
+        writer = self.writer(collection, flush_interval=0.01, max_retries=2, retry_backoff=0.01,
+                             on_dropped=on_dropped)
+        with self.assertLogs('embedding_writer', level='ERROR') as logs:
+            writer.enqueue('resumes', 'a', [1.0], {'content_hash': 'ab'})
+            self.wait_for_upserts(collection, 3)
+            writer.flush()
+
+        self.assertEqual(len(collection.upserts), 3)  # first try and two retries
+        self.assertIn('1 dropped', logs.output[-1])
+        name, [item] = on_dropped.call_args.args
+        self.assertEqual((name, item.id), ('resumes', 'a'))
+
+    def test_dropped_embedding_is_stored_again_next_time(self):
+        service = EmbeddingService.__new__(EmbeddingService)
+        service._stored_hashes = {('resumes', 'a'): 'new', ('resumes', 'b'): 'ab'}
+        dropped = [
+            mock.Mock(id='a', metadata={'content_hash': 'old'}),  # superseded by a newer text
+            mock.Mock(id='b', metadata={'content_hash': 'ab'}),
+        ]
+        service._forget_dropped('resumes', dropped)
+        self.assertEqual(service._stored_hashes, {('resumes', 'a'): 'new'})
+
+    def test_close_writes_what_is_left(self):
+        collection = FakeCollection()
+        writer = self.writer(collection, batch_size=100, flush_interval=60)
+        writer.enqueue('resumes', 'a', [1.0], {})
+        writer.close()
+        self.assertEqual(collection.stored, {'a': [1.0]})
+        self.assertFalse(writer._thread.is_alive())
+
+
+class StageGraphTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_stages_run_after_their_dependencies(self):
+        order = []
+        both_started = threading.Barrier(2, timeout=5)
+
+        def stage(name, value):
+            def run(*args):
+                order.append(name)
+                return value + sum(args)
+            return run
+
+        def independent(name, value):
+            def run():
+                both_started.wait()  # fails unless the two run at the same time
+                return stage(name, value)()
+            return run
+
+        results = (
+            StageGraph()
+            .add('total', stage('total', 0), depends_on=('sum', 'c'))
+            .add('sum', stage('sum', 0), depends_on=('a', 'b'))
+            .add('a', independent('a', 1))
+            .add('b', independent('b', 2))
+            .add('c', stage('c', 10), depends_on=('a',))
+            .run(self.executor)
+        )
+
+        self.assertEqual(results, {'a': 1, 'b': 2, 'c': 11, 'sum': 3, 'total': 14})
+        self.assertEqual(order[-1], 'total')
+        self.assertLess(order.index('a'), order.index('c'))
+        self.assertLess(order.index('sum'), order.index('total'))
+
+    def test_failing_stage_raises_and_its_dependents_do_not_run(self):
+        dependent = mock.Mock()
+
+        def fail():
+            raise RuntimeError('llm unavailable')
+
+        graph = StageGraph().add('analysis', fail).add('merge', dependent, depends_on=('analysis',))
+        with self.assertRaisesMessage(RuntimeError, 'llm unavailable'):
+            graph.run(self.executor)
+        dependent.assert_not_called()
+
+    def test_unknown_dependency_is_rejected_before_anything_runs(self):
+        stage = mock.Mock()
+        graph = StageGraph().add('a', stage).add('b', stage, depends_on=('missing',))
+        with self.assertRaisesMessage(ValueError, 'Stage b depends on unknown stages: missing'):
+            graph.run(self.executor)
+        stage.assert_not_called()
+
+    def test_cycle_is_rejected(self):
+        graph = (
+            StageGraph()
+            .add('a', lambda: 1)
+            .add('b', lambda a, c: a, depends_on=('a', 'c'))
+            .add('c', lambda b: b, depends_on=('b',))
+        )
+        with self.assertRaisesMessage(ValueError, 'Unresolvable stage dependencies: b, c'):
+            graph.run(self.executor)
+
+
+class ComprehensiveEvaluationTests(SimpleTestCase):
+    def service(self):
+        llm = mock.Mock()
+        llm.analyze_resume.return_value = None  # basic analysis from similarity and skills
+        llm.extract_skills.return_value = ['Python', 'Kubernetes']
+        embeddings = mock.Mock()
+        embeddings.get_embedding.return_value = np.array([1.0, 0.0])
+        service = EnhancedScoringService(llm_service=llm, embedding_service=embeddings)
+        self.addCleanup(service.executor.shutdown)
+        return service, llm
+
+    def test_job_skills_are_extracted_when_the_job_has_none(self):
+        service, llm = self.service()
+        result = service.comprehensive_evaluation('Python and Django', 'We need Python and Kubernetes')
+
+        llm.extract_skills.assert_called_once_with('We need Python and Kubernetes', None)
+        self.assertEqual((result.matched_skills, result.missing_skills), (['Python'], ['Kubernetes']))
+
+    def test_parsed_job_skills_are_used_as_they_are(self):
+        service, llm = self.service()
+        result = service.comprehensive_evaluation('Python and Django', 'Backend role', job_skills=['Django', 'Rust'])
+
+        llm.extract_skills.assert_not_called()
+        self.assertEqual((result.matched_skills, result.missing_skills), (['Django'], ['Rust']))
+
+
+class PromptCompactionTests(SimpleTestCase):
+    def job(self, raw_text):
+        return JobDescription(
+            title='Backend Developer',
+            company_name='Acme',
+            raw_text=raw_text,
+            experience_required='2+ years',
+            location='Pune',
+            must_have_skills=['python', 'django', 'rest'],
+            good_to_have_skills=['docker'],
+            qualifications=['B.Tech'],
+        )
+
+    def test_short_input_is_never_made_larger(self):
+        resume = Resume(raw_text='Python developer', skills=['python', 'django', 'sql'])
+        job = self.job('Backend developer, Python and Django.')
+
+        prompt = compact_for_evaluation(resume, job)
+        self.assertLessEqual(prompt.compact_tokens, prompt.original_tokens)
+        self.assertGreaterEqual(prompt.savings_percent, 0)
+        self.assertEqual(prompt.job_text, job.raw_text)
+
+    def test_long_input_is_compacted(self):
+        filler = '\n'.join(['Page 1 of 2', 'Contact: jane@example.com', 'We are an equal opportunity employer.'] * 20)
+        resume = Resume(raw_text='Summary\nBuilt Django APIs in Python.\n' + filler)
+        job = self.job('We need a Python developer.\n' + filler)
+
+        prompt = compact_for_evaluation(resume, job)
+        self.assertLess(prompt.compact_tokens, prompt.original_tokens)
+        self.assertNotIn('jane@example.com', prompt.resume_text + prompt.job_text)
+
+
+class ScoreStatsTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create(username='placement', role='placement_team')
+        self.jobs = [
+            JobDescription.objects.create(title=f'Job {i}', company_name='Acme', uploaded_by=owner)
+            for i in range(2)
+        ]
+        self.students = [User.objects.create(username=f'student{i}') for i in range(2)]
+        for position, student in enumerate(self.students):
+            for version in range(3):
+                resume = Resume.objects.create(user=student, file_name=f'cv{version}.pdf', file_size=1)
+                for job in self.jobs:
+                    score = 40 + 30 * position + 5 * version + job.id
+                    Evaluation.objects.create(resume=resume, job_description=job, overall_score=score)
+
+    def stats(self):
+        return {
+            stats.job_description_id: (
+                stats.applicant_count, stats.matched_count, stats.high_match_count,
+                stats.histogram, stats.score_sum, stats.max_score
+            )
+            for stats in JobScoreStats.objects.all()
+        }
+
+    def assert_matches_rebuild(self):
+        incremental = self.stats()
+        rebuild_score_stats()
+        self.assertEqual(incremental, self.stats())
+
+    def test_saves_and_deletes_keep_stats_in_step(self):
+        evaluation = Evaluation.objects.filter(job_description=self.jobs[0]).order_by('-overall_score').first()
+        evaluation.overall_score = 95
+        evaluation.save()
+        self.assert_matches_rebuild()
+
+        evaluation.delete()
+        self.assert_matches_rebuild()
+
+    def test_cascade_updates_each_job_once(self):
+        # The best scoring student's three resumes, so every job's maximum has to be recomputed
+        with CaptureQueriesContext(connection) as captured:
+            self.students[1].delete()
+
+        stats_locks = [query for query in captured.captured_queries if 'FROM "evaluations_jobscorestats"' in query['sql']]
+        max_queries = [query for query in captured.captured_queries if 'MAX(' in query['sql']]
+        self.assertEqual(len(stats_locks), len(self.jobs))
+        self.assertEqual(len(max_queries), len(self.jobs))
+        self.assert_matches_rebuild()
+
+    def test_job_cascade_deletes_its_stats(self):
+        self.jobs[0].delete()
+        self.assertEqual(list(self.stats()), [self.jobs[1].id])
+        self.assert_matches_rebuild()
+
+
+class FakeScoringService:
+    def __init__(self):
+        self.calls = []
+
+    def comprehensive_evaluation(self, resume_text, job_text, cache_key=None, recorder=None, job_skills=None):
+        self.calls.append(cache_key)
+        recorder.record(CallUsage('analyze_resume', 'chat', 'gpt-4o-mini-2024-07-18', 1000, 100, cached_tokens=800))
+        return AnalysisResult(
+            overall_score=72, hard_skills_score=80, soft_skills_score=60, experience_score=70,
+            education_score=65, matched_skills=['python'], missing_skills=[], recommendations=[],
+            strengths=[], areas_for_improvement=[], overall_recommendation='recommended',
+            detailed_feedback='Good match', usage={'prompt_tokens': 1000, 'cached_tokens': 800}
+        )
+
+
+class EvaluationViewTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username='placement', role='placement_team')
+        self.job = JobDescription.objects.create(title='Backend', company_name='Acme', uploaded_by=self.owner,
+                                                 raw_text='Python developer')
+        self.resume = Resume.objects.create(user=self.owner, file_name='cv.pdf', file_size=1,
+                                            raw_text='Python, Django')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def evaluate(self):
+        return self.client.post('/api/evaluations/', {'resume': self.resume.id, 'job_description': self.job.id})
+
+    @override_settings(LLM_SERVICES_ENABLED=True)
+    def test_evaluation_uses_the_scoring_service(self):
+        scoring = FakeScoringService()
+        with mock.patch('llm_services.get_enhanced_scoring_service', return_value=scoring), \
+                mock.patch('llm_services.get_embedding_service', return_value=mock.Mock()):
+            response = self.evaluate()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['overall_score'], 72)
+        self.assertEqual(scoring.calls, [f'job-{self.job.id}'])
+        usage = LLMUsage.objects.get(evaluation_id=response.data['id'])
+        self.assertEqual(usage.cached_tokens, 800)
+        self.assertGreater(usage.estimated_cost, 0)
+
+    def test_llm_services_are_off_by_default(self):
+        with mock.patch('llm_services.get_enhanced_scoring_service') as get_service, \
+                self.assertLogs('evaluations.views', level='ERROR'):
+            response = self.evaluate()
+
+        get_service.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['overall_score'], 0)
+        self.assertFalse(Evaluation.objects.get().llm_processing_successful)
+
+
+class MyApplicationsTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create(username='student', role='student')
+        self.owner = User.objects.create(username='placement', role='placement_team')
+        self.resume = Resume.objects.create(user=self.student, file_name='cv.pdf', file_size=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def apply(self, count, start=0):
+        for index in range(start, start + count):
+            job = JobDescription.objects.create(title=f'Job {index}', company_name='Acme',
+                                                uploaded_by=self.owner, raw_text='Python')
+            JobApplication.objects.create(student=self.student, job=job, resume=self.resume)
+            if index % 2 == 0:  # every other application has been evaluated
+                Evaluation.objects.create(resume=self.resume, job_description=job, overall_score=50 + index)
+
+    def test_one_query_however_many_applications(self):
+        self.apply(2)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/evaluations/applications/')
+        self.assertEqual(len(response.data), 2)
+
+        self.apply(6, start=2)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/evaluations/applications/')
+        self.assertEqual(len(response.data), 8)
+
+        scores = {app['job']['title']: app['evaluation_score'] for app in response.data}
+        self.assertEqual(scores['Job 4'], 54)
+        self.assertIsNone(scores['Job 5'])
+        evaluated = next(app for app in response.data if app['job']['title'] == 'Job 4')
+        self.assertIsNotNone(evaluated['score_percentile'])
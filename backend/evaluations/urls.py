@@ -4,6 +4,7 @@ from .views import (
     EvaluationListCreateView,
     EvaluationDetailView,
     evaluation_stats,
+    llm_usage_stats,
     my_applications,
     apply_to_job,
     check_application_status,
@@ -14,6 +15,7 @@ urlpatterns = [
     path('', EvaluationListCreateView.as_view(), name='evaluation-list-create'),
     path('<int:pk>/', EvaluationDetailView.as_view(), name='evaluation-detail'),
     path('stats/', evaluation_stats, name='evaluation-stats'),
+    path('usage/', llm_usage_stats, name='llm-usage-stats'),
     # Job Applications
     path('applications/', my_applications, name='my-applications'),
     path('applications/apply/', apply_to_job, name='apply-to-job'),
@@ -1,27 +1,32 @@
 import time
 import logging
 logger = logging.getLogger(__name__)
+from django.conf import settings
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from .models import Evaluation, EvaluationLog, JobApplication
+from django.db import transaction
+from django.db.models import Avg, Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+from .models import Evaluation, EvaluationLog, JobApplication, JobScoreStats, LLMUsage
 from .serializer import (
     EvaluationSerializer, 
     EvaluationCreateSerializer, 
     EvaluationSummarySerializer,
     EvaluationLogSerializer
 )
+from .prompt_compaction import compact_for_evaluation
 from resumes.models import Resume
-from jobs.models import JobDescription
+from jobs.models import HIGH_MATCH_SCORE_THRESHOLD, JobDescription
+from llm_usage import UsageRecorder
+from utils.fieldsets import sparse_queryset
+from utils.pagination import KeysetPagination
+from utils.versioning import versioned_response
 
 
-# Import real LLM services only
-# Temporarily disabled for deployment
-# from llm_services import enhanced_scoring_service, embedding_service
-
-# Mock services for deployment
+# Mock services for deployment (settings.LLM_SERVICES_ENABLED is off)
 class MockService:
     def enhance_evaluation(self, *args, **kwargs):
         return {}
@@ -29,8 +34,37 @@ class MockService:
     def get_skills_embedding(self, *args, **kwargs):
         return []
 
-enhanced_scoring_service = MockService()
-embedding_service = MockService()
+
+def scoring_services():
+    """The scoring and embedding services, or MockService stand-ins unless LLM_SERVICES_ENABLED
+
+    llm_services is imported on first use: loading the embedding model and
+    Chroma is too slow to do while the URLconf is imported.
+    """
+    if not settings.LLM_SERVICES_ENABLED:
+        return MockService(), MockService()
+    from llm_services import get_embedding_service, get_enhanced_scoring_service
+    return get_enhanced_scoring_service(), get_embedding_service()
+
+def save_llm_usage(evaluation, recorder):
+    """Persist the calls collected during an evaluation as LLMUsage rows"""
+    LLMUsage.objects.bulk_create([
+        LLMUsage(
+            evaluation=evaluation,
+            job_description_id=evaluation.job_description_id,
+            operation=call.operation,
+            call_type=call.call_type,
+            model=call.model,
+            prompt_tokens=call.prompt_tokens,
+            completion_tokens=call.completion_tokens,
+            cached_tokens=call.cached_tokens,
+            latency=call.latency,
+            retries=call.retries,
+            estimated_cost=round(call.estimated_cost, 6),
+            succeeded=call.succeeded
+        )
+        for call in recorder.calls
+    ])
 
 class EvaluationListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -41,10 +75,16 @@ class EvaluationListCreateView(APIView):
             evaluations = Evaluation.objects.filter(resume__user=request.user)
         else:
             evaluations = Evaluation.objects.all()
+        # Joins the nested objects and defers what ?fields=/?expand= leave out
+        evaluations = sparse_queryset(evaluations, EvaluationSerializer, request)
         
-        # Use full serializer for list view to include all nested data
-        serializer = EvaluationSerializer(evaluations, many=True, context={'request': request})
-        return Response(serializer.data)
+        # Highest scores first, one bounded page at a time
+        paginator = KeysetPagination(ordering=('-overall_score', '-id'))
+        page = paginator.paginate_queryset(evaluations, request)
+        
+        # Full nested data unless the client asks for a sparse fieldset
+        serializer = EvaluationSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
     
     def post(self, request):
         serializer = EvaluationCreateSerializer(data=request.data, context={'request': request})
@@ -61,11 +101,15 @@ class EvaluationListCreateView(APIView):
         resume = validated_data['resume']
         job_description = validated_data['job_description']
         
-        # Create evaluation record
-        evaluation = Evaluation.objects.create(
-            resume=resume,
-            job_description=job_description
-        )
+        # Create evaluation record (with its job's score stats)
+        with transaction.atomic():
+            evaluation = Evaluation.objects.create(
+                resume=resume,
+                job_description=job_description
+            )
+        
+        # Collects token, latency and retry data for every LLM/embedding call
+        recorder = UsageRecorder()
         
         try:
             # Log evaluation start
@@ -76,23 +120,32 @@ class EvaluationListCreateView(APIView):
                 message='Starting LLM-enhanced evaluation process'
             )
             
-            # Extract text content
-            resume_text = resume.extracted_text if hasattr(resume, 'extracted_text') and resume.extracted_text else f"Resume for {resume.user.get_full_name()}"
-            job_text = job_description.extracted_text if hasattr(job_description, 'extracted_text') and job_description.extracted_text else job_description.raw_text
+            # Build compact, section-aware prompt text from the parsed resume and job
+            compaction_start_time = time.time()
+            compact_prompt = compact_for_evaluation(resume, job_description)
+            resume_text = compact_prompt.resume_text
+            job_text = compact_prompt.job_text
             
-            # Log text extraction
+            evaluation.input_tokens_raw = compact_prompt.original_tokens
+            evaluation.input_tokens_compact = compact_prompt.compact_tokens
+            
+            # Log token savings
             EvaluationLog.objects.create(
                 evaluation=evaluation,
-                step='text_extraction',
+                step='prompt_compaction',
                 status='success',
-                message=f'Extracted {len(resume_text)} chars from resume, {len(job_text)} chars from job description'
+                message=(
+                    f'Compacted LLM input from {compact_prompt.original_tokens} to '
+                    f'{compact_prompt.compact_tokens} tokens ({compact_prompt.savings_percent}% saved)'
+                ),
+                execution_time=time.time() - compaction_start_time
             )
             
             # Perform LLM-enhanced evaluation
             llm_start_time = time.time()
             
             # Log which service is being used
-            service_type = "OpenAI GPT Services"
+            service_type = "OpenAI GPT Services" if settings.LLM_SERVICES_ENABLED else "MockService"
             EvaluationLog.objects.create(
                 evaluation=evaluation,
                 step='llm_service_type',
@@ -100,15 +153,24 @@ class EvaluationListCreateView(APIView):
                 message=f'Using {service_type} for evaluation'
             )
             
+            # All candidates for one job share the job prompt prefix
+            enhanced_scoring_service, embedding_service = scoring_services()
             analysis_result = enhanced_scoring_service.comprehensive_evaluation(
-                resume_text, job_text
+                resume_text, job_text,
+                cache_key=f'job-{job_description.id}',
+                recorder=recorder,
+                job_skills=job_description.must_have_skills + job_description.good_to_have_skills
             )
             llm_execution_time = time.time() - llm_start_time
             
-            # Store embeddings for future semantic search
+            # Store embeddings for future semantic search (reusing the ones computed above)
             try:
-                embedding_service.store_resume_embedding(str(resume.id), resume_text)
-                embedding_service.store_job_embedding(str(job_description.id), job_text)
+                embedding_service.store_resume_embedding(
+                    str(resume.id), resume_text, recorder, embedding=analysis_result.resume_embedding
+                )
+                embedding_service.store_job_embedding(
+                    str(job_description.id), job_text, recorder, embedding=analysis_result.job_embedding
+                )
             except Exception as e:
                 logger.warning(f"Failed to store embeddings: {str(e)}")
             
@@ -133,14 +195,19 @@ class EvaluationListCreateView(APIView):
             
             evaluation.processing_time = time.time() - start_time
             evaluation.llm_processing_successful = True
-            evaluation.save()
+            with transaction.atomic():
+                evaluation.save()
             
             # Log success
             EvaluationLog.objects.create(
                 evaluation=evaluation,
                 step='llm_analysis',
                 status='success',
-                message=f'LLM analysis completed with overall score: {analysis_result.overall_score}%',
+                message=(
+                    f'LLM analysis completed with overall score: {analysis_result.overall_score}% '
+                    f"(prompt tokens: {analysis_result.usage.get('prompt_tokens', 0)}, "
+                    f"cached: {analysis_result.usage.get('cached_tokens', 0)})"
+                ),
                 execution_time=llm_execution_time
             )
             
@@ -175,8 +242,10 @@ class EvaluationListCreateView(APIView):
             evaluation.detailed_feedback = 'Unable to complete evaluation due to system error.'
             evaluation.llm_processing_successful = False
             evaluation.processing_time = time.time() - start_time
-            evaluation.save()
+            with transaction.atomic():
+                evaluation.save()
         
+        save_llm_usage(evaluation, recorder)
         return evaluation
 
 
@@ -184,7 +253,10 @@ class EvaluationDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, pk):
-        evaluation = get_object_or_404(Evaluation, pk=pk)
+        evaluation = get_object_or_404(
+            sparse_queryset(Evaluation.objects.select_related('resume'), EvaluationSerializer, request),
+            pk=pk
+        )
         
         # Students can only access evaluations for their resumes
         if request.user.role == 'student' and evaluation.resume.user != request.user:
@@ -200,23 +272,88 @@ class EvaluationDetailView(APIView):
 @permission_classes([permissions.IsAuthenticated])
 def evaluation_stats(request):
     """Get evaluation statistics for dashboard"""
-    if request.user.role == 'student':
-        total_evaluations = Evaluation.objects.filter(resume__user=request.user).count()
-        high_score_evaluations = Evaluation.objects.filter(
-            resume__user=request.user,
-            verdict='high'
-        ).count()
+    return versioned_response(request, ['evaluations'], lambda: count_evaluations(request.user))
+
+def count_evaluations(user):
+    evaluations = Evaluation.objects.all()
+    if user.role == 'student':
+        evaluations = evaluations.filter(resume__user=user)
+        totals = evaluations.aggregate(
+            total=Count('id'),
+            high=Count('id', filter=Q(overall_score__gte=HIGH_MATCH_SCORE_THRESHOLD)),
+            average=Avg('overall_score')
+        )
+        total_evaluations = totals['total']
+        high_score_evaluations = totals['high']
+        average_score = totals['average'] or 0
     else:
-        total_evaluations = Evaluation.objects.count()
-        high_score_evaluations = Evaluation.objects.filter(verdict='high').count()
+        # Summed from the per-job stats rows instead of counting evaluations
+        totals = JobScoreStats.objects.aggregate(
+            total=Sum('applicant_count'),
+            high=Sum('high_match_count'),
+            score_sum=Sum('score_sum')
+        )
+        total_evaluations = totals['total'] or 0
+        high_score_evaluations = totals['high'] or 0
+        average_score = (totals['score_sum'] or 0) / total_evaluations if total_evaluations > 0 else 0
     
-    return Response({
+    by_recommendation = dict(
+        evaluations.order_by().values_list('recommendation').annotate(count=Count('id'))
+    )
+    
+    return {
         'total_evaluations': total_evaluations,
         'high_score_evaluations': high_score_evaluations,
-        'success_rate': (high_score_evaluations / total_evaluations * 100) if total_evaluations > 0 else 0
-    })
+        'success_rate': (high_score_evaluations / total_evaluations * 100) if total_evaluations > 0 else 0,
+        'average_score': round(average_score, 2),
+        'by_recommendation': by_recommendation
+    }
 
 
+USAGE_GROUPINGS = {
+    'job': ['job_description_id', 'job_description__title'],
+    'day': ['day'],
+    'model': ['model', 'call_type'],
+}
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def llm_usage_stats(request):
+    """Aggregate LLM/embedding token usage, cost and latency by job, day or model"""
+    if request.user.role == 'student':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    group_by = request.query_params.get('group_by', 'day')
+    if group_by not in USAGE_GROUPINGS:
+        return Response(
+            {'error': f"group_by must be one of: {', '.join(USAGE_GROUPINGS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    usage = LLMUsage.objects.all()
+    job_id = request.query_params.get('job')
+    if job_id:
+        usage = usage.filter(job_description_id=job_id)
+    model = request.query_params.get('model')
+    if model:
+        usage = usage.filter(model=model)
+    
+    rows = usage.annotate(day=TruncDate('created_at')).values(
+        *USAGE_GROUPINGS[group_by]
+    ).annotate(
+        calls=Count('id'),
+        evaluations=Count('evaluation', distinct=True),
+        prompt_tokens=Sum('prompt_tokens'),
+        completion_tokens=Sum('completion_tokens'),
+        cached_tokens=Sum('cached_tokens'),
+        retries=Sum('retries'),
+        failed_calls=Count('id', filter=Q(succeeded=False)),
+        avg_latency=Avg('latency'),
+        estimated_cost=Sum('estimated_cost')
+    ).order_by(*USAGE_GROUPINGS[group_by])
+    
+    return Response({'group_by': group_by, 'results': list(rows)})
+
 # Job Application Views
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -225,12 +362,19 @@ def my_applications(request):
     if request.user.role != 'student':
         return Response({'error': 'Only students can view their applications'}, status=status.HTTP_403_FORBIDDEN)
     
-    applications = JobApplication.objects.filter(student=request.user).select_related('job', 'resume')
+    # The evaluation score (one per resume and job) is read in the same query
+    evaluation_score = Evaluation.objects.filter(
+        resume=OuterRef('resume'),
+        job_description=OuterRef('job')
+    ).values('overall_score')[:1]
+    applications = JobApplication.objects.filter(student=request.user).select_related(
+        'job', 'job__score_stats', 'resume'
+    ).annotate(evaluation_score=Subquery(evaluation_score))
     
     data = []
     for app in applications:
-        # Get evaluation if exists
-        evaluation = Evaluation.objects.filter(resume=app.resume, job_description=app.job).first()
+        job_stats = getattr(app.job, 'score_stats', None)
+        score = app.evaluation_score
         
         data.append({
             'id': app.id,
@@ -247,7 +391,9 @@ def my_applications(request):
             'status': app.status,
             'status_display': app.get_status_display(),
             'applied_at': app.applied_at,
-            'evaluation_score': evaluation.overall_score if evaluation else None,
+            'evaluation_score': score,
+            # Share of applicants to the job scoring below this one
+            'score_percentile': job_stats.percentile(score) if score is not None and job_stats else None,
             'notes': app.notes,
         })
     
@@ -323,7 +469,7 @@ def check_application_status(request, job_id):
             'application_id': application.id,
             'status': application.status,
             'status_display': application.get_status_display(),
-            'resume_id': application.resume.id,
+            'resume_id': application.resume_id,
             'applied_at': application.applied_at
         })
     
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_jobdescription_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='parser_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
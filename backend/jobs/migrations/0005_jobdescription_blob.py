@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_jobdescription_parser_version'),
+        ('utils', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_descriptions', to='utils.storedblob'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_jobdescription_blob'),
+        ('utils', '0002_resourceversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobdescription',
+            index=models.Index(fields=['is_active', 'priority'], name='job_active_priority_idx'),
+        ),
+    ]
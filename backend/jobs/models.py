@@ -1,9 +1,28 @@
 # jobs/models.py
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from utils.write_behind import STORAGE_STATUS_CHOICES
 
 User = get_user_model()
 
+# Evaluation scores counted as a match / a high match
+MATCH_SCORE_THRESHOLD = 50
+HIGH_MATCH_SCORE_THRESHOLD = 70
+
+class JobDescriptionQuerySet(models.QuerySet):
+    def with_candidate_counts(self):
+        """Annotate the evaluation counters shown with each job, in the same query
+
+        The counts come from the job's evaluations.JobScoreStats row, which is
+        kept up to date on every evaluation write.
+        """
+        return self.select_related('uploaded_by', 'blob').annotate(
+            applied_candidates=Coalesce('score_stats__applicant_count', 0),
+            matched_candidates=Coalesce('score_stats__matched_count', 0),
+            high_match_candidates=Coalesce('score_stats__high_match_count', 0),
+        )
+
 class JobDescription(models.Model):
     PRIORITY_CHOICES = [
         ('high', 'High'),
@@ -14,6 +33,20 @@ class JobDescription(models.Model):
     title = models.CharField(max_length=200)
     company_name = models.CharField(max_length=100)
     job_description_file = models.FileField(upload_to='job_descriptions/')
+    # Write-behind storage: the upload is kept in local_path until the copy to
+    # the remote backend (settings.FILE_STORAGE_BACKEND) is confirmed
+    local_path = models.CharField(max_length=500, blank=True)
+    remote_name = models.CharField(max_length=500, blank=True)
+    remote_url = models.URLField(max_length=500, blank=True)
+    storage_status = models.CharField(max_length=20, choices=STORAGE_STATUS_CHOICES, default='uploaded')
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of file bytes
+    blob = models.ForeignKey(
+        'utils.StoredBlob',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='job_descriptions'  # shared copy of these bytes (utils.blob_store)
+    )
     raw_text = models.TextField(blank=True)  # Extracted text
     
     # Parsed fields
@@ -23,6 +56,7 @@ class JobDescription(models.Model):
     qualifications = models.JSONField(default=list)  # List of qualifications
     experience_required = models.CharField(max_length=50, blank=True)
     location = models.CharField(max_length=100, blank=True)
+    parser_version = models.PositiveIntegerField(default=0)  # jobs.utils.PARSER_VERSION used for the parsed fields
     
     # New field for number of positions
     positions_required = models.PositiveIntegerField(default=1, help_text="Number of students/candidates required")
@@ -33,8 +67,13 @@ class JobDescription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = JobDescriptionQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} - {self.company_name}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'priority'], name='job_active_priority_idx'),
+        ]
\ No newline at end of file
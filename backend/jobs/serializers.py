@@ -2,10 +2,33 @@
 from rest_framework import serializers
 from .models import JobDescription
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from utils.blob_store import acquire_existing_blob
+from utils.fieldsets import SparseFieldsetMixin
+from utils.hashing import read_and_hash
+from utils.write_behind import point_at_blob, save_local, schedule_remote_copy
 
 User = get_user_model()
 
-class JobDescriptionSerializer(serializers.ModelSerializer):
+def job_file_url(job, request):
+    """Where a job description's file can be fetched from, following its write-behind upload"""
+    # Remote copy once the write-behind upload is confirmed
+    if job.storage_status == 'uploaded' and job.remote_url:
+        if request and job.remote_url.startswith('/'):
+            return request.build_absolute_uri(job.remote_url)  # local stand-in backend
+        return job.remote_url
+    if job.job_description_file:
+        if request:
+            return request.build_absolute_uri(job.job_description_file.url)
+    elif job.blob_id and job.blob.url:
+        # Stored on a backend other than the default storage
+        if request and job.blob.url.startswith('/'):
+            return request.build_absolute_uri(job.blob.url)  # local stand-in backend
+        return job.blob.url
+    return None
+
+class JobDescriptionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
     uploaded_by_details = serializers.SerializerMethodField()
     file_url = serializers.SerializerMethodField()
     matched_candidates_count = serializers.SerializerMethodField()
@@ -20,10 +43,14 @@ class JobDescriptionSerializer(serializers.ModelSerializer):
             'qualifications', 'experience_required', 'location', 'priority',
             'positions_required', 'matched_candidates_count', 'applied_candidates_count',
             'high_match_count',
-            'uploaded_by', 'uploaded_by_details', 'is_active', 'created_at', 'updated_at'
+            'uploaded_by', 'uploaded_by_username', 'uploaded_by_details', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['uploaded_by', 'raw_text', 'role_title', 'must_have_skills',
                            'good_to_have_skills', 'qualifications', 'created_at', 'updated_at']
+        # utils.fieldsets
+        expandable_fields = ['raw_text']
+        deferrable_fields = ['raw_text', 'must_have_skills', 'good_to_have_skills', 'qualifications']
+        select_related_fields = ['uploaded_by', 'blob']
 
     def get_uploaded_by_details(self, obj):
         return {
@@ -33,26 +60,33 @@ class JobDescriptionSerializer(serializers.ModelSerializer):
         }
     
     def get_file_url(self, obj):
-        if obj.job_description_file:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.job_description_file.url)
-        return None
+        return job_file_url(obj, self.context.get('request'))
+    
+    def _candidate_count(self, obj, name):
+        # Annotated by JobDescription.objects.with_candidate_counts(); a job
+        # loaded without it (e.g. nested in evaluations) costs one query per
+        # distinct job in the response
+        if not hasattr(obj, name):
+            fetched = self.context.setdefault('job_candidate_counts', {})
+            if obj.pk not in fetched:
+                fetched[obj.pk] = JobDescription.objects.filter(pk=obj.pk).with_candidate_counts().values(
+                    'applied_candidates', 'matched_candidates', 'high_match_candidates'
+                ).first() or {}
+            for field, value in fetched[obj.pk].items():
+                setattr(obj, field, value)
+        return getattr(obj, name, 0)
     
     def get_matched_candidates_count(self, obj):
-        # Get count of evaluations for this job with score >= 50
-        from evaluations.models import Evaluation
-        return Evaluation.objects.filter(job_description=obj, overall_score__gte=50).count()
+        # Evaluations for this job with score >= 50
+        return self._candidate_count(obj, 'matched_candidates')
     
     def get_applied_candidates_count(self, obj):
-        # Get count of all evaluations (applications) for this job
-        from evaluations.models import Evaluation
-        return Evaluation.objects.filter(job_description=obj).count()
+        # All evaluations (applications) for this job
+        return self._candidate_count(obj, 'applied_candidates')
     
     def get_high_match_count(self, obj):
-        # Get count of evaluations with score >= 70
-        from evaluations.models import Evaluation
-        return Evaluation.objects.filter(job_description=obj, overall_score__gte=70).count()
+        # Evaluations with score >= 70
+        return self._candidate_count(obj, 'high_match_candidates')
 
 class JobDescriptionCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -81,8 +115,26 @@ class JobDescriptionCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data['uploaded_by'] = self.context['request'].user
-        job = JobDescription.objects.create(**validated_data)
-        # TODO: Trigger background processing task to extract text and parse
+        uploaded_file = validated_data.pop('job_description_file')
+        data, content_hash = read_and_hash(uploaded_file)
+        
+        # Identical files share one stored copy; new bytes are written to local
+        # disk and copied to remote storage after the transaction commits
+        blob = acquire_existing_blob(content_hash)
+        job = JobDescription(content_hash=content_hash, **validated_data)
+        if blob is None:
+            job.local_path = save_local(f'job_descriptions/{uploaded_file.name}', ContentFile(data))
+            job.storage_status = 'pending'
+        job.save()
+        
+        if blob:
+            point_at_blob(JobDescription, job.id, blob, field_name='job_description_file')
+            job.refresh_from_db()
+        else:
+            schedule_remote_copy(JobDescription, job.id, field_name='job_description_file')
+        
+        # Kept for process_job_description_async so it does not download the file again
+        self.uploaded_content = ContentFile(data, name=uploaded_file.name)
         return job
 
 class JobDescriptionUpdateSerializer(serializers.ModelSerializer):
@@ -91,17 +143,6 @@ class JobDescriptionUpdateSerializer(serializers.ModelSerializer):
         fields = ['title', 'company_name', 'experience_required', 'location',
                  'priority', 'is_active', 'must_have_skills', 'good_to_have_skills',
                  'qualifications', 'role_title']
-from rest_framework import serializers
-from .models import JobDescription
-
-class JobDescriptionSerializer(serializers.ModelSerializer):
-    uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
-    
-    class Meta:
-        model = JobDescription
-        fields = '__all__'
-        read_only_fields = ['uploaded_by', 'raw_text', 'role_title', 'must_have_skills', 
-                           'good_to_have_skills', 'qualifications']
 
 class JobDescriptionListSerializer(serializers.ModelSerializer):
     uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
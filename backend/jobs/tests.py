@@ -1,3 +1,164 @@
-from django.test import TestCase
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from evaluations.models import Evaluation
+from resumes.models import Resume
+from utils import write_behind
+from utils.write_behind import copy_to_remote, local_storage, remote_backend
+from .models import JobDescription
+from .serializers import JobDescriptionCreateSerializer, JobDescriptionSerializer
+
+User = get_user_model()
+
+
+class JobUploadTests(TestCase):
+    def setUp(self):
+        spool = tempfile.TemporaryDirectory()
+        remote = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        self.addCleanup(remote.cleanup)
+        settings = override_settings(
+            FILE_STORAGE_BACKEND='local',
+            WRITE_BEHIND_ROOT=spool.name,
+            LOCAL_REMOTE_STORAGE_ROOT=remote.name
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        patcher = mock.patch.object(write_behind, '_local_storage', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.request = SimpleNamespace(user=User.objects.create(username='placement', role='placement_team'))
+
+    def create_job(self, content=b'Backend developer, Python and Django.'):
+        serializer = JobDescriptionCreateSerializer(
+            data={
+                'title': 'Backend Developer',
+                'company_name': 'Acme',
+                'job_description_file': SimpleUploadedFile('job.txt', content),
+            },
+            context={'request': self.request}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.save()
+
+    def test_upload_is_copied_after_commit(self):
+        with mock.patch.object(write_behind.StorageBackend, 'save', autospec=True) as save:
+            with self.captureOnCommitCallbacks() as callbacks:
+                job = self.create_job()
+            save.assert_not_called()
+
+        self.assertEqual(job.storage_status, 'pending')
+        self.assertTrue(local_storage().exists(job.local_path))
+        self.assertEqual(len(callbacks), 1)
+
+        # What the queued callback runs; the test keeps its connection open
+        with mock.patch.object(write_behind, 'connection'):
+            self.assertTrue(copy_to_remote(JobDescription._meta.label, job.id, 'job_description_file'))
+
+        job.refresh_from_db()
+        self.assertEqual(job.storage_status, 'uploaded')
+        self.assertEqual(job.local_path, '')
+        self.assertTrue(remote_backend().storage.exists(job.remote_name))
+
+    def test_known_bytes_reuse_the_stored_copy(self):
+        first = self.create_job()
+        with mock.patch.object(write_behind, 'connection'):
+            copy_to_remote(JobDescription._meta.label, first.id, 'job_description_file')
+        first.refresh_from_db()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            second = self.create_job()
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(second.storage_status, 'uploaded')
+        self.assertEqual(second.blob_id, first.blob_id)
+        self.assertEqual(second.remote_name, first.remote_name)
+
+
+class JobListQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.owner = User.objects.create(username='placement', role='placement_team')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def add_jobs(self, count):
+        for index in range(count):
+            job = JobDescription.objects.create(title=f'Job {index}', company_name='Acme',
+                                                uploaded_by=self.owner, raw_text='Python')
+            for score in (40, 70, 90):
+                resume = Resume.objects.create(user=self.owner, file_name='cv.pdf', file_size=1)
+                Evaluation.objects.create(resume=resume, job_description=job, overall_score=score)
+
+    def list_jobs(self):
+        cache.clear()  # build the body rather than serve it from the cache
+        return self.client.get('/api/jobs/')
+
+    def test_query_count_does_not_grow_with_the_jobs(self):
+        # Version lookup for the ETag, then the jobs with their counters
+        self.add_jobs(2)
+        with self.assertNumQueries(2):
+            response = self.list_jobs()
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.add_jobs(5)
+        with self.assertNumQueries(2):
+            response = self.list_jobs()
+        self.assertEqual(len(response.data['results']), 7)
+
+
+class CandidateCountTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username='placement', role='placement_team')
+        self.job = JobDescription.objects.create(title='Backend', company_name='Acme', uploaded_by=self.owner,
+                                                 raw_text='Python')
+        self.empty_job = JobDescription.objects.create(title='Frontend', company_name='Acme',
+                                                       uploaded_by=self.owner, raw_text='React')
+        self.evaluations = []
+        for score in (30, 50, 69, 70, 95):
+            resume = Resume.objects.create(user=self.owner, file_name='cv.pdf', file_size=1)
+            self.evaluations.append(
+                Evaluation.objects.create(resume=resume, job_description=self.job, overall_score=score)
+            )
+
+    def counts(self, job):
+        job = JobDescription.objects.with_candidate_counts().get(pk=job.pk)
+        return job.applied_candidates, job.matched_candidates, job.high_match_candidates
+
+    def test_counters_follow_the_thresholds(self):
+        # matched: score >= 50, high match: score >= 70
+        self.assertEqual(self.counts(self.job), (5, 4, 2))
+        self.assertEqual(self.counts(self.empty_job), (0, 0, 0))
+
+    def test_counters_follow_evaluation_writes(self):
+        evaluation = self.evaluations[0]
+        evaluation.overall_score = 80
+        evaluation.save()
+        self.assertEqual(self.counts(self.job), (5, 5, 3))
+
+        self.evaluations[-1].delete()
+        self.assertEqual(self.counts(self.job), (4, 4, 2))
+
+    def test_serializer_reads_the_annotations(self):
+        job = JobDescription.objects.with_candidate_counts().get(pk=self.job.pk)
+        with self.assertNumQueries(0):
+            data = JobDescriptionSerializer(job).data
+        self.assertEqual(
+            (data['applied_candidates_count'], data['matched_candidates_count'], data['high_match_count']),
+            (5, 4, 2)
+        )
+
+        # A job loaded without the annotations looks them up once
+        job = JobDescription.objects.select_related('uploaded_by', 'blob').get(pk=self.job.pk)
+        with self.assertNumQueries(1):
+            data = JobDescriptionSerializer(job).data
+        self.assertEqual(data['applied_candidates_count'], 5)
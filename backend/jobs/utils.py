@@ -1,8 +1,10 @@
 # jobs/utils.py
 import os
-import PyPDF2
-import docx
 import re
+from io import BytesIO
+from django.core.files import File
+from utils.hashing import compute_sha256
+from utils.write_behind import backend_named, local_storage
 
 def extract_text_from_job_file(file):
     """Extract text from job description file"""
@@ -22,6 +24,9 @@ def extract_text_from_job_file(file):
 
 def extract_text_from_pdf(file):
     """Extract text from PDF file"""
+    # Imported here so worker boot does not pay for the PDF/DOCX libraries
+    import PyPDF2
+    
     try:
         pdf_reader = PyPDF2.PdfReader(file)
         text = ""
@@ -33,6 +38,8 @@ def extract_text_from_pdf(file):
 
 def extract_text_from_docx(file):
     """Extract text from DOCX file"""
+    import docx
+    
     try:
         doc = docx.Document(file)
         text = ""
@@ -126,26 +133,86 @@ def parse_job_description(text):
     
     return parsed_data
 
-def process_job_description_async(job_id):
-    """Background task to process job description"""
+# Bump whenever parse_job_description changes its output so that
+# `manage.py reparse --outdated` picks up rows parsed by the old code.
+PARSER_VERSION = 1
+
+PARSED_FIELDS = ['role_title', 'must_have_skills', 'good_to_have_skills', 'qualifications']
+
+def find_cached_extraction(content_hash, exclude_id=None):
+    """Return an already processed job description with identical file bytes, if any"""
+    from .models import JobDescription
+    
+    if not content_hash:
+        return None
+    
+    cached = JobDescription.objects.filter(
+        content_hash=content_hash
+    ).exclude(raw_text='').only('title', 'raw_text', 'parser_version', *PARSED_FIELDS)
+    if exclude_id is not None:
+        cached = cached.exclude(id=exclude_id)
+    return cached.first()
+
+def apply_parsed_fields(job, parsed_data):
+    """Copy parsed data onto a job and return the names of the fields that changed"""
+    parsed_data = dict(parsed_data, role_title=parsed_data['role_title'] or job.title)
+    
+    changed = []
+    for field in PARSED_FIELDS:
+        if getattr(job, field) != parsed_data[field]:
+            setattr(job, field, parsed_data[field])
+            changed.append(field)
+    if job.parser_version != PARSER_VERSION:
+        job.parser_version = PARSER_VERSION
+        changed.append('parser_version')
+    return changed
+
+def open_job_file(job):
+    """The job's original file, from local disk while its upload is pending, its FileField or its shared blob"""
+    if job.local_path and local_storage().exists(job.local_path):
+        return local_storage().open(job.local_path, 'rb')
+    if job.job_description_file or not job.blob_id:
+        return job.job_description_file
+    content = BytesIO()
+    backend_named(job.blob.backend).copy_to(job.blob.storage_name, content)
+    content.seek(0)
+    return File(content, name=job.blob.storage_name)
+
+def process_job_description_async(job_id, file_obj=None):
+    """Background task to process job description
+    
+    ``file_obj`` is the uploaded file when the caller still has its bytes,
+    so they are not fetched back from storage.
+    """
     from .models import JobDescription
     
     try:
         job = JobDescription.objects.get(id=job_id)
+        if file_obj is None:
+            file_obj = open_job_file(job)
+        
+        if not job.content_hash:
+            job.content_hash = compute_sha256(file_obj)
+        
+        cached = find_cached_extraction(job.content_hash, exclude_id=job.id)
+        if cached and cached.parser_version == PARSER_VERSION:
+            # Identical bytes were already parsed; reuse the result
+            job.raw_text = cached.raw_text
+            parsed_data = {field: getattr(cached, field) for field in PARSED_FIELDS}
+            if cached.role_title == cached.title:
+                # The cached title was a fallback, not parsed from the file
+                parsed_data['role_title'] = ''
+        else:
+            # Extract text (the cached text is still valid for an outdated parse)
+            job.raw_text = cached.raw_text if cached else extract_text_from_job_file(file_obj)
+            
+            # Parse content
+            parsed_data = parse_job_description(job.raw_text)
         
-        # Extract text
-        job.raw_text = extract_text_from_job_file(job.job_description_file)
-        
-        # Parse content
-        parsed_data = parse_job_description(job.raw_text)
-        
-        job.role_title = parsed_data['role_title'] or job.title
-        job.must_have_skills = parsed_data['must_have_skills']
-        job.good_to_have_skills = parsed_data['good_to_have_skills']
-        job.qualifications = parsed_data['qualifications']
+        changed_fields = apply_parsed_fields(job, parsed_data)
         
-        job.save()
+        job.save(update_fields=['content_hash', 'raw_text', 'updated_at', *changed_fields])
         
     except Exception as e:
         # Log error but don't fail completely
-        print(f"Error processing job description {job_id}: {str(e)}")
\ No newline at end of file
+        print(f"Error processing job description {job_id}: {str(e)}")
@@ -13,21 +13,27 @@ from .serializers import (
     JobDescriptionUpdateSerializer
 )
 from .utils import process_job_description_async
+from utils.fieldsets import sparse_queryset
+from utils.pagination import KeysetPagination
+from utils.versioning import versioned_response
 import io
-try:
-    import openpyxl
-    from openpyxl.styles import Font, Alignment, PatternFill
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
+from importlib.util import find_spec
+
+# openpyxl is only imported when a spreadsheet is actually exported
+EXCEL_AVAILABLE = find_spec('openpyxl') is not None
 
 class JobDescriptionListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
     
     def get(self, request):
+        # Counters come from evaluations, so both versions are part of the ETag
+        return versioned_response(request, ['jobs', 'evaluations'], lambda: self.list_jobs(request))
+    
+    def list_jobs(self, request):
         # Filter active jobs by default
-        jobs = JobDescription.objects.filter(is_active=True)
+        # Counters and uploader are fetched in the same query as the jobs
+        jobs = JobDescription.objects.filter(is_active=True).with_candidate_counts()
         
         # Allow filtering by priority, company, etc.
         priority = request.query_params.get('priority')
@@ -38,8 +44,10 @@ class JobDescriptionListCreateView(APIView):
         if company:
             jobs = jobs.filter(company_name__icontains=company)
         
-        serializer = JobDescriptionSerializer(jobs, many=True, context={'request': request})
-        return Response(serializer.data)
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(sparse_queryset(jobs, JobDescriptionSerializer, request), request)
+        serializer = JobDescriptionSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data).data
     
     def post(self, request):
         # Only placement team and admin can create jobs
@@ -54,7 +62,7 @@ class JobDescriptionListCreateView(APIView):
             job = serializer.save()
             # Trigger background processing
             try:
-                process_job_description_async(job.id)
+                process_job_description_async(job.id, file_obj=serializer.uploaded_content)
             except Exception as e:
                 print(f"Error processing job description: {e}")
             
@@ -66,7 +74,8 @@ class JobDescriptionDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, pk):
-        job = get_object_or_404(JobDescription, pk=pk)
+        jobs = sparse_queryset(JobDescription.objects.with_candidate_counts(), JobDescriptionSerializer, request)
+        job = get_object_or_404(jobs, pk=pk)
         serializer = JobDescriptionSerializer(job, context={'request': request})
         return Response(serializer.data)
     
@@ -102,17 +111,36 @@ class JobDescriptionDetailView(APIView):
 @permission_classes([permissions.IsAuthenticated])
 def job_stats(request):
     """Get job statistics for dashboard"""
+    return versioned_response(request, ['jobs'], count_jobs)
+
+def count_jobs():
     active_jobs = JobDescription.objects.filter(is_active=True).count()
     high_priority_jobs = JobDescription.objects.filter(
         is_active=True, 
         priority='high'
     ).count()
     
-    return Response({
+    return {
         'active_jobs': active_jobs,
         'high_priority_jobs': high_priority_jobs,
         'total_jobs': JobDescription.objects.count()
-    })
+    }
+
+def score_stats_summary(job):
+    """Score distribution for a job from its maintained stats row (no scan of evaluations)"""
+    from evaluations.models import JobScoreStats, empty_histogram
+    
+    stats = JobScoreStats.objects.filter(job_description=job).first() or JobScoreStats(
+        job_description=job, histogram=empty_histogram()
+    )
+    return {
+        'applicants': stats.applicant_count,
+        'matched': stats.matched_count,
+        'high_match': stats.high_match_count,
+        'mean_score': stats.mean_score,
+        'max_score': stats.max_score,
+        'histogram': stats.histogram,  # counts for scores 0-9, 10-19, ..., 90-100
+    }
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -130,12 +158,15 @@ def job_matched_candidates(request, pk):
     from evaluations.models import Evaluation
     from evaluations.serializer import EvaluationSerializer
     
-    # Get all evaluations for this job, sorted by score descending
-    evaluations = Evaluation.objects.filter(
-        job_description=job
-    ).select_related('resume', 'resume__user').order_by('-overall_score')
+    # Evaluations for this job, sorted by score descending, one page at a time
+    evaluations = sparse_queryset(
+        Evaluation.objects.filter(job_description=job), EvaluationSerializer, request
+    )
+    paginator = KeysetPagination(ordering=('-overall_score', '-id'))
+    page = paginator.paginate_queryset(evaluations, request)
     
-    serializer = EvaluationSerializer(evaluations, many=True, context={'request': request})
+    serializer = EvaluationSerializer(page, many=True, context={'request': request})
+    score_stats = score_stats_summary(job)
     
     return Response({
         'job': {
@@ -144,8 +175,11 @@ def job_matched_candidates(request, pk):
             'company_name': job.company_name,
             'positions_required': job.positions_required
         },
-        'total_candidates': evaluations.count(),
-        'candidates': serializer.data
+        'total_candidates': score_stats['applicants'],
+        'score_stats': score_stats,
+        'candidates': serializer.data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link()
     })
 
 @api_view(['GET'])
@@ -160,6 +194,8 @@ def export_job_candidates_excel(request, pk):
     
     job = get_object_or_404(JobDescription, pk=pk)
     
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, PatternFill
     from evaluations.models import Evaluation
     
     # Get export type (matched, all, or shortlist)
@@ -288,8 +324,10 @@ def get_all_applied_resumes(request, pk):
         job_description=job
     ).values_list('resume_id', flat=True)
     
-    resumes = Resume.objects.filter(id__in=evaluated_resume_ids)
-    serializer = ResumeSerializer(resumes, many=True, context={'request': request})
+    resumes = sparse_queryset(Resume.objects.filter(id__in=evaluated_resume_ids), ResumeSerializer, request)
+    paginator = KeysetPagination(ordering=('-created_at', '-id'))
+    page = paginator.paginate_queryset(resumes, request)
+    serializer = ResumeSerializer(page, many=True, context={'request': request})
     
     return Response({
         'job': {
@@ -297,6 +335,8 @@ def get_all_applied_resumes(request, pk):
             'title': job.title,
             'company_name': job.company_name
         },
-        'total_applied': resumes.count(),
-        'resumes': serializer.data
+        'total_applied': score_stats_summary(job)['applicants'],
+        'resumes': serializer.data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link()
     })
@@ -9,14 +9,37 @@ load_dotenv(os.path.join(settings.BASE_DIR, '.env'))
 
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-print("OPENAI_API_KEY loaded:", OPENAI_API_KEY)
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
 
 # Sentence Transformers Model for embeddings
 EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
 
+# Retries for transient OpenAI errors (rate limits, timeouts, 5xx)
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+LLM_RETRY_BACKOFF_SECONDS = 1.0
+
+# Threads used to run independent evaluation stages (embeddings, LLM call) concurrently
+EVALUATION_STAGE_WORKERS = int(os.getenv('EVALUATION_STAGE_WORKERS', '4'))
+
+# Price per 1M tokens in USD, used to estimate the cost of each call.
+# Dated snapshots ('gpt-4o-mini-2024-07-18') are priced as their base model;
+# models missing from this table cost 0 and are logged once.
+MODEL_PRICING = {
+    'gpt-4o-mini': {'input': 0.15, 'cached_input': 0.075, 'output': 0.60},
+    'gpt-4o': {'input': 2.50, 'cached_input': 1.25, 'output': 10.00},
+    'gpt-4.1-mini': {'input': 0.40, 'cached_input': 0.10, 'output': 1.60},
+    'gpt-4.1': {'input': 2.00, 'cached_input': 0.50, 'output': 8.00},
+    EMBEDDING_MODEL: {'input': 0.0, 'output': 0.0},  # runs locally
+}
+
 # ChromaDB Configuration
 CHROMA_PERSIST_DIRECTORY = os.path.join(settings.BASE_DIR, 'chroma_db')
+# Upserts are queued and written by one background thread per process, in
+# batches of up to CHROMA_WRITE_BATCH_SIZE or every CHROMA_FLUSH_INTERVAL_SECONDS.
+CHROMA_WRITE_BATCH_SIZE = int(os.getenv('CHROMA_WRITE_BATCH_SIZE', '64'))
+CHROMA_FLUSH_INTERVAL_SECONDS = float(os.getenv('CHROMA_FLUSH_INTERVAL_SECONDS', '2.0'))
+# Journaled upserts are folded into the memory-mapped snapshot once this many accumulate
+EMBEDDING_SNAPSHOT_COMPACT_AFTER = int(os.getenv('EMBEDDING_SNAPSHOT_COMPACT_AFTER', '1000'))
 
 # Evaluation Scoring Weights
 SCORING_WEIGHTS = {
@@ -28,17 +51,17 @@ SCORING_WEIGHTS = {
 }
 
 # LLM Prompts
-RESUME_ANALYSIS_PROMPT = """
-You are an expert HR professional and resume analyst. Analyze the following resume against the job description and provide detailed feedback.
-
-Resume Content:
-{resume_text}
-
-Job Description:
-{job_description}
+# Resume analysis is sent as three messages ordered from most to least shared:
+#   1. RESUME_ANALYSIS_SYSTEM_PROMPT - identical for every call
+#   2. RESUME_ANALYSIS_JOB_PROMPT    - identical for every candidate of one job
+#   3. RESUME_ANALYSIS_RESUME_PROMPT - the only per-candidate part
+# Keeping the resume last gives all applicants of a job a byte-identical
+# prefix, which the provider can serve from its prompt cache.
+RESUME_ANALYSIS_SYSTEM_PROMPT = """
+You are an expert HR professional and resume analyst. Analyze the resume against the job description and provide detailed feedback.
 
 Please provide your analysis in the following JSON format:
-{{
+{
     "overall_score": <score out of 100>,
     "hard_skills_score": <score out of 100>,
     "soft_skills_score": <score out of 100>,
@@ -61,7 +84,7 @@ Please provide your analysis in the following JSON format:
     ],
     "overall_recommendation": "highly_recommended|recommended|consider|not_recommended",
     "detailed_feedback": "Comprehensive paragraph explaining the evaluation and providing specific advice for the candidate."
-}}
+}
 
 Focus on:
 1. Technical skills alignment with job requirements
@@ -72,6 +95,18 @@ Focus on:
 6. Specific actionable recommendations for improvement
 """
 
+RESUME_ANALYSIS_JOB_PROMPT = """
+Job Description:
+{job_description}
+"""
+
+RESUME_ANALYSIS_RESUME_PROMPT = """
+Resume Content:
+{resume_text}
+
+Analyze this resume against the job description above and respond with the JSON object only.
+"""
+
 SKILL_EXTRACTION_PROMPT = """
 Extract all technical skills, tools, technologies, and relevant keywords from the following text.
 Return only a JSON array of strings, no other text.
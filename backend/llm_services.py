@@ -2,23 +2,28 @@
 LLM Services for Resume Analysis and Recommendations
 """
 
+import hashlib
 import json
 import os
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-import openai
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
 from llm_config import (
     OPENAI_API_KEY, OPENAI_MODEL, EMBEDDING_MODEL, CHROMA_PERSIST_DIRECTORY,
-    SCORING_WEIGHTS, RESUME_ANALYSIS_PROMPT, SKILL_EXTRACTION_PROMPT
+    SCORING_WEIGHTS, RESUME_ANALYSIS_SYSTEM_PROMPT, RESUME_ANALYSIS_JOB_PROMPT,
+    RESUME_ANALYSIS_RESUME_PROMPT, SKILL_EXTRACTION_PROMPT, LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF_SECONDS, EVALUATION_STAGE_WORKERS, CHROMA_WRITE_BATCH_SIZE,
+    CHROMA_FLUSH_INTERVAL_SECONDS, EMBEDDING_SNAPSHOT_COMPACT_AFTER
 )
+from embedding_snapshot import EmbeddingSnapshot
+from embedding_writer import ChromaWriter
+from llm_usage import CallUsage, UsageRecorder, usage_from_response
 
 logger = logging.getLogger(__name__)
 
@@ -38,32 +43,108 @@ class AnalysisResult:
     overall_recommendation: str
     detailed_feedback: str
     semantic_similarity_score: float = 0.0
+    # Token usage reported by the provider: prompt_tokens, completion_tokens, cached_tokens
+    usage: Dict[str, int] = field(default_factory=dict)
+    # Embeddings computed during evaluation, reused when storing them in ChromaDB
+    resume_embedding: Optional[np.ndarray] = None
+    job_embedding: Optional[np.ndarray] = None
 
 class LLMService:
     """Service class for OpenAI LLM interactions"""
     
     def __init__(self):
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        # The SDK is imported here rather than at module level: it adds
+        # ~0.4s to every process that merely imports this module
+        import openai
+        
+        # Retries are handled in _chat_completion so they can be counted
+        self.client = openai.OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
         self.model = OPENAI_MODEL
+        self.retryable_errors = (
+            openai.RateLimitError,
+            openai.APIConnectionError,
+            openai.APITimeoutError,
+            openai.InternalServerError,
+        )
+    
+    def _chat_completion(self, operation: str, recorder: Optional[UsageRecorder] = None, **request):
+        """Create a chat completion, retrying transient errors and recording usage"""
+        start_time = time.time()
+        retries = 0
+        
+        while True:
+            try:
+                response = self.client.chat.completions.create(model=self.model, **request)
+                break
+            except self.retryable_errors as e:
+                if retries >= LLM_MAX_RETRIES:
+                    self._record_failure(operation, recorder, start_time, retries)
+                    raise
+                retries += 1
+                logger.warning(f"{operation} attempt {retries} failed, retrying: {str(e)}")
+                time.sleep(LLM_RETRY_BACKOFF_SECONDS * 2 ** (retries - 1))
+            except Exception:
+                self._record_failure(operation, recorder, start_time, retries)
+                raise
+        
+        if recorder is not None:
+            usage = usage_from_response(response)
+            recorder.record(CallUsage(
+                operation=operation,
+                call_type='chat',
+                model=getattr(response, 'model', None) or self.model,
+                prompt_tokens=usage.get('prompt_tokens', 0),
+                completion_tokens=usage.get('completion_tokens', 0),
+                cached_tokens=usage.get('cached_tokens', 0),
+                latency=time.time() - start_time,
+                retries=retries,
+            ))
+        return response
+    
+    def _record_failure(self, operation, recorder, start_time, retries):
+        if recorder is not None:
+            recorder.record(CallUsage(
+                operation=operation,
+                call_type='chat',
+                model=self.model,
+                latency=time.time() - start_time,
+                retries=retries,
+                succeeded=False,
+            ))
+    
+    def build_analysis_messages(self, resume_text: str, job_description: str) -> List[Dict[str, str]]:
+        """
+        Messages for resume analysis. Everything before the resume is identical
+        for all candidates of the same job so it can be served from the
+        provider's prompt cache.
+        """
+        return [
+            {"role": "system", "content": RESUME_ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": RESUME_ANALYSIS_JOB_PROMPT.format(job_description=job_description)},
+            {"role": "user", "content": RESUME_ANALYSIS_RESUME_PROMPT.format(resume_text=resume_text)},
+        ]
     
-    def analyze_resume(self, resume_text: str, job_description: str) -> Optional[AnalysisResult]:
+    def analyze_resume(self, resume_text: str, job_description: str,
+                       cache_key: Optional[str] = None,
+                       recorder: Optional[UsageRecorder] = None) -> Optional[AnalysisResult]:
         """
         Analyze resume against job description using LLM
+        
+        ``cache_key`` (e.g. the job id) is passed to the provider as a prompt
+        cache routing hint so calls sharing a job prefix land on the same cache.
         """
         try:
-            prompt = RESUME_ANALYSIS_PROMPT.format(
-                resume_text=resume_text,
-                job_description=job_description
-            )
+            request_options = {}
+            if cache_key:
+                request_options['extra_body'] = {'prompt_cache_key': cache_key}
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert HR professional and resume analyst."},
-                    {"role": "user", "content": prompt}
-                ],
+            response = self._chat_completion(
+                'analyze_resume',
+                recorder,
+                messages=self.build_analysis_messages(resume_text, job_description),
                 temperature=0.3,
-                max_tokens=2000
+                max_tokens=2000,
+                **request_options
             )
             
             result_text = response.choices[0].message.content
@@ -93,22 +174,24 @@ class LLMService:
                 strengths=result_data.get('strengths', []),
                 areas_for_improvement=result_data.get('areas_for_improvement', []),
                 overall_recommendation=result_data.get('overall_recommendation', 'not_recommended'),
-                detailed_feedback=result_data.get('detailed_feedback', '')
+                detailed_feedback=result_data.get('detailed_feedback', ''),
+                usage=usage_from_response(response)
             )
             
         except Exception as e:
             logger.error(f"LLM analysis failed: {str(e)}")
             return None
     
-    def extract_skills(self, text: str) -> List[str]:
+    def extract_skills(self, text: str, recorder: Optional[UsageRecorder] = None) -> List[str]:
         """
         Extract skills from text using LLM
         """
         try:
             prompt = SKILL_EXTRACTION_PROMPT.format(text=text)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._chat_completion(
+                'extract_skills',
+                recorder,
                 messages=[
                     {"role": "system", "content": "You are a skills extraction expert."},
                     {"role": "user", "content": prompt}
@@ -135,13 +218,30 @@ class EmbeddingService:
     """Service class for handling text embeddings and semantic similarity"""
     
     def __init__(self):
-        self.model = SentenceTransformer(EMBEDDING_MODEL)
+        self._model = None
+        self._model_lock = threading.Lock()
         self.chroma_client = None
+        self.writer = None
+        self.resume_snapshot = None
+        # (collection, id) -> content hash of the text last stored for it
+        self._stored_hashes: Dict[Tuple[str, str], str] = {}
         self._setup_chroma()
     
+    @property
+    def model(self):
+        """SentenceTransformer, loaded on first use (importing torch takes seconds)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(EMBEDDING_MODEL)
+        return self._model
+    
     def _setup_chroma(self):
         """Initialize ChromaDB client"""
         try:
+            import chromadb
+            
             # Create directory if it doesn't exist
             os.makedirs(CHROMA_PERSIST_DIRECTORY, exist_ok=True)
             
@@ -161,68 +261,138 @@ class EmbeddingService:
                 metadata={"description": "Job description embeddings for semantic search"}
             )
             
+            self.writer = ChromaWriter(
+                {"resumes": self.resume_collection, "job_descriptions": self.job_collection},
+                lock_path=os.path.join(CHROMA_PERSIST_DIRECTORY, '.write.lock'),
+                batch_size=CHROMA_WRITE_BATCH_SIZE,
+                flush_interval=CHROMA_FLUSH_INTERVAL_SECONDS,
+                journal_dir=CHROMA_PERSIST_DIRECTORY,
+                compact_after=EMBEDDING_SNAPSHOT_COMPACT_AFTER,
+                on_dropped=self._forget_dropped
+            )
+            
+            # Memory-mapped copy of the resume vectors for similarity search;
+            # opening it does not load Chroma's HNSW index
+            self.resume_snapshot = EmbeddingSnapshot.open(CHROMA_PERSIST_DIRECTORY, "resumes")
+            
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB: {str(e)}")
             self.chroma_client = None
     
-    def get_embedding(self, text: str) -> np.ndarray:
+    def _count_tokens(self, text: str) -> int:
+        """Tokens seen by the embedding model (it truncates to max_seq_length)"""
+        try:
+            token_count = len(self.model.tokenizer(text)['input_ids'])
+            return min(token_count, self.model.max_seq_length)
+        except Exception:
+            return (len(text) + 3) // 4
+    
+    def get_embedding(self, text: str, recorder: Optional[UsageRecorder] = None) -> np.ndarray:
         """Generate embedding for text"""
+        start_time = time.time()
         try:
             embedding = self.model.encode(text)
-            return embedding
+            succeeded = True
         except Exception as e:
             logger.error(f"Failed to generate embedding: {str(e)}")
-            return np.array([])
+            embedding = np.array([])
+            succeeded = False
+        
+        if recorder is not None:
+            recorder.record(CallUsage(
+                operation='embedding',
+                call_type='embedding',
+                model=EMBEDDING_MODEL,
+                prompt_tokens=self._count_tokens(text),
+                latency=time.time() - start_time,
+                succeeded=succeeded,
+            ))
+        return embedding
     
-    def calculate_semantic_similarity(self, text1: str, text2: str) -> float:
+    def calculate_semantic_similarity(self, text1: str, text2: str,
+                                      recorder: Optional[UsageRecorder] = None) -> float:
         """Calculate semantic similarity between two texts"""
         try:
-            embedding1 = self.get_embedding(text1)
-            embedding2 = self.get_embedding(text2)
+            embedding1 = self.get_embedding(text1, recorder)
+            embedding2 = self.get_embedding(text2, recorder)
             
             if len(embedding1) == 0 or len(embedding2) == 0:
                 return 0.0
             
-            similarity = cosine_similarity([embedding1], [embedding2])[0][0]
-            return float(similarity)
+            return cosine_similarity_vectors(embedding1, embedding2)
             
         except Exception as e:
             logger.error(f"Failed to calculate semantic similarity: {str(e)}")
             return 0.0
     
-    def store_resume_embedding(self, resume_id: str, resume_text: str):
-        """Store resume embedding in ChromaDB"""
-        if not self.chroma_client:
-            return
+    def _is_unchanged(self, collection, doc_id: str, content_hash: str) -> bool:
+        """True when ``doc_id`` is already stored for text with this content hash"""
+        key = (collection.name, doc_id)
+        if self._stored_hashes.get(key) == content_hash:
+            return True
         
+        # Not seen by this process yet: check the hash kept in Chroma metadata
         try:
-            embedding = self.get_embedding(resume_text)
-            
-            self.resume_collection.upsert(
-                ids=[resume_id],
-                embeddings=[embedding.tolist()],
-                documents=[resume_text],
-                metadatas=[{"resume_id": resume_id}]
-            )
-            
+            existing = collection.get(ids=[doc_id], include=["metadatas"])
+            metadatas = existing.get("metadatas") or []
+            if metadatas and (metadatas[0] or {}).get("content_hash") == content_hash:
+                self._stored_hashes[key] = content_hash
+                return True
         except Exception as e:
-            logger.error(f"Failed to store resume embedding: {str(e)}")
+            logger.warning(f"Failed to read stored embedding {doc_id}: {str(e)}")
+        return False
+    
+    def _forget_dropped(self, collection_name: str, items):
+        """Writer callback: upserts given up on are not stored, so do not skip them next time"""
+        for item in items:
+            key = (collection_name, item.id)
+            if self._stored_hashes.get(key) == item.metadata.get("content_hash"):
+                self._stored_hashes.pop(key, None)
     
-    def store_job_embedding(self, job_id: str, job_description: str):
-        """Store job description embedding in ChromaDB"""
+    def _store_embedding(self, collection, doc_id: str, text: str, metadata: Dict,
+                         recorder: Optional[UsageRecorder], embedding: Optional[np.ndarray]):
+        """Queue an upsert unless the stored embedding was built from the same text
+        
+        Only the vector and metadata are written; the raw text stays in the
+        database and is never duplicated into Chroma.
+        """
         if not self.chroma_client:
             return
         
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        if self._is_unchanged(collection, doc_id, content_hash):
+            return
+        
+        if embedding is None or len(embedding) == 0:
+            embedding = self.get_embedding(text, recorder)
+        if len(embedding) == 0:
+            return
+        
+        self.writer.enqueue(
+            collection.name,
+            doc_id,
+            embedding.tolist(),
+            {**metadata, "content_hash": content_hash}
+        )
+        self._stored_hashes[(collection.name, doc_id)] = content_hash
+    
+    def store_resume_embedding(self, resume_id: str, resume_text: str,
+                               recorder: Optional[UsageRecorder] = None,
+                               embedding: Optional[np.ndarray] = None):
+        """Store resume embedding in ChromaDB (pass ``embedding`` to skip re-encoding)"""
         try:
-            embedding = self.get_embedding(job_description)
-            
-            self.job_collection.upsert(
-                ids=[job_id],
-                embeddings=[embedding.tolist()],
-                documents=[job_description],
-                metadatas=[{"job_id": job_id}]
-            )
-            
+            self._store_embedding(self.resume_collection, resume_id, resume_text,
+                                  {"resume_id": resume_id}, recorder, embedding)
+        except Exception as e:
+            logger.error(f"Failed to store resume embedding: {str(e)}")
+    
+    def store_job_embedding(self, job_id: str, job_description: str,
+                            recorder: Optional[UsageRecorder] = None,
+                            embedding: Optional[np.ndarray] = None):
+        """Store job description embedding in ChromaDB (pass ``embedding`` to skip re-encoding)"""
+        try:
+            self._store_embedding(self.job_collection, job_id, job_description,
+                                  {"job_id": job_id}, recorder, embedding)
         except Exception as e:
             logger.error(f"Failed to store job embedding: {str(e)}")
     
@@ -234,6 +404,18 @@ class EmbeddingService:
         try:
             job_embedding = self.get_embedding(job_description)
             
+            if self.resume_snapshot is not None:
+                self.resume_snapshot.refresh()
+                if len(self.resume_snapshot):
+                    return [
+                        {
+                            'resume_id': resume_id,
+                            'similarity_score': score,
+                            'metadata': {'resume_id': resume_id}
+                        }
+                        for resume_id, score in self.resume_snapshot.query(job_embedding, limit)
+                    ]
+            
             results = self.resume_collection.query(
                 query_embeddings=[job_embedding.tolist()],
                 n_results=limit
@@ -253,28 +435,123 @@ class EmbeddingService:
             logger.error(f"Failed to find similar resumes: {str(e)}")
             return []
 
+class StageGraph:
+    """
+    Small dependency graph of evaluation stages.
+    
+    Each stage is a callable receiving the results of its dependencies as
+    positional arguments. A stage is submitted to the thread pool as soon as
+    all of its dependencies have finished, so independent stages run
+    concurrently and every intermediate result is computed exactly once.
+    """
+    
+    def __init__(self):
+        self.stages: Dict[str, Tuple] = {}
+    
+    def add(self, name: str, func, depends_on: Tuple[str, ...] = ()):
+        self.stages[name] = (func, tuple(depends_on))
+        return self
+    
+    def run(self, executor: ThreadPoolExecutor) -> Dict:
+        for name, (func, depends_on) in self.stages.items():
+            unknown = [dependency for dependency in depends_on if dependency not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(unknown)}")
+        
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        
+        while pending or running:
+            for name, (func, depends_on) in list(pending.items()):
+                if all(dependency in results for dependency in depends_on):
+                    args = [results[dependency] for dependency in depends_on]
+                    running[executor.submit(func, *args)] = name
+                    del pending[name]
+            
+            if not running:
+                raise ValueError(f"Unresolvable stage dependencies: {', '.join(pending)}")
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+        
+        return results
+
+def cosine_similarity_vectors(vector1: np.ndarray, vector2: np.ndarray) -> float:
+    """Cosine similarity of two 1-D vectors (0.0 if either is empty or zero)"""
+    if len(vector1) == 0 or len(vector2) == 0:
+        return 0.0
+    
+    norm = np.linalg.norm(vector1) * np.linalg.norm(vector2)
+    if norm == 0:
+        return 0.0
+    return float(np.dot(vector1, vector2) / norm)
+
+def match_skills(resume_text: str, job_skills: List[str]) -> Tuple[List[str], List[str]]:
+    """Split the job's skills into those mentioned in the resume and those missing"""
+    resume_lower = resume_text.lower()
+    matched, missing = [], []
+    for skill in job_skills:
+        (matched if skill.lower() in resume_lower else missing).append(skill)
+    return matched, missing
+
 class EnhancedScoringService:
     """Enhanced scoring service that combines traditional and LLM-based scoring"""
     
-    def __init__(self):
-        self.llm_service = LLMService()
-        self.embedding_service = EmbeddingService()
+    def __init__(self, llm_service: Optional[LLMService] = None,
+                 embedding_service: Optional[EmbeddingService] = None):
+        # Share the process-wide services so the embedding model is loaded once
+        self.llm_service = llm_service or get_llm_service()
+        self.embedding_service = embedding_service or get_embedding_service()
+        self.executor = ThreadPoolExecutor(
+            max_workers=EVALUATION_STAGE_WORKERS,
+            thread_name_prefix='evaluation-stage'
+        )
     
-    def comprehensive_evaluation(self, resume_text: str, job_description: str) -> AnalysisResult:
+    def comprehensive_evaluation(self, resume_text: str, job_description: str,
+                                 cache_key: Optional[str] = None,
+                                 recorder: Optional[UsageRecorder] = None,
+                                 job_skills: Optional[List[str]] = None) -> AnalysisResult:
         """
         Perform comprehensive evaluation combining LLM analysis and semantic similarity
+        
+        Stages run as a dependency graph: both embeddings, the job's skill
+        list and the LLM analysis start together; similarity waits for the
+        embeddings, the skill match for the skill list, and the merge for
+        everything. Wall-clock time is therefore close to the LLM latency
+        alone. The skill list is ``job_skills`` when the job has parsed
+        skills, and is extracted from the job text with ``extract_skills``
+        otherwise. The embeddings are returned on the result so callers can
+        store them without encoding the texts again.
         """
-        # Get LLM analysis
-        llm_result = self.llm_service.analyze_resume(resume_text, job_description)
+        graph = StageGraph()
+        graph.add('resume_embedding', lambda: self.embedding_service.get_embedding(resume_text, recorder))
+        graph.add('job_embedding', lambda: self.embedding_service.get_embedding(job_description, recorder))
+        graph.add('job_skills', lambda: job_skills or self.llm_service.extract_skills(job_description, recorder))
+        graph.add('skill_match', lambda skills: match_skills(resume_text, skills),
+                  depends_on=('job_skills',))
+        graph.add('llm_analysis', lambda: self.llm_service.analyze_resume(
+            resume_text, job_description, cache_key=cache_key, recorder=recorder
+        ))
+        graph.add('semantic_similarity', cosine_similarity_vectors,
+                  depends_on=('resume_embedding', 'job_embedding'))
+        graph.add('result', self._merge_results,
+                  depends_on=('llm_analysis', 'semantic_similarity', 'skill_match'))
+        
+        results = graph.run(self.executor)
         
+        result = results['result']
+        result.resume_embedding = results['resume_embedding']
+        result.job_embedding = results['job_embedding']
+        return result
+    
+    def _merge_results(self, llm_result: Optional[AnalysisResult], semantic_score: float,
+                       skill_match: Tuple[List[str], List[str]]) -> AnalysisResult:
+        """Combine the LLM analysis with semantic similarity into the final result"""
         if not llm_result:
             # Fallback to basic analysis if LLM fails
-            return self._fallback_analysis(resume_text, job_description)
-        
-        # Calculate semantic similarity
-        semantic_score = self.embedding_service.calculate_semantic_similarity(
-            resume_text, job_description
-        )
+            return self._fallback_analysis(semantic_score, skill_match)
         
         # Convert similarity to 0-100 scale
         semantic_score_scaled = int(semantic_score * 100)
@@ -309,13 +586,9 @@ class EnhancedScoringService:
         
         return int(min(100, max(0, weighted_score)))
     
-    def _fallback_analysis(self, resume_text: str, job_description: str) -> AnalysisResult:
+    def _fallback_analysis(self, semantic_score: float,
+                           skill_match: Tuple[List[str], List[str]] = ([], [])) -> AnalysisResult:
         """Fallback analysis when LLM is not available"""
-        # Basic semantic similarity
-        semantic_score = self.embedding_service.calculate_semantic_similarity(
-            resume_text, job_description
-        )
-        
         base_score = int(semantic_score * 100)
         
         return AnalysisResult(
@@ -324,8 +597,8 @@ class EnhancedScoringService:
             soft_skills_score=max(0, base_score - 10),
             experience_score=max(0, base_score - 5),
             education_score=max(0, base_score - 15),
-            matched_skills=[],
-            missing_skills=[],
+            matched_skills=skill_match[0],
+            missing_skills=skill_match[1],
             recommendations=["LLM service unavailable. Basic semantic analysis performed."],
             strengths=["Resume processed successfully"],
             areas_for_improvement=["Unable to provide detailed analysis"],
@@ -334,7 +607,34 @@ class EnhancedScoringService:
             semantic_similarity_score=semantic_score
         )
 
-# Singleton instances
-llm_service = LLMService()
-embedding_service = EmbeddingService()
-enhanced_scoring_service = EnhancedScoringService()
\ No newline at end of file
+# Singleton instances, created on first use so importing this module stays cheap
+_services = {}
+_services_lock = threading.RLock()  # factories may request other services
+
+def _get_service(name: str, factory):
+    if name not in _services:
+        with _services_lock:
+            if name not in _services:
+                _services[name] = factory()
+    return _services[name]
+
+def get_llm_service() -> LLMService:
+    return _get_service('llm_service', LLMService)
+
+def get_embedding_service() -> EmbeddingService:
+    return _get_service('embedding_service', EmbeddingService)
+
+def get_enhanced_scoring_service() -> EnhancedScoringService:
+    return _get_service('enhanced_scoring_service', EnhancedScoringService)
+
+_SINGLETONS = {
+    'llm_service': get_llm_service,
+    'embedding_service': get_embedding_service,
+    'enhanced_scoring_service': get_enhanced_scoring_service,
+}
+
+def __getattr__(name):
+    # Keeps ``from llm_services import embedding_service`` working
+    if name in _SINGLETONS:
+        return _SINGLETONS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Token, latency and cost accounting for LLM and embedding calls
+
+Kept free of heavy imports so views can record usage without loading the
+embedding model or vector store.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from llm_config import MODEL_PRICING
+
+logger = logging.getLogger(__name__)
+
+_unpriced_models = set()
+
+def usage_from_response(response) -> Dict[str, int]:
+    """Extract token counts, including prompt-cache hits, from an OpenAI response"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return {}
+    
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+        'cached_tokens': (getattr(details, 'cached_tokens', 0) or 0) if details else 0,
+    }
+
+def model_pricing(model: str) -> Optional[Dict[str, float]]:
+    """MODEL_PRICING entry for a model, matching dated snapshots to their base model
+
+    The API reports e.g. 'gpt-4o-mini-2024-07-18' for a 'gpt-4o-mini'
+    request; the longest priced name it extends wins, so it is not priced
+    as 'gpt-4o'.
+    """
+    if model in MODEL_PRICING:
+        return MODEL_PRICING[model]
+    matches = [name for name in MODEL_PRICING if model and model.startswith(name + '-')]
+    if matches:
+        return MODEL_PRICING[max(matches, key=len)]
+    if model not in _unpriced_models:
+        _unpriced_models.add(model)
+        logger.warning(f"No price for model {model!r}; its calls are recorded at $0")
+    return None
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """Estimated USD cost of a call from MODEL_PRICING (0 for unpriced models)"""
+    pricing = model_pricing(model)
+    if not pricing:
+        return 0.0
+    
+    uncached_tokens = max(0, prompt_tokens - cached_tokens)
+    return (
+        uncached_tokens * pricing['input'] +
+        cached_tokens * pricing.get('cached_input', pricing['input']) +
+        completion_tokens * pricing['output']
+    ) / 1_000_000
+
+@dataclass
+class CallUsage:
+    """Token, latency and retry accounting for a single LLM or embedding call"""
+    operation: str  # analyze_resume, extract_skills, embedding
+    call_type: str  # chat or embedding
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency: float = 0.0  # in seconds, including retries
+    retries: int = 0
+    succeeded: bool = True
+    
+    @property
+    def estimated_cost(self) -> float:
+        return estimate_cost(self.model, self.prompt_tokens, self.completion_tokens, self.cached_tokens)
+
+class UsageRecorder:
+    """Collects CallUsage entries for one evaluation (safe to share between threads)"""
+    
+    def __init__(self):
+        self.calls: List[CallUsage] = []
+        self._lock = threading.Lock()
+    
+    def record(self, call: CallUsage):
+        with self._lock:
+            self.calls.append(call)
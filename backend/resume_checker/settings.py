@@ -66,6 +66,7 @@ INSTALLED_APPS = [
     'jobs',
     'resumes',
     'evaluations',
+    'utils',
 ]
 
 MIDDLEWARE = [
@@ -107,9 +108,21 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction starts; a transaction
+            # that reads first and then upgrades can fail with "database is
+            # locked" instead of waiting for the other writer
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# PRAGMAs applied to every SQLite connection (see utils.sqlite_tuning)
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', 'True').lower() == 'true'
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '20000'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -152,18 +165,6 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # WhiteNoise for serving static files in production
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
-# Cloudinary configuration
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-
-cloudinary.config(
-    cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.environ.get('CLOUDINARY_API_KEY'),
-    api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
-    secure=True
-)
-
 # Set Cloudinary as the default file storage
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
@@ -177,7 +178,8 @@ STORAGES = {
     },
 }
 
-# Cloudinary settings
+# Cloudinary settings (cloudinary_storage configures the SDK from these,
+# with secure URLs, the first time the storage is used)
 CLOUDINARY_STORAGE = {
     'CLOUD_NAME': os.environ.get('CLOUDINARY_CLOUD_NAME'),
     'API_KEY': os.environ.get('CLOUDINARY_API_KEY'),
@@ -188,6 +190,35 @@ CLOUDINARY_STORAGE = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Write-behind uploads: files are saved under WRITE_BEHIND_ROOT during the
+# request and copied to FILE_STORAGE_BACKEND ('cloudinary', 'gcs', or 'local'
+# for the filesystem stand-in used in development and tests) afterwards.
+FILE_STORAGE_BACKEND = os.getenv('FILE_STORAGE_BACKEND', 'cloudinary')
+WRITE_BEHIND_ROOT = BASE_DIR / 'upload_spool'
+WRITE_BEHIND_WORKERS = 2
+WRITE_BEHIND_MAX_RETRIES = 5
+WRITE_BEHIND_RETRY_BACKOFF_SECONDS = 2
+LOCAL_REMOTE_STORAGE_ROOT = BASE_DIR / 'media' / 'remote'
+LOCAL_REMOTE_STORAGE_URL = MEDIA_URL + 'remote/'
+# Local copies of remote originals, reused by reprocessing and exports
+ORIGINALS_CACHE_DIR = BASE_DIR / 'cache' / 'originals'
+ORIGINALS_CACHE_MAX_BYTES = int(os.getenv('ORIGINALS_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+# Lifetime of signed URLs handed out by `download/?redirect=1`
+DOWNLOAD_URL_EXPIRY_SECONDS = 300
+
+# Cached bodies of ETag-versioned read endpoints (utils.versioning). Entries
+# are keyed by resource version, so they never go stale; with the default
+# per-process cache each worker fills its own copy.
+VERSIONED_RESPONSE_CACHE_SECONDS = int(os.getenv('VERSIONED_RESPONSE_CACHE_SECONDS', '300'))
+
+# Evaluate with the OpenAI / embedding services in llm_services. Off by
+# default (as for deployment): evaluations then go through the MockService
+# stand-in in evaluations.views and are saved with a zero score.
+LLM_SERVICES_ENABLED = os.getenv('LLM_SERVICES_ENABLED', 'False').lower() == 'true'
+
+# Upper bound for `manage.py startup_profile` (settings, apps and URLconf import)
+STARTUP_TIME_BUDGET_MS = int(os.getenv('STARTUP_TIME_BUDGET_MS', '1000'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
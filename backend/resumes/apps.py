@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
 
 
 class ResumesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resumes'
+
+    def ready(self):
+        from utils.blob_store import release_blob_on_delete
+
+        # Deleting a row only releases its reference to the shared file
+        post_delete.connect(release_blob_on_delete, sender=self.get_model('Resume'))
@@ -0,0 +1,283 @@
+# resumes/bulk_import.py
+import csv
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from .models import Resume
+from .utils import ingest_resume_bytes, process_resume_async
+from utils.hashing import read_and_hash
+from utils.versioning import bump_versions
+
+User = get_user_model()
+
+ALLOWED_EXTENSIONS = ['.pdf', '.doc', '.docx']
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB, same limit as single uploads
+DEFAULT_WORKERS = getattr(settings, 'RESUME_IMPORT_WORKERS', 4)
+
+# Runs archive imports started from the API after the request has returned.
+# It is an in-process queue: one import at a time per worker process (not
+# per deployment), and a restart loses the batches it has queued or is
+# running, which are left 'queued' / 'processing'. `manage.py
+# recover_import_batches` finishes or closes those; large imports can be run
+# with `manage.py import_resumes` instead.
+_batch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-import')
+
+
+def load_manifest(manifest_file):
+    """Read a CSV manifest mapping archive filenames to students
+
+    Expected columns: ``filename`` and either ``username`` or ``email``.
+    Returns a dict of lowercased base filename -> identifier.
+    """
+    if manifest_file is None:
+        return {}
+
+    raw = manifest_file.read()
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8-sig')
+
+    manifest = {}
+    for row in csv.DictReader(io.StringIO(raw)):
+        filename = (row.get('filename') or '').strip()
+        identifier = (row.get('username') or row.get('email') or '').strip()
+        if filename and identifier:
+            manifest[os.path.basename(filename).lower()] = identifier.lower()
+    return manifest
+
+
+def _filename_key(filename):
+    """The identifier a file is named after, e.g. 'jdoe.pdf' -> 'jdoe'"""
+    return os.path.splitext(filename)[0].strip().lower()
+
+
+def _resolve_student(filename, manifest, students):
+    """Map an archive member to a student via the manifest, then by filename
+
+    The manifest identifier or the filename stem must equal a student's
+    username (the roll number) or email exactly. Returns ``(student,
+    status, message)``; ``student`` is None when there is no single match.
+    """
+    identifier = manifest.get(filename.lower())
+    source = 'Manifest entry' if identifier else 'Filename'
+    identifier = identifier or _filename_key(filename)
+
+    matches = students.get(identifier, [])
+    if not matches:
+        return None, 'skipped', 'No matching student found.'
+    if len(matches) > 1:
+        names = ', '.join(sorted(student.username for student in matches))
+        return None, 'error', f"{source} '{identifier}' matches more than one student ({names})."
+    return matches[0], 'queued', ''
+
+
+def plan_archive(archive, manifest):
+    """Walk the archive index once and decide what to do with every member
+
+    Returns ``(to_create, report)``: the members that map to a student, and
+    a report entry for every file in the archive.
+    """
+    # Lowercased username or email -> the students it names
+    students = {}
+    for student in User.objects.filter(role='student').only('id', 'username', 'email'):
+        for key in {student.username.lower(), (student.email or '').lower()} - {''}:
+            students.setdefault(key, []).append(student)
+
+    to_create = []
+    report = []
+    for info in archive.infolist():
+        if info.is_dir() or info.filename.startswith('__MACOSX/'):
+            continue
+
+        filename = os.path.basename(info.filename)
+        if not filename or filename.startswith('.'):
+            continue
+
+        entry = {
+            'filename': info.filename,
+            'student': None,
+            'resume_id': None,
+            'status': 'skipped',
+            'message': '',
+        }
+        report.append(entry)
+
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in ALLOWED_EXTENSIONS:
+            entry['message'] = 'Only PDF, DOC, and DOCX files are allowed.'
+            continue
+        if info.file_size > MAX_FILE_SIZE:
+            entry['message'] = 'File size cannot exceed 10MB.'
+            continue
+
+        student, entry['status'], entry['message'] = _resolve_student(filename, manifest, students)
+        if student is None:
+            continue
+
+        entry['student'] = student.username
+        to_create.append((info, filename, student, entry))
+
+    return to_create, report
+
+
+def _ingest_member(archive, info, filename, resume_id):
+    """Read one archive member into memory, store it and extract its text"""
+    try:
+        with archive.open(info) as member:
+            data, content_hash = read_and_hash(member)
+        Resume.objects.filter(id=resume_id).update(content_hash=content_hash)
+        bump_versions('resumes')
+
+        # Parse from the in-memory bytes while they upload to storage
+        ingest_resume_bytes(resume_id, filename, data, content_hash)
+    except Exception as e:
+        Resume.objects.filter(id=resume_id).update(
+            processing_status='error',
+            error_message=str(e)
+        )
+        bump_versions('resumes')
+    finally:
+        connection.close()
+
+
+def import_resume_archive(batch, archive_file, manifest=None, workers=DEFAULT_WORKERS):
+    """Create resumes for every usable file in a ZIP archive
+
+    Members are read one at a time straight from the archive (nothing is
+    unpacked to disk). Rows are inserted with a single ``bulk_create`` and
+    storage upload plus text extraction run on a thread pool.
+    """
+    batch.status = 'processing'
+    batch.save(update_fields=['status'])
+
+    try:
+        with zipfile.ZipFile(archive_file) as archive:
+            to_create, report = plan_archive(archive, manifest or {})
+
+            resumes = Resume.objects.bulk_create([
+                Resume(
+                    user=student,
+                    file_name=filename,
+                    file_size=info.file_size,
+                    import_batch=batch,
+                )
+                for info, filename, student, entry in to_create
+            ])
+            bump_versions('resumes')
+            for resume, (info, filename, student, entry) in zip(resumes, to_create):
+                entry['resume_id'] = resume.id
+
+            batch.total_files = len(report)
+            batch.created_count = len(resumes)
+            batch.skipped_count = len(report) - len(resumes)
+            batch.report = report
+            batch.save(update_fields=['total_files', 'created_count', 'skipped_count', 'report'])
+
+            # ZipFile reads are safe to share between threads
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for resume, (info, filename, student, entry) in zip(resumes, to_create):
+                    executor.submit(_ingest_member, archive, info, filename, resume.id)
+
+        batch.status = 'completed'
+    except zipfile.BadZipFile:
+        batch.status = 'failed'
+        batch.error_message = 'The uploaded file is not a valid ZIP archive.'
+    except Exception as e:
+        batch.status = 'failed'
+        batch.error_message = str(e)
+
+    batch.completed_at = timezone.now()
+    batch.save(update_fields=['status', 'error_message', 'completed_at'])
+    return batch
+
+
+def queue_resume_archive(batch, archive_path, manifest=None, workers=DEFAULT_WORKERS):
+    """Run ``import_resume_archive`` in the background and remove the archive afterwards"""
+    def run():
+        try:
+            import_resume_archive(batch, archive_path, manifest=manifest, workers=workers)
+        finally:
+            try:
+                os.remove(archive_path)
+            except OSError:
+                pass
+            connection.close()
+
+    return _batch_executor.submit(run)
+
+
+def recover_batch(batch):
+    """Finish or close a batch whose import was cut short by a restart
+
+    Resumes whose bytes were stored are processed from the stored copy;
+    those that never got that far are marked as errors. Returns
+    ``(resumed, lost)`` resume counts.
+    """
+    resumed = lost = 0
+    unfinished = batch.resumes.filter(processing_status__in=['uploaded', 'processing'])
+    for resume in unfinished.only('id', 'local_path', 'blob', 'remote_name'):
+        if resume.local_path or resume.blob_id or resume.remote_name:
+            process_resume_async(resume.id)
+            resumed += 1
+        else:
+            Resume.objects.filter(id=resume.id).update(
+                processing_status='error',
+                error_message='The import was interrupted before this file was stored; upload it again.'
+            )
+            lost += 1
+    if lost:
+        bump_versions('resumes')
+
+    if batch.status == 'queued':
+        # The archive copy was never read
+        batch.status = 'failed'
+        batch.error_message = 'The import was interrupted before it started; upload the archive again.'
+    elif lost:
+        batch.status = 'failed'
+        batch.error_message = f'The import was interrupted; {lost} file(s) were not stored.'
+    else:
+        batch.status = 'completed'
+    batch.completed_at = timezone.now()
+    batch.save(update_fields=['status', 'error_message', 'completed_at'])
+    return resumed, lost
+
+
+def build_batch_report(batch):
+    """Per-file report with the live processing status of every created resume"""
+    statuses = {
+        row['id']: row
+        for row in batch.resumes.values('id', 'processing_status', 'error_message')
+    }
+
+    files = []
+    for entry in batch.report:
+        entry = dict(entry)
+        row = statuses.get(entry['resume_id'])
+        if row:
+            entry['status'] = row['processing_status']
+            entry['message'] = row['error_message']
+        files.append(entry)
+
+    summary = {}
+    for entry in files:
+        summary[entry['status']] = summary.get(entry['status'], 0) + 1
+
+    return {
+        'id': batch.id,
+        'archive_name': batch.archive_name,
+        'status': batch.status,
+        'total_files': batch.total_files,
+        'created_count': batch.created_count,
+        'skipped_count': batch.skipped_count,
+        'error_message': batch.error_message,
+        'created_at': batch.created_at,
+        'completed_at': batch.completed_at,
+        'summary': summary,
+        'files': files,
+    }
@@ -0,0 +1,189 @@
+# resumes/downloads.py
+"""
+Streaming resume downloads
+
+Files are sent in fixed-size chunks straight from local disk or from the
+remote URL, so worker memory does not depend on file size. Supports single
+HTTP byte ranges, ETag revalidation (the ETag is the file's SHA-256) and an
+optional redirect to a short-lived storage URL.
+"""
+
+import mimetypes
+import re
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse
+)
+
+from utils.disk_cache import originals_cache
+from utils.write_behind import local_storage, open_stored_file, remote_backend
+
+CHUNK_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CONTENT_TYPES = {
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+
+def content_type_for(filename):
+    extension = filename[filename.rfind('.'):].lower() if '.' in filename else ''
+    return CONTENT_TYPES.get(extension) or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def resume_etag(resume):
+    if resume.content_hash:
+        return f'"{resume.content_hash}"'
+    return f'"{resume.id}-{int(resume.updated_at.timestamp())}"'
+
+
+def etag_matches(header, etag):
+    """True if an If-None-Match / If-Range header value matches ``etag``"""
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(',')]
+    return '*' in candidates or etag in [value.removeprefix('W/') for value in candidates]
+
+
+def parse_range(header, size):
+    """``(start, end)`` (inclusive) for a single-range header, None to send the whole file
+
+    Raises ValueError for a range that cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match or size == 0:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _remote_url(resume):
+    for url in (resume.remote_url, resume.firebase_url):
+        if url and url.startswith(('http://', 'https://')):
+            return url
+    if resume.file and not resume.local_path:
+        try:
+            url = resume.file.url
+        except Exception:
+            return None
+        if url.startswith(('http://', 'https://')):
+            return url
+    return None
+
+
+def _open_stream(resume, start):
+    """File-like object positioned at byte ``start`` of the resume"""
+    if resume.local_path and local_storage().exists(resume.local_path):
+        stream = local_storage().open(resume.local_path, 'rb')
+        stream.seek(start)
+        return stream
+
+    cached_path = originals_cache().get(resume.content_hash) if resume.content_hash else None
+    if cached_path:
+        # Already fetched for processing; no need to go back to the origin
+        stream = open(cached_path, 'rb')
+        stream.seek(start)
+        return stream
+
+    url = _remote_url(resume)
+    if url:
+        headers = {'Range': f'bytes={start}-'} if start else {}
+        stream = urlopen(Request(url, headers=headers), timeout=30)
+        if start and stream.status != 206:
+            # Origin ignored the range; skip ahead without buffering
+            remaining = start
+            while remaining:
+                skipped = len(stream.read(min(CHUNK_SIZE, remaining)))
+                if not skipped:
+                    break
+                remaining -= skipped
+        return stream
+
+    stream = open_stored_file(resume)
+    if getattr(stream, 'closed', False):
+        stream.open('rb')
+    stream.seek(start)
+    return stream
+
+
+def _iter_chunks(stream, length):
+    try:
+        while length > 0:
+            chunk = stream.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        stream.close()
+
+
+def signed_download_url(resume):
+    """Short-lived storage URL for a resume whose remote copy is confirmed"""
+    if resume.storage_status != 'uploaded' or not resume.remote_name:
+        return None
+    expires_in = getattr(settings, 'DOWNLOAD_URL_EXPIRY_SECONDS', 300)
+    url = remote_backend().signed_url(resume.remote_name, expires_in)
+    return url if url and url.startswith(('http://', 'https://')) else None
+
+
+def serve_resume_file(request, resume):
+    """Stream a resume, honouring Range, If-None-Match and ``?redirect=1``"""
+    if not (resume.file or resume.local_path or resume.remote_name):
+        raise Http404("File not found")
+
+    etag = resume_etag(resume)
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    if request.GET.get('redirect') in ('1', 'true'):
+        url = signed_download_url(resume)
+        if url:
+            return HttpResponseRedirect(url)
+
+    size = resume.file_size
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and not etag_matches(if_range, etag):
+        range_header = None  # file changed since the client's partial copy
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+
+    response = StreamingHttpResponse(
+        _iter_chunks(_open_stream(resume, start), length),
+        status=206 if byte_range else 200,
+        content_type=content_type_for(resume.file_name)
+    )
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    response['Content-Disposition'] = f'attachment; filename="{resume.file_name}"'
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
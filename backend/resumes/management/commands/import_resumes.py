@@ -0,0 +1,61 @@
+# resumes/management/commands/import_resumes.py
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from resumes.bulk_import import DEFAULT_WORKERS, build_batch_report, import_resume_archive, load_manifest
+from resumes.models import ResumeImportBatch
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import resumes in bulk from a ZIP archive of PDF/DOC/DOCX files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive', help='Path to the ZIP archive')
+        parser.add_argument(
+            '--manifest',
+            help='CSV file with "filename" and "username" (or "email") columns. '
+                 'Without it a file must be named after the student username or email.'
+        )
+        parser.add_argument(
+            '--uploaded-by',
+            required=True,
+            help='Username of the placement team member recorded on the import'
+        )
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+
+    def handle(self, *args, **options):
+        try:
+            uploaded_by = User.objects.get(username=options['uploaded_by'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['uploaded_by']}' does not exist")
+
+        manifest = {}
+        if options['manifest']:
+            with open(options['manifest'], 'rb') as manifest_file:
+                manifest = load_manifest(manifest_file)
+
+        batch = ResumeImportBatch.objects.create(
+            uploaded_by=uploaded_by,
+            archive_name=os.path.basename(options['archive'])
+        )
+        import_resume_archive(batch, options['archive'], manifest=manifest, workers=options['workers'])
+
+        report = build_batch_report(batch)
+        if options['verbosity'] > 1:
+            for entry in report['files']:
+                self.stdout.write(
+                    f"{entry['status']:<10} {entry['filename']} "
+                    f"{entry['student'] or '-'} {entry['message']}"
+                )
+
+        if batch.status == 'failed':
+            raise CommandError(batch.error_message)
+
+        summary = ', '.join(f'{count} {name}' for name, count in sorted(report['summary'].items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported batch {batch.id}: {report['total_files']} files ({summary})"
+        ))
@@ -0,0 +1,49 @@
+# resumes/management/commands/recover_import_batches.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from resumes.bulk_import import recover_batch
+from resumes.models import ResumeImportBatch
+
+
+class Command(BaseCommand):
+    help = (
+        'Finish or close bulk imports left queued or processing by a restarted '
+        'worker: stored files are processed, the rest are marked as errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=60,
+            help='Only recover batches started more than this many minutes ago'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the stale batches without changing them'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        batches = ResumeImportBatch.objects.filter(
+            status__in=['queued', 'processing'],
+            created_at__lt=cutoff
+        ).order_by('pk')
+
+        for batch in batches:
+            if options['dry_run']:
+                self.stdout.write(f'Batch {batch.id} ({batch.archive_name}): {batch.status}')
+                continue
+            resumed, lost = recover_batch(batch)
+            self.stdout.write(
+                f'Batch {batch.id} ({batch.archive_name}): {batch.status}, '
+                f'{resumed} resumed, {lost} lost'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(batches)} stale batch(es){' (dry run)' if options['dry_run'] else ''}"
+        ))
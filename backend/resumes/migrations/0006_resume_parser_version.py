@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0005_resumeimportbatch_resume_import_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='parser_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0006_resume_parser_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='sections',
+            field=models.JSONField(default=list),
+        ),
+    ]
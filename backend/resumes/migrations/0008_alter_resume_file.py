@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0007_resume_sections'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resume',
+            name='file',
+            field=models.FileField(blank=True, null=True, upload_to='resumes/'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0008_alter_resume_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='local_path',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='remote_name',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='remote_url',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='storage_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('uploaded', 'Uploaded'), ('failed', 'Failed')], default='uploaded', max_length=20),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0009_resume_local_path_resume_remote_name_and_more'),
+        ('utils', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resumes', to='utils.storedblob'),
+        ),
+    ]
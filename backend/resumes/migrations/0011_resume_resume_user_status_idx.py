@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0010_resume_blob'),
+        ('utils', '0002_resourceversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['user', 'processing_status'], name='resume_user_status_idx'),
+        ),
+    ]
@@ -1,10 +1,37 @@
 # resumes/models.py
 from django.db import models
 from django.contrib.auth import get_user_model
-from cloudinary_storage.storage import MediaCloudinaryStorage
+from utils.write_behind import STORAGE_STATUS_CHOICES
 
 User = get_user_model()
 
+class ResumeImportBatch(models.Model):
+    """A bulk upload of resumes from a ZIP archive"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resume_import_batches')
+    archive_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    total_files = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    skipped_count = models.IntegerField(default=0)
+    report = models.JSONField(default=list)  # per-file entries: filename, student, resume_id, status, message
+    error_message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.archive_name} - {self.status}"
+
+    class Meta:
+        ordering = ['-created_at']
+
 class Resume(models.Model):
     STATUS_CHOICES = [
         ('uploaded', 'Uploaded'),
@@ -17,13 +44,26 @@ class Resume(models.Model):
     file = models.FileField(
         upload_to='resumes/', 
         blank=True, 
+        null=True  # STORAGES['default'] (Cloudinary), created on first use
+    )
+    # Write-behind storage: the upload is kept in local_path until the copy to
+    # the remote backend (settings.FILE_STORAGE_BACKEND) is confirmed
+    local_path = models.CharField(max_length=500, blank=True)
+    remote_name = models.CharField(max_length=500, blank=True)
+    remote_url = models.URLField(max_length=500, blank=True)
+    storage_status = models.CharField(max_length=20, choices=STORAGE_STATUS_CHOICES, default='uploaded')
+    blob = models.ForeignKey(
+        'utils.StoredBlob',
+        on_delete=models.SET_NULL,
+        blank=True,
         null=True,
-        storage=MediaCloudinaryStorage()  # Explicitly use Cloudinary storage
+        related_name='resumes'  # shared copy of these bytes (utils.blob_store)
     )
     firebase_filename = models.CharField(max_length=500, blank=True, null=True)  # Firebase path
     firebase_url = models.URLField(blank=True, null=True)  # Firebase public URL
     file_name = models.CharField(max_length=255)
     file_size = models.IntegerField()  # in bytes
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of file bytes
     
     # Extracted content
     raw_text = models.TextField(blank=True)
@@ -35,9 +75,18 @@ class Resume(models.Model):
     education = models.JSONField(default=list)  # education details
     projects = models.JSONField(default=list)  # projects
     certifications = models.JSONField(default=list)  # certifications
+    sections = models.JSONField(default=list)  # section name with start/end offsets into raw_text
+    parser_version = models.PositiveIntegerField(default=0)  # resumes.utils.PARSER_VERSION used for the parsed fields
     
     processing_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploaded')
     error_message = models.TextField(blank=True)
+    import_batch = models.ForeignKey(
+        ResumeImportBatch,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='resumes'
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -46,4 +95,7 @@ class Resume(models.Model):
         return f"{self.user.username} - {self.file_name}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'processing_status'], name='resume_user_status_idx'),
+        ]
\ No newline at end of file
@@ -1,16 +1,38 @@
 # resumes/serializer.py
 from rest_framework import serializers
+from django.urls import reverse
 from .models import Resume
 from django.contrib.auth import get_user_model
+from utils.fieldsets import SparseFieldsetMixin
 
 User = get_user_model()
 
+def resume_file_url(resume, request):
+    """Where a resume can be fetched from, following its write-behind upload"""
+    # Remote copy once the write-behind upload is confirmed
+    if resume.storage_status == 'uploaded' and resume.remote_url:
+        if request and resume.remote_url.startswith('/'):
+            return request.build_absolute_uri(resume.remote_url)  # local stand-in backend
+        return resume.remote_url
+    # Prioritize Firebase URL if available
+    if resume.firebase_url:
+        return resume.firebase_url
+    # Fallback to local file URL
+    if resume.file:
+        if request:
+            return request.build_absolute_uri(resume.file.url)
+    # Still only on local disk: served through the download endpoint
+    elif resume.local_path:
+        if request:
+            return request.build_absolute_uri(reverse('resume-download', args=[resume.id]))
+    return None
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role']
 
-class ResumeSerializer(serializers.ModelSerializer):
+class ResumeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_details = serializers.SerializerMethodField()
     file_url = serializers.SerializerMethodField()
@@ -20,33 +42,26 @@ class ResumeSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'user_details', 'file', 'file_url', 'file_name', 'file_size',
             'raw_text', 'personal_info', 'skills', 'experience', 'education',
-            'projects', 'certifications', 'processing_status', 'error_message',
-            'created_at', 'updated_at'
+            'projects', 'certifications', 'sections', 'processing_status', 'error_message',
+            'storage_status', 'created_at', 'updated_at'
         ]
         read_only_fields = ['user', 'file_name', 'file_size', 'raw_text', 'personal_info',
                            'skills', 'experience', 'education', 'projects', 'certifications',
-                           'processing_status', 'error_message', 'created_at', 'updated_at']
-
+                           'sections', 'processing_status', 'error_message', 'storage_status',
+                           'created_at', 'updated_at']
+        # utils.fieldsets: left out under ?fields=/?expand= unless asked for,
+        # and columns deferred when not returned
+        # (user_details repeats the nested user for older clients)
+        expandable_fields = ['raw_text', 'sections', 'user_details']
+        deferrable_fields = ['raw_text', 'personal_info', 'skills', 'experience', 'education',
+                             'projects', 'certifications', 'sections', 'error_message']
+        select_related_fields = ['user']
+    
     def get_user_details(self, obj):
-        return {
-            'id': obj.user.id,
-            'username': obj.user.username,
-            'email': obj.user.email,
-            'first_name': obj.user.first_name,
-            'last_name': obj.user.last_name,
-            'role': obj.user.role
-        }
+        return UserSerializer(obj.user).data
     
     def get_file_url(self, obj):
-        # Prioritize Firebase URL if available
-        if obj.firebase_url:
-            return obj.firebase_url
-        # Fallback to local file URL
-        elif obj.file:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.file.url)
-        return None
+        return resume_file_url(obj, self.context.get('request'))
 
 class ResumeCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -82,20 +97,8 @@ class ResumeCreateSerializer(serializers.ModelSerializer):
         resume = Resume.objects.create(**validated_data)
         # TODO: Trigger background processing task here
         return resume
-from rest_framework import serializers
-from .models import Resume
 
 class ResumeUploadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = ['file']
-
-class ResumeSerializer(serializers.ModelSerializer):
-    user_username = serializers.CharField(source='user.username', read_only=True)
-    
-    class Meta:
-        model = Resume
-        fields = '__all__'
-        read_only_fields = ['user', 'file_name', 'file_size', 'raw_text', 
-                           'personal_info', 'skills', 'experience', 'education', 
-                           'projects', 'certifications', 'processing_status', 'error_message']
\ No newline at end of file
@@ -1,3 +1,338 @@
-from django.test import TestCase
+import io
+import tempfile
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.utils import timezone
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from utils import write_behind
+from utils.write_behind import save_local
+from .bulk_import import load_manifest, plan_archive
+from .models import Resume, ResumeImportBatch
+from .utils import (
+    PARSER_VERSION, SECTION_HEADER_PATTERN, find_cached_extraction, parse_resume_content,
+    process_resume_async, segment_resume
+)
+
+User = get_user_model()
+
+
+class PlanArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(username='john', email='john@example.com', role='student')
+        User.objects.create(username='21cs042', email='priya@example.com', role='student')
+        # Usernames are case sensitive, filenames are not
+        User.objects.create(username='ravi', role='student')
+        User.objects.create(username='Ravi', role='student')
+
+    def plan(self, names, manifest=''):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name in names:
+                archive.writestr(name, b'%PDF-1.4')
+        buffer.seek(0)
+        with zipfile.ZipFile(buffer) as archive:
+            to_create, report = plan_archive(archive, load_manifest(io.StringIO(manifest)))
+        return {entry['filename']: entry for entry in report}
+
+    def test_filename_must_match_exactly(self):
+        report = self.plan(['john_smith.pdf', 'john-resume.pdf', 'john.pdf', '21CS042.docx', 'priya@example.com.pdf'])
+
+        self.assertEqual(report['john_smith.pdf']['status'], 'skipped')
+        self.assertEqual(report['john-resume.pdf']['status'], 'skipped')
+        self.assertEqual(report['john.pdf']['student'], 'john')
+        self.assertEqual(report['21CS042.docx']['student'], '21cs042')
+        self.assertEqual(report['priya@example.com.pdf']['student'], '21cs042')
+
+    def test_manifest_maps_any_filename(self):
+        report = self.plan(['john_smith.pdf'], manifest='filename,username\njohn_smith.pdf,john\n')
+        self.assertEqual(report['john_smith.pdf']['student'], 'john')
+        self.assertEqual(report['john_smith.pdf']['status'], 'queued')
+
+    def test_ambiguous_match_is_an_error(self):
+        report = self.plan(['ravi.pdf', 'cv.pdf'], manifest='filename,username\ncv.pdf,RAVI\n')
+
+        for name in ['ravi.pdf', 'cv.pdf']:
+            self.assertEqual(report[name]['status'], 'error')
+            self.assertIsNone(report[name]['student'])
+            self.assertIn('Ravi, ravi', report[name]['message'])
+
+
+class ResumeDownloadTests(TestCase):
+    content = b'%PDF-1.4 ' + bytes(range(256)) * 4
+
+    def setUp(self):
+        spool = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        settings = override_settings(WRITE_BEHIND_ROOT=spool.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        patcher = mock.patch.object(write_behind, '_local_storage', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        student = User.objects.create(username='student', role='student')
+        self.resume = Resume.objects.create(
+            user=student,
+            file_name='cv.pdf',
+            file_size=len(self.content),
+            content_hash='ab' * 32,
+            local_path=save_local('resumes/cv.pdf', ContentFile(self.content)),
+        )
+        self.etag = f'"{self.resume.content_hash}"'
+        self.client = APIClient()
+        self.client.force_authenticate(student)
+
+    def download(self, **headers):
+        response = self.client.get(f'/api/resumes/{self.resume.id}/download/', **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file(self):
+        response, body = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range_gets_206_with_content_range(self):
+        size = len(self.content)
+        for header, start, end in [
+            ('bytes=0-99', 0, 99),
+            ('bytes=100-', 100, size - 1),
+            ('bytes=-50', size - 50, size - 1),
+            ('bytes=1000-99999', 1000, size - 1),
+        ]:
+            with self.subTest(range=header):
+                response, body = self.download(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(body, self.content[start:end + 1])
+
+    def test_unsatisfiable_range_gets_416(self):
+        size = len(self.content)
+        for header in [f'bytes={size}-', 'bytes=500-100']:
+            with self.subTest(range=header):
+                response, _ = self.download(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], f'bytes */{size}')
+
+    def test_if_range_mismatch_sends_the_whole_file(self):
+        response, body = self.download(HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE='"changed"')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Range', response)
+        self.assertEqual(body, self.content)
+
+        response, body = self.download(HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[:100])
+
+    def test_matching_etag_gets_304(self):
+        for header in [self.etag, f'W/{self.etag}', f'"other", {self.etag}']:
+            with self.subTest(if_none_match=header):
+                response, body = self.download(HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], self.etag)
+                self.assertEqual(body, b'')
+
+        response, _ = self.download(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+
+RESUME_TEXT = """Priya Sharma
+priya@example.com
+
+Work Experience:
+Backend developer at Acme
+
+## EDUCATION
+B.Tech Computer Science
+
+Key Projects
+Resume checker
+  • Technical Skills & Tools  
+Python, Django
+Projects
+Chat app
+"""
+
+
+class SegmentResumeTests(SimpleTestCase):
+    def sections(self, text):
+        return [(section['name'], text[section['start']:section['end']].strip())
+                for section in segment_resume(text)]
+
+    def test_header_variants(self):
+        for line, name in [
+            ('Work Experience:', 'experience'),
+            ('## EDUCATION', 'education'),
+            ('  • Technical Skills & Tools  ', 'skills'),
+            ('- Certifications and Courses', 'certifications'),
+            ('* Academic Projects', 'projects'),
+        ]:
+            with self.subTest(line=line):
+                match = SECTION_HEADER_PATTERN.search(line)
+                self.assertIsNotNone(match)
+                self.assertEqual(match.lastgroup, name)
+
+    def test_headings_inside_a_sentence_are_not_headers(self):
+        for line in ['Skills in Python and Django', 'Led projects for three clients.']:
+            with self.subTest(line=line):
+                self.assertIsNone(SECTION_HEADER_PATTERN.search(line))
+
+    def test_sections_in_order_with_the_preamble_first(self):
+        self.assertEqual(self.sections(RESUME_TEXT), [
+            ('header', 'Priya Sharma\npriya@example.com'),
+            ('experience', 'Backend developer at Acme'),
+            ('education', 'B.Tech Computer Science'),
+            ('projects', 'Resume checker'),
+            ('skills', 'Python, Django'),
+            ('projects', 'Chat app'),  # repeated sections keep one entry each
+        ])
+
+    def test_text_without_headers_is_one_header_section(self):
+        self.assertEqual(self.sections('Priya Sharma\nPython developer'),
+                         [('header', 'Priya Sharma\nPython developer')])
+
+    def test_empty_sections_are_dropped(self):
+        self.assertEqual(self.sections('Skills\n\nProjects\nChat app'), [('projects', 'Chat app')])
+
+
+class OutdatedExtractionTests(TestCase):
+    def test_cached_extraction_from_an_older_parser_is_parsed_again(self):
+        student = User.objects.create(username='student', role='student')
+        Resume.objects.create(
+            user=student, file_name='cv.pdf', file_size=8, content_hash='ab' * 32,
+            processing_status='processed', raw_text=RESUME_TEXT,
+            parser_version=PARSER_VERSION - 1, experience=[], sections=[]
+        )
+        resume = Resume.objects.create(user=student, file_name='cv.pdf', file_size=8, content_hash='ab' * 32)
+
+        with mock.patch('resumes.utils.extract_text_from_file') as extract:
+            process_resume_async(resume.id, file_obj=ContentFile(b'%PDF-1.4', name='cv.pdf'))
+        extract.assert_not_called()  # the cached text is still valid
+
+        resume.refresh_from_db()
+        self.assertEqual(resume.parser_version, PARSER_VERSION)
+        self.assertEqual(resume.experience, [{'description': 'Backend developer at Acme'}])
+        self.assertEqual([section['name'] for section in resume.sections],
+                         ['header', 'experience', 'education', 'projects', 'skills', 'projects'])
+
+
+class RecoverImportBatchesTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username='placement', role='placement_team')
+        self.student = User.objects.create(username='student', role='student')
+
+    def batch(self, status, minutes_ago=120, files=()):
+        batch = ResumeImportBatch.objects.create(uploaded_by=self.owner, archive_name='cvs.zip', status=status)
+        ResumeImportBatch.objects.filter(pk=batch.pk).update(
+            created_at=timezone.now() - timezone.timedelta(minutes=minutes_ago)
+        )
+        resumes = [
+            Resume.objects.create(user=self.student, file_name='cv.pdf', file_size=8, import_batch=batch,
+                                  local_path=local_path)
+            for local_path in files
+        ]
+        return batch, resumes
+
+    def recover(self, *args):
+        out = io.StringIO()
+        with mock.patch('resumes.bulk_import.process_resume_async') as process:
+            call_command('recover_import_batches', *args, stdout=out)
+        return process, out.getvalue()
+
+    def test_stored_files_are_processed_and_the_rest_marked_lost(self):
+        batch, (stored, lost) = self.batch('processing', files=['resumes/cv.pdf', ''])
+        recent, _ = self.batch('processing', minutes_ago=5)
+
+        process, out = self.recover()
+        process.assert_called_once_with(stored.id)
+        self.assertIn('1 resumed, 1 lost', out)
+
+        lost.refresh_from_db()
+        self.assertEqual(lost.processing_status, 'error')
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'failed')
+        self.assertIsNotNone(batch.completed_at)
+        recent.refresh_from_db()
+        self.assertEqual(recent.status, 'processing')  # may still be running
+
+    def test_batch_with_every_file_stored_is_completed(self):
+        batch, _ = self.batch('processing', files=['resumes/a.pdf', 'resumes/b.pdf'])
+        process, _ = self.recover()
+        self.assertEqual(process.call_count, 2)
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'completed')
+
+    def test_queued_batch_that_never_started_is_failed(self):
+        batch, _ = self.batch('queued')
+        self.recover()
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'failed')
+        self.assertIn('before it started', batch.error_message)
+
+    def test_dry_run_changes_nothing(self):
+        batch, _ = self.batch('processing', files=[''])
+        process, out = self.recover('--dry-run')
+        process.assert_not_called()
+        self.assertIn('1 stale batch(es) (dry run)', out)
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'processing')
+
+
+class ExtractionCacheTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create(username='student', role='student')
+        parsed = parse_resume_content(RESUME_TEXT)
+        self.cached = Resume.objects.create(
+            user=self.student, file_name='cv.pdf', file_size=8, content_hash='ab' * 32,
+            processing_status='processed', raw_text=RESUME_TEXT, parser_version=PARSER_VERSION, **parsed
+        )
+
+    def test_only_processed_resumes_with_the_same_bytes_are_found(self):
+        Resume.objects.create(user=self.student, file_name='other.pdf', file_size=8, content_hash='cd' * 32,
+                              processing_status='processed', raw_text='Other')
+        pending = Resume.objects.create(user=self.student, file_name='cv.pdf', file_size=8,
+                                        content_hash='ab' * 32)
+
+        self.assertEqual(find_cached_extraction('ab' * 32), self.cached)
+        self.assertIsNone(find_cached_extraction('ab' * 32, exclude_id=self.cached.id))
+        self.assertIsNone(find_cached_extraction('ef' * 32))
+        self.assertIsNone(find_cached_extraction(''))
+        pending.processing_status = 'error'
+        pending.save()
+        self.assertIsNone(find_cached_extraction('ab' * 32, exclude_id=self.cached.id))
+
+    def test_same_bytes_reuse_the_extraction(self):
+        resume = Resume.objects.create(user=self.student, file_name='copy.pdf', file_size=8)
+        source = ContentFile(b'%PDF-1.4', name='copy.pdf')
+
+        with mock.patch('resumes.utils.compute_sha256', return_value='ab' * 32), \
+                mock.patch('resumes.utils.extract_text_from_file') as extract, \
+                mock.patch('resumes.utils.parse_resume_content') as parse:
+            process_resume_async(resume.id, file_obj=source)
+        extract.assert_not_called()
+        parse.assert_not_called()
+
+        resume.refresh_from_db()
+        self.assertEqual(resume.processing_status, 'processed')
+        self.assertEqual(resume.content_hash, 'ab' * 32)
+        self.assertEqual(resume.raw_text, RESUME_TEXT)
+        self.assertEqual(resume.sections, self.cached.sections)
+        self.assertEqual(resume.parser_version, PARSER_VERSION)
+
+    def test_new_bytes_are_extracted(self):
+        resume = Resume.objects.create(user=self.student, file_name='new.pdf', file_size=8, content_hash='cd' * 32)
+        with mock.patch('resumes.utils.extract_text_from_file', return_value='Skills\nPython') as extract:
+            process_resume_async(resume.id, file_obj=ContentFile(b'%PDF-1.4', name='new.pdf'))
+        extract.assert_called_once()
+        resume.refresh_from_db()
+        self.assertEqual(resume.skills, ['Python'])
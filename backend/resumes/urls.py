@@ -4,6 +4,8 @@ from .views import (
     ResumeListCreateView,
     ResumeDetailView,
     ResumeDownloadView,
+    ResumeBulkUploadView,
+    ResumeBulkUploadStatusView,
     resume_stats
 )
 
@@ -12,4 +14,6 @@ urlpatterns = [
     path('<int:pk>/', ResumeDetailView.as_view(), name='resume-detail'),
     path('<int:pk>/download/', ResumeDownloadView.as_view(), name='resume-download'),
     path('stats/', resume_stats, name='resume-stats'),
+    path('bulk-upload/', ResumeBulkUploadView.as_view(), name='resume-bulk-upload'),
+    path('bulk-upload/<int:pk>/', ResumeBulkUploadStatusView.as_view(), name='resume-bulk-upload-status'),
 ]
\ No newline at end of file
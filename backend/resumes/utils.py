@@ -1,10 +1,13 @@
 # resumes/utils.py
 import os
-import PyPDF2
-import docx
 from io import BytesIO
 import re
 import json
+from django.core.files.base import ContentFile
+from utils.hashing import compute_sha256
+from utils.blob_store import acquire_existing_blob
+from utils.versioning import bump_versions
+from utils.write_behind import open_stored_file, point_at_blob, save_local, schedule_remote_copy
 
 def extract_text_from_file(file):
     """Extract text from uploaded resume file"""
@@ -22,6 +25,9 @@ def extract_text_from_file(file):
 
 def extract_text_from_pdf(file):
     """Extract text from PDF file"""
+    # Imported here so worker boot does not pay for the PDF/DOCX libraries
+    import PyPDF2
+    
     try:
         pdf_reader = PyPDF2.PdfReader(file)
         text = ""
@@ -33,6 +39,8 @@ def extract_text_from_pdf(file):
 
 def extract_text_from_docx(file):
     """Extract text from DOCX file"""
+    import docx
+    
     try:
         doc = docx.Document(file)
         text = ""
@@ -42,12 +50,24 @@ def extract_text_from_docx(file):
     except Exception as e:
         raise Exception(f"Error reading DOCX: {str(e)}")
 
+_spacy_nlp = None
+_spacy_unavailable = False
+
+def get_spacy_model():
+    """Load the spaCy English model once per process (None if not installed)"""
+    global _spacy_nlp, _spacy_unavailable
+    
+    if _spacy_nlp is None and not _spacy_unavailable:
+        try:
+            import spacy
+            _spacy_nlp = spacy.load("en_core_web_sm")
+        except (ImportError, OSError):
+            # spaCy or its model not installed, callers fall back to regex patterns
+            _spacy_unavailable = True
+    return _spacy_nlp
+
 def extract_person_name(text):
     """Extract person's name from resume text"""
-    import spacy
-    from spacy import displacy
-    import re
-    
     # Common technical terms and libraries to exclude
     tech_exclusions = {
         'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node',
@@ -57,30 +77,23 @@ def extract_person_name(text):
         'bootstrap', 'jquery', 'express', 'fastapi', 'redis', 'elasticsearch'
     }
     
-    try:
-        # Try to load spaCy model for better name recognition
-        try:
-            nlp = spacy.load("en_core_web_sm")
-            doc = nlp(text)
-            
-            # Look for PERSON entities
-            person_names = []
-            for ent in doc.ents:
-                if ent.label_ == "PERSON":
-                    candidate_name = ent.text.strip()
-                    # Filter out technical terms
-                    if candidate_name.lower() not in tech_exclusions:
-                        person_names.append(candidate_name)
-            
-            if person_names:
-                # Return the first person name found (likely the candidate)
-                return person_names[0]
-        except OSError:
-            # spaCy model not installed, fall back to regex patterns
-            pass
-    except ImportError:
-        # spaCy not installed, use regex patterns
-        pass
+    # Try spaCy for better name recognition
+    nlp = get_spacy_model()
+    if nlp is not None:
+        doc = nlp(text)
+        
+        # Look for PERSON entities
+        person_names = []
+        for ent in doc.ents:
+            if ent.label_ == "PERSON":
+                candidate_name = ent.text.strip()
+                # Filter out technical terms
+                if candidate_name.lower() not in tech_exclusions:
+                    person_names.append(candidate_name)
+        
+        if person_names:
+            # Return the first person name found (likely the candidate)
+            return person_names[0]
     
     # Fallback: Use regex patterns to extract likely names
     lines = text.split('\n')
@@ -169,6 +182,78 @@ def extract_person_name(text):
     
     return None
 
+# Header lines that start a resume section. Each section is a named group in
+# one alternation so every line is classified by a single regex match.
+SECTION_HEADINGS = {
+    'summary': [
+        r'(?:professional |career )?summary', r'(?:career |professional )?objective',
+        r'(?:professional )?profile', r'about me',
+    ],
+    'experience': [
+        r'(?:work |professional |relevant )?experience', r'employment(?: history)?',
+        r'work history', r'internships?',
+    ],
+    'education': [
+        r'education(?:al qualifications?| and training)?', r'academic (?:background|qualifications?|details)',
+        r'academics', r'qualifications?',
+    ],
+    'projects': [
+        r'(?:academic |personal |key |major )?projects',
+    ],
+    'skills': [
+        r'(?:technical |key |core )?skills(?: (?:and|&) (?:tools|technologies))?', r'core competencies',
+        r'technologies', r'tech stack',
+    ],
+    'certifications': [
+        r'certifications?(?: (?:and|&) (?:courses|achievements))?', r'certificates', r'licenses',
+        r'courses',
+    ],
+}
+
+SECTION_HEADER_PATTERN = re.compile(
+    r'^[ \t]*[#*\-•]*[ \t]*(?:'
+    + '|'.join(
+        f"(?P<{name}>{'|'.join(headings)})"
+        for name, headings in SECTION_HEADINGS.items()
+    )
+    + r')[ \t]*:?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+def segment_resume(text):
+    """Split resume text into sections in a single pass over the text
+    
+    Returns a list of ``{'name', 'start', 'end'}`` dicts where ``start``/``end``
+    are character offsets of the section body (the header line excluded)
+    into ``text``. Anything before the first recognised header is returned
+    as a ``header`` section (name and contact details). A section that
+    appears more than once yields one entry per occurrence.
+    """
+    sections = []
+    current_name = 'header'
+    current_start = 0
+    
+    for match in SECTION_HEADER_PATTERN.finditer(text):
+        sections.append({'name': current_name, 'start': current_start, 'end': match.start()})
+        current_name = match.lastgroup
+        current_start = match.end()
+    
+    sections.append({'name': current_name, 'start': current_start, 'end': len(text)})
+    
+    # Drop sections without any content (e.g. an empty preamble)
+    return [section for section in sections if text[section['start']:section['end']].strip()]
+
+def section_lines(text, sections, name):
+    """Non-empty, stripped lines of every section called ``name``"""
+    lines = []
+    for section in sections:
+        if section['name'] == name:
+            for line in text[section['start']:section['end']].splitlines():
+                line = line.strip(' \t•*-')
+                if line:
+                    lines.append(line)
+    return lines
+
 def parse_resume_content(text):
     """Parse resume content to extract structured information"""
     parsed_data = {
@@ -177,10 +262,14 @@ def parse_resume_content(text):
         'experience': [],
         'education': [],
         'projects': [],
-        'certifications': []
+        'certifications': [],
+        'sections': []
     }
     
     try:
+        sections = segment_resume(text)
+        parsed_data['sections'] = sections
+        
         # Extract person's name
         extracted_name = extract_person_name(text)
         if extracted_name:
@@ -214,32 +303,19 @@ def parse_resume_content(text):
         
         parsed_data['skills'] = found_skills
         
-        # Simple experience extraction (look for common patterns)
-        experience_lines = []
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            if any(keyword in line.lower() for keyword in ['experience', 'work', 'employment']):
-                # Try to extract next few lines as experience
-                for j in range(i+1, min(i+5, len(lines))):
-                    if lines[j].strip():
-                        experience_lines.append(lines[j].strip())
-        
-        if experience_lines:
-            parsed_data['experience'] = [{'description': exp} for exp in experience_lines[:3]]
-        
-        # Simple education extraction
-        education_keywords = ['education', 'degree', 'university', 'college', 'bachelor', 'master', 'phd']
-        education_lines = []
-        
-        for i, line in enumerate(lines):
-            if any(keyword in line.lower() for keyword in education_keywords):
-                for j in range(i, min(i+3, len(lines))):
-                    if lines[j].strip():
-                        education_lines.append(lines[j].strip())
-        
-        if education_lines:
-            parsed_data['education'] = [{'degree': edu} for edu in education_lines[:2]]
+        # Section bodies, one entry per line
+        parsed_data['experience'] = [
+            {'description': line} for line in section_lines(text, sections, 'experience')
+        ]
+        parsed_data['education'] = [
+            {'degree': line} for line in section_lines(text, sections, 'education')
+        ]
+        parsed_data['projects'] = [
+            {'description': line} for line in section_lines(text, sections, 'projects')
+        ]
+        parsed_data['certifications'] = [
+            {'name': line} for line in section_lines(text, sections, 'certifications')
+        ]
     
     except Exception as e:
         # Return basic structure even if parsing fails
@@ -247,32 +323,104 @@ def parse_resume_content(text):
     
     return parsed_data
 
-def process_resume_async(resume_id):
-    """Background task to process resume (placeholder for Celery task)"""
+# Bump whenever parse_resume_content changes its output so that
+# `manage.py reparse --outdated` picks up rows parsed by the old code.
+PARSER_VERSION = 2
+
+PARSED_FIELDS = ['personal_info', 'skills', 'experience', 'education', 'projects', 'certifications', 'sections']
+
+def find_cached_extraction(content_hash, exclude_id=None):
+    """Return an already processed resume with identical file bytes, if any"""
+    from .models import Resume
+    
+    if not content_hash:
+        return None
+    
+    cached = Resume.objects.filter(
+        content_hash=content_hash,
+        processing_status='processed'
+    ).only('raw_text', 'parser_version', *PARSED_FIELDS)
+    if exclude_id is not None:
+        cached = cached.exclude(id=exclude_id)
+    return cached.first()
+
+def apply_parsed_fields(resume, parsed_data):
+    """Copy parsed data onto a resume and return the names of the fields that changed"""
+    changed = []
+    for field in PARSED_FIELDS:
+        if getattr(resume, field) != parsed_data[field]:
+            setattr(resume, field, parsed_data[field])
+            changed.append(field)
+    if resume.parser_version != PARSER_VERSION:
+        resume.parser_version = PARSER_VERSION
+        changed.append('parser_version')
+    return changed
+
+def process_resume_async(resume_id, file_obj=None):
+    """Background task to process resume (placeholder for Celery task)
+    
+    ``file_obj`` is an optional local copy of the resume bytes; when given it
+    is used instead of reading ``resume.file`` back from storage.
+    """
     from .models import Resume
     
     try:
         resume = Resume.objects.get(id=resume_id)
-        resume.processing_status = 'processing'
-        resume.save()
+        Resume.objects.filter(id=resume_id).update(processing_status='processing')
+        bump_versions('resumes')
         
-        # Extract text
-        resume.raw_text = extract_text_from_file(resume.file)
+        source = file_obj if file_obj is not None else open_stored_file(resume)
         
-        # Parse content
-        parsed_data = parse_resume_content(resume.raw_text)
+        if not resume.content_hash:
+            resume.content_hash = compute_sha256(source)
+        
+        cached = find_cached_extraction(resume.content_hash, exclude_id=resume.id)
+        if cached and cached.parser_version == PARSER_VERSION:
+            # Identical bytes were already parsed; reuse the result
+            resume.raw_text = cached.raw_text
+            parsed_data = {field: getattr(cached, field) for field in PARSED_FIELDS}
+        else:
+            # Extract text (the cached text is still valid for an outdated parse)
+            resume.raw_text = cached.raw_text if cached else extract_text_from_file(source)
+            
+            # Parse content
+            parsed_data = parse_resume_content(resume.raw_text)
         
-        resume.personal_info = parsed_data['personal_info']
-        resume.skills = parsed_data['skills']
-        resume.experience = parsed_data['experience']
-        resume.education = parsed_data['education']
-        resume.projects = parsed_data['projects']
-        resume.certifications = parsed_data['certifications']
+        changed_fields = apply_parsed_fields(resume, parsed_data)
         
         resume.processing_status = 'processed'
-        resume.save()
+        resume.error_message = ''
+        resume.save(update_fields=[
+            'content_hash', 'raw_text', 'processing_status', 'error_message', 'updated_at',
+            *changed_fields
+        ])
         
     except Exception as e:
-        resume.processing_status = 'error'
-        resume.error_message = str(e)
-        resume.save()
\ No newline at end of file
+        Resume.objects.filter(id=resume_id).update(
+            processing_status='error',
+            error_message=str(e)
+        )
+        bump_versions('resumes')
+
+def ingest_resume_bytes(resume_id, filename, data, content_hash=''):
+    """Store and process resume bytes that are already in memory
+    
+    The bytes are written to local disk and parsed straight away; the copy
+    to remote storage is queued to run after the transaction commits, so
+    neither parsing nor the response waits on (or downloads from) it. Bytes
+    that are already stored remotely just take a reference to that copy.
+    """
+    from .models import Resume
+    
+    blob = acquire_existing_blob(content_hash)
+    if blob:
+        point_at_blob(Resume, resume_id, blob)
+        process_resume_async(resume_id, file_obj=ContentFile(data, name=filename))
+        return
+    
+    local_path = save_local(f'resumes/{filename}', ContentFile(data))
+    Resume.objects.filter(id=resume_id).update(local_path=local_path, storage_status='pending')
+    bump_versions('resumes')
+    
+    process_resume_async(resume_id, file_obj=ContentFile(data, name=filename))
+    schedule_remote_copy(Resume, resume_id)
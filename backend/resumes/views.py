@@ -5,13 +5,21 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse, Http404
-from .models import Resume
+from .models import Resume, ResumeImportBatch
 from .serializer import ResumeSerializer, ResumeCreateSerializer
-from .utils import process_resume_async
+from .utils import ingest_resume_bytes
+from utils.fieldsets import sparse_queryset
+from utils.pagination import KeysetPagination
+from utils.versioning import versioned_response
+from .bulk_import import load_manifest, queue_resume_archive, build_batch_report
+from .downloads import serve_resume_file
+from utils.hashing import read_and_hash
+import logging
 import tempfile
 import os
 
+logger = logging.getLogger(__name__)
+
 class ResumeListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
@@ -26,41 +34,36 @@ class ResumeListCreateView(APIView):
             evaluated_resume_ids = Evaluation.objects.values_list('resume_id', flat=True).distinct()
             resumes = Resume.objects.filter(id__in=evaluated_resume_ids)
         
-        serializer = ResumeSerializer(resumes, many=True, context={'request': request})
-        return Response(serializer.data)
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(sparse_queryset(resumes, ResumeSerializer, request), request)
+        serializer = ResumeSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
     
     def post(self, request):
-        # Debug: Check storage backend
-        from django.core.files.storage import default_storage
-        print(f"🔧 Storage backend: {type(default_storage)}")
-        print(f"🔧 Storage location: {getattr(default_storage, 'location', 'No location attr')}")
-        
         serializer = ResumeCreateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             # Get the uploaded file
             uploaded_file = request.FILES.get('file')
             
-            print(f"🔍 Uploading file: {uploaded_file.name}")
-            print(f"🔍 File size: {uploaded_file.size}")
-            print(f"🔍 Content type: {uploaded_file.content_type}")
+            # Read the upload once: the same bytes are hashed, parsed and stored
+            data, content_hash = read_and_hash(uploaded_file)
             
             resume = Resume.objects.create(
                 user=request.user,
                 file_name=uploaded_file.name,
                 file_size=uploaded_file.size,
-                file=uploaded_file
+                content_hash=content_hash
             )
-            resume.save()
             
-            print(f"✅ File saved. File path/URL: {resume.file}")
-            print(f"✅ File name in storage: {resume.file.name}")
-            print(f"✅ File URL: {resume.file.url if resume.file else 'No file'}")
-            
-            # Trigger background processing
+            # Saved locally and parsed now; the copy to remote storage is queued
+            # (write-behind) on commit and runs in the background
             try:
-                process_resume_async(resume.id)
-            except Exception as e:
-                print(f"Error processing resume: {e}")
+                ingest_resume_bytes(resume.id, uploaded_file.name, data, content_hash)
+            except Exception:
+                logger.exception(f"Error processing resume {resume.id}")
+            
+            # Pick up the stored file name and parsed fields
+            resume.refresh_from_db()
             
             # Return full resume data
             response_serializer = ResumeSerializer(resume, context={'request': request})
@@ -71,7 +74,7 @@ class ResumeDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, pk):
-        resume = get_object_or_404(Resume, pk=pk)
+        resume = get_object_or_404(sparse_queryset(Resume.objects.all(), ResumeSerializer, request), pk=pk)
         
         # Students can only access their own resumes
         if request.user.role == 'student' and resume.user != request.user:
@@ -109,29 +112,80 @@ class ResumeDownloadView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        if resume.file:
-            response = HttpResponse(resume.file, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{resume.file_name}"'
-            return response
-        else:
-            raise Http404("File not found")
+        return serve_resume_file(request, resume)
+
+class ResumeBulkUploadView(APIView):
+    """Placement team uploads a ZIP of resumes for many students at once"""
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    def post(self, request):
+        if request.user.role == 'student':
+            return Response(
+                {'error': 'Permission denied'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        archive = request.FILES.get('archive')
+        if not archive:
+            return Response({'error': 'A ZIP archive is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if os.path.splitext(archive.name)[1].lower() != '.zip':
+            return Response({'error': 'Only ZIP archives are allowed.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            manifest = load_manifest(request.FILES.get('manifest'))
+        except (UnicodeDecodeError, ValueError):
+            return Response({'error': 'Manifest must be a UTF-8 CSV file'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # The upload is removed when the request ends, so the import keeps its own copy
+        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as archive_copy:
+            for chunk in archive.chunks():
+                archive_copy.write(chunk)
+        
+        batch = ResumeImportBatch.objects.create(
+            uploaded_by=request.user,
+            archive_name=archive.name
+        )
+        queue_resume_archive(batch, archive_copy.name, manifest=manifest)
+        
+        return Response({
+            'id': batch.id,
+            'archive_name': batch.archive_name,
+            'status': batch.status,
+        }, status=status.HTTP_202_ACCEPTED)
+
+class ResumeBulkUploadStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, pk):
+        if request.user.role == 'student':
+            return Response(
+                {'error': 'Permission denied'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        batch = get_object_or_404(ResumeImportBatch, pk=pk)
+        return Response(build_batch_report(batch))
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def resume_stats(request):
     """Get resume statistics for dashboard"""
-    if request.user.role == 'student':
-        total_resumes = Resume.objects.filter(user=request.user).count()
+    return versioned_response(request, ['resumes'], lambda: count_resumes(request.user))
+
+def count_resumes(user):
+    if user.role == 'student':
+        total_resumes = Resume.objects.filter(user=user).count()
         processed_resumes = Resume.objects.filter(
-            user=request.user, 
+            user=user, 
             processing_status='processed'
         ).count()
     else:
         total_resumes = Resume.objects.count()
         processed_resumes = Resume.objects.filter(processing_status='processed').count()
     
-    return Response({
+    return {
         'total_resumes': total_resumes,
         'processed_resumes': processed_resumes,
         'pending_resumes': total_resumes - processed_resumes
-    })
+    }
@@ -0,0 +1,20 @@
+from django.apps import AppConfig, apps
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+
+class UtilsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'utils'
+
+    def ready(self):
+        from utils.sqlite_tuning import tune_sqlite_connection
+        from utils.versioning import VERSIONED_MODELS, bump_on_write
+
+        connection_created.connect(tune_sqlite_connection)
+
+        # Every write bumps its resource group's version (ETags, utils.versioning)
+        for label in VERSIONED_MODELS:
+            model = apps.get_model(label)
+            post_save.connect(bump_on_write, sender=model)
+            post_delete.connect(bump_on_write, sender=model)
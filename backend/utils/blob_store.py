@@ -0,0 +1,115 @@
+# utils/blob_store.py
+"""
+Content-addressed, reference-counted file storage
+
+Each distinct file is stored once on the remote backend under
+``blobs/<sha[:2]>/<sha><ext>`` and recorded as a ``StoredBlob``. Rows that
+upload the same bytes point at the same blob; every row holds one
+reference and deleting a row releases it. The stored file is removed
+when the last reference goes, so storage and upload bandwidth grow with
+the number of unique documents rather than the number of uploads.
+"""
+
+import logging
+import os
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from utils.models import StoredBlob
+
+logger = logging.getLogger(__name__)
+
+CREATE_ATTEMPTS = 3
+
+
+def blob_name(content_hash, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    return f'blobs/{content_hash[:2]}/{content_hash}{extension}'
+
+
+def acquire_existing_blob(content_hash):
+    """Take a reference to the blob holding these bytes, or return None if they are new"""
+    if not content_hash:
+        return None
+    with transaction.atomic():
+        if not StoredBlob.objects.filter(sha256=content_hash).update(ref_count=F('ref_count') + 1):
+            return None
+        return StoredBlob.objects.get(sha256=content_hash)
+
+
+def acquire_blob(content_hash, filename, size, upload):
+    """Take a reference to the blob for these bytes, uploading them only if they are new
+
+    ``upload(name)`` stores the bytes on the current remote backend under
+    ``name`` and returns ``(stored_name, url)``. Returns ``(blob, created)``.
+    """
+    from utils.write_behind import backend_named
+
+    blob = acquire_existing_blob(content_hash)
+    if blob:
+        return blob, False
+
+    backend = getattr(settings, 'FILE_STORAGE_BACKEND', 'cloudinary')
+    stored_name, url = upload(blob_name(content_hash, filename))
+    for attempt in range(CREATE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                blob = StoredBlob.objects.create(
+                    sha256=content_hash,
+                    backend=backend,
+                    storage_name=stored_name,
+                    url=url or '',
+                    size=size,
+                    ref_count=1
+                )
+            return blob, True
+        except IntegrityError:
+            # A concurrent upload of the same bytes won; use its copy instead of ours
+            blob = acquire_existing_blob(content_hash)
+            if blob is None:
+                # ...and its last reference went before we could take one; try ours again
+                continue
+            if blob.storage_name != stored_name:
+                backend_named(backend).delete(stored_name)
+            return blob, False
+
+    backend_named(backend).delete(stored_name)
+    raise RuntimeError(f'Could not record blob {content_hash} after {CREATE_ATTEMPTS} attempts')
+
+
+def release_blob(blob_id):
+    """Drop one reference, deleting the blob and its stored file when none are left"""
+    if not blob_id:
+        return
+    with transaction.atomic():
+        StoredBlob.objects.filter(pk=blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+        blob = StoredBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None or blob.ref_count > 0:
+            return
+        # The row goes in the transaction that dropped the last reference, so a
+        # concurrent acquire_existing_blob() stores a fresh copy instead of
+        # pointing at this one. The remote delete waits for the commit rather
+        # than holding the database write lock (BEGIN IMMEDIATE on SQLite)
+        # during a network call.
+        blob.delete()
+        transaction.on_commit(lambda: delete_stored_file(blob.backend, blob.storage_name))
+
+
+def delete_stored_file(backend, storage_name):
+    """Remove an unreferenced blob's file, unless a newer blob has been stored under the same name"""
+    from utils.write_behind import backend_named
+
+    if StoredBlob.objects.filter(backend=backend, storage_name=storage_name).exists():
+        return
+    try:
+        backend_named(backend).delete(storage_name)
+    except Exception as e:
+        logger.error(f"Could not delete unreferenced blob {storage_name}: {str(e)}")
+
+
+def release_blob_on_delete(sender, instance, **kwargs):
+    """post_delete receiver for models with a ``blob`` foreign key"""
+    if instance.blob_id:
+        transaction.on_commit(lambda: release_blob(instance.blob_id))
@@ -0,0 +1,290 @@
+# utils/disk_cache.py
+"""
+Size-bounded, content-addressed disk cache for remote originals
+
+Files are stored as ``<directory>/<key[:2]>/<key>`` where the key is the
+file's SHA-256 (or a hash of its remote name when the content hash is not
+known). Entries are written to a temporary file and moved into place with
+``os.replace``, so readers never see a partial file. Per-key file locks
+stop concurrent processes from downloading the same original twice, and
+least recently used entries are evicted once the byte budget is exceeded.
+The cache's total size is kept in ``size.json`` and bumped on every miss;
+the entries are only listed and sorted when that total goes over budget.
+
+Hit/miss/eviction counters are kept in memory by each process and written
+to a file of its own under ``stats/`` every few seconds, so a cache hit
+takes no lock and writes nothing. ``stats()`` adds them up.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+STAT_KEYS = ('hits', 'misses', 'evictions')
+STATS_FLUSH_SECONDS = 5
+
+
+@contextmanager
+def _file_lock(path):
+    if fcntl is None:
+        yield
+        return
+
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def key_for_name(name):
+    """Cache key for a remote object whose content hash is unknown"""
+    return hashlib.sha256(f'name:{name}'.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(self.directory, 'tmp'), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, 'locks'), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, 'stats'), exist_ok=True)
+        self._counts_lock = threading.Lock()
+        self._reset_counts()
+        atexit.register(self._fold_counts)
+
+    def _reset_counts(self):
+        # A fresh file name per process, so a forked worker does not write its parent's
+        self._pid = os.getpid()
+        self._counts_path = os.path.join(self.directory, 'stats', f'{self._pid}-{uuid.uuid4().hex}.json')
+        self._counts = dict.fromkeys(STAT_KEYS, 0)
+        self._flushed_at = time.monotonic()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _key_lock(self, key):
+        # 256 lock stripes instead of one lock file per entry
+        return _file_lock(os.path.join(self.directory, 'locks', f'{key[:2]}.lock'))
+
+    def _global_lock(self):
+        return _file_lock(os.path.join(self.directory, 'locks', 'cache.lock'))
+
+    def get(self, key):
+        """Path of a cached entry (marking it recently used), or None"""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached path for ``key``, calling ``fetch(file_obj)`` on a miss
+
+        ``fetch`` writes the original's bytes into the file object it is given.
+        """
+        path = self.get(key)
+        if path:
+            self._record('hits')
+            return path
+
+        with self._key_lock(key):
+            # Another process may have fetched it while we waited
+            path = self.get(key)
+            if path:
+                self._record('hits')
+                return path
+
+            path = self.path_for(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = os.path.join(self.directory, 'tmp', f'{key}.{uuid.uuid4().hex}')
+            try:
+                with open(tmp_path, 'wb') as tmp_file:
+                    fetch(tmp_file)
+                added = os.path.getsize(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        self._record('misses')
+        self._add_size(added, keep=path)
+        return path
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    def size(self):
+        return sum(size for path, size, mtime in self._entries())
+
+    def _size_path(self):
+        return os.path.join(self.directory, 'size.json')
+
+    def _read_size(self):
+        try:
+            with open(self._size_path()) as size_file:
+                return int(json.load(size_file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _add_size(self, added, keep=None):
+        """Count a newly fetched entry; evict only once the running total is over budget"""
+        with self._global_lock():
+            total = self._read_size()
+            if total is None:
+                # First miss (or a lost size file): the scan includes the new entry
+                total = self.size()
+            else:
+                total += added
+            evicted = 0
+            if total > self.max_bytes:
+                total, evicted = self._evict(keep)
+            self._write_stats(self._size_path(), total)
+        if evicted:
+            self._record('evictions', evicted)
+
+    def _evict(self, keep=None):
+        # Caller holds the global lock. ``keep`` is the entry about to be
+        # returned; it stays even when it alone is over budget.
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for path, size, mtime in entries)
+        evicted = 0
+        for path, size, mtime in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        return total, evicted
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its budget"""
+        with self._global_lock():
+            total, evicted = self._evict()
+            self._write_stats(self._size_path(), total)
+        if evicted:
+            self._record('evictions', evicted)
+        return evicted
+
+    def clear(self):
+        with self._global_lock():
+            for path, size, mtime in list(self._entries()):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._write_stats(self._size_path(), 0)
+
+    def _stats_path(self):
+        # Counts of processes that have exited
+        return os.path.join(self.directory, 'stats.json')
+
+    def _read_stats(self, path):
+        try:
+            with open(path) as stats_file:
+                stats = json.load(stats_file)
+        except (OSError, ValueError):
+            stats = {}
+        return {key: stats.get(key, 0) for key in STAT_KEYS}
+
+    def _write_stats(self, path, stats):
+        tmp_path = f'{path}.{uuid.uuid4().hex}'
+        with open(tmp_path, 'w') as stats_file:
+            json.dump(stats, stats_file)
+        os.replace(tmp_path, path)
+
+    def _record(self, key, count=1):
+        with self._counts_lock:
+            if os.getpid() != self._pid:
+                self._reset_counts()
+            self._counts[key] += count
+            if time.monotonic() - self._flushed_at >= STATS_FLUSH_SECONDS:
+                self._flush_counts()
+
+    def _flush_counts(self):
+        # Caller holds _counts_lock; only this process writes the file
+        self._write_stats(self._counts_path, self._counts)
+        self._flushed_at = time.monotonic()
+
+    def _fold_counts(self):
+        """At exit: move this process's counts into stats.json"""
+        with self._counts_lock:
+            if os.getpid() != self._pid or not any(self._counts.values()):
+                return
+            try:
+                with self._global_lock():
+                    stats = self._read_stats(self._stats_path())
+                    for key in STAT_KEYS:
+                        stats[key] += self._counts[key]
+                    self._write_stats(self._stats_path(), stats)
+                    try:
+                        os.remove(self._counts_path)
+                    except FileNotFoundError:
+                        pass
+            except OSError:
+                # The cache directory is gone
+                return
+            self._reset_counts()
+
+    def stats(self):
+        """Hit/miss/eviction counts summed over every process, plus current usage"""
+        with self._counts_lock:
+            if os.getpid() == self._pid and any(self._counts.values()):
+                self._flush_counts()
+        with self._global_lock():
+            stats = self._read_stats(self._stats_path())
+            stats_dir = os.path.join(self.directory, 'stats')
+            for entry in os.scandir(stats_dir):
+                if entry.name.endswith('.json'):
+                    for key, value in self._read_stats(entry.path).items():
+                        stats[key] += value
+        lookups = stats['hits'] + stats['misses']
+        entries = list(self._entries())
+        stats.update({
+            'hit_rate': round(stats['hits'] / lookups, 3) if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for path, size, mtime in entries),
+            'max_bytes': self.max_bytes,
+        })
+        return stats
+
+
+_originals_cache = None
+
+
+def originals_cache():
+    """Process-wide cache of remote resume / job description originals"""
+    global _originals_cache
+    if _originals_cache is None:
+        _originals_cache = DiskCache(
+            settings.ORIGINALS_CACHE_DIR,
+            settings.ORIGINALS_CACHE_MAX_BYTES
+        )
+    return _originals_cache
@@ -0,0 +1,129 @@
+# utils/fieldsets.py
+"""
+Sparse fieldsets and ``?expand=`` for the DRF serializers
+
+``?fields=id,overall_score,job_details.title`` returns only the listed
+fields; dotted names pick fields of a nested object.
+``?expand=resume_details`` adds a field listed in ``Meta.expandable_fields``
+(nested objects and bulky text), which are otherwise left out once either
+parameter is used. Without either parameter a serializer returns its full
+default output, so existing clients are unaffected.
+
+``sparse_queryset`` applies the same selection to the queryset: nested
+objects that are returned (and ``Meta.select_related_fields``) are joined
+with ``select_related`` and the ``Meta.deferrable_fields`` columns that
+are not returned are deferred.
+"""
+
+from rest_framework import serializers
+
+
+def parse_field_tree(value):
+    """``'id,job_details.title'`` -> ``{'id': {}, 'job_details': {'title': {}}}``"""
+    tree = {}
+    for path in value.split(','):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for part in path.split('.'):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def requested_fieldset(request):
+    """``(fields, expand)`` trees from the query string, or None when neither is given"""
+    if request is None:
+        return None
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+    fields = parse_field_tree(params['fields']) if 'fields' in params else None
+    return fields, parse_field_tree(params.get('expand', ''))
+
+
+def _selected(names, fieldset, expandable):
+    """Which of ``names`` a (fields, expand) selection keeps; None keeps the defaults"""
+    if fieldset is None:
+        return list(names)
+    fields, expand = fieldset
+    if fields is None:
+        return [name for name in names if name not in expandable or name in expand]
+    return [name for name in names if name in fields or name in expand]
+
+
+def _child_fieldset(fieldset, name):
+    fields, expand = fieldset
+    child_fields = fields.get(name) if fields else None
+    return child_fields or None, expand.get(name, {})
+
+
+class SparseFieldsetMixin:
+    """Serializer side of ``?fields=`` / ``?expand=``; see the module docstring"""
+
+    def _fieldset(self):
+        if hasattr(self, '_sparse_fieldset'):
+            return self._sparse_fieldset
+        # Only the outermost serializer reads the query string; nested ones
+        # are given their part of the selection by their parent
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return None
+        return requested_fieldset(self.context.get('request'))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self._fieldset()
+        if fieldset is None:
+            return fields
+
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        kept = _selected(fields, fieldset, expandable)
+        for name in list(fields):
+            if name not in kept:
+                del fields[name]
+                continue
+            nested = fields[name]
+            if isinstance(nested, serializers.ListSerializer):
+                nested = nested.child
+            if isinstance(nested, SparseFieldsetMixin):
+                nested._sparse_fieldset = _child_fieldset(fieldset, name)
+        return fields
+
+
+def _optimize(queryset, serializer_class, fieldset, prefix):
+    meta = serializer_class.Meta
+    declared = serializer_class._declared_fields
+    names = list(meta.fields) if isinstance(meta.fields, (list, tuple)) else list(declared)
+    kept = _selected(names, fieldset, getattr(meta, 'expandable_fields', ()))
+
+    deferred = [
+        f'{prefix}{name}' for name in getattr(meta, 'deferrable_fields', ())
+        if name not in kept
+    ]
+    if deferred:
+        queryset = queryset.defer(*deferred)
+
+    # Relations read by method fields, e.g. uploaded_by for uploaded_by_details
+    related = [f'{prefix}{name}' for name in getattr(meta, 'select_related_fields', ())]
+    if related:
+        queryset = queryset.select_related(*related)
+
+    for name in kept:
+        nested = declared.get(name)
+        if not isinstance(nested, serializers.ModelSerializer):
+            continue
+        relation = f'{prefix}{nested.source or name}'
+        queryset = queryset.select_related(relation)
+        child_fieldset = None
+        if fieldset and isinstance(nested, SparseFieldsetMixin):
+            child_fieldset = _child_fieldset(fieldset, name)
+        queryset = _optimize(queryset, type(nested), child_fieldset, f'{relation}__')
+    return queryset
+
+
+def sparse_queryset(queryset, serializer_class, request):
+    """Join the nested objects ``serializer_class`` will return and defer the unused bulky columns"""
+    return _optimize(queryset, serializer_class, requested_fieldset(request), '')
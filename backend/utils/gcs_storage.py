@@ -1,134 +1,212 @@
 # utils/gcs_storage.py
 import os
 import uuid
+import mimetypes
+from datetime import timedelta
 from django.conf import settings
-from google.cloud import storage
-import tempfile
 import json
+from utils.disk_cache import key_for_name, originals_cache
+
+# Uploads larger than this are sent as resumable uploads in chunks of
+# GCS_UPLOAD_CHUNK_SIZE (must be a multiple of 256 KB)
+GCS_RESUMABLE_THRESHOLD = 8 * 1024 * 1024
+GCS_UPLOAD_CHUNK_SIZE = getattr(settings, 'GCS_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+GCS_SIGNED_URL_EXPIRY_SECONDS = getattr(settings, 'GCS_SIGNED_URL_EXPIRY_SECONDS', 3600)
+GCS_BATCH_SIZE = 100  # calls per batch request (the API allows at most 1000)
+GCS_LISTING_LIMIT = 1000  # objects read by files_exist per listing (one page)
 
 class GoogleCloudStorage:
-    def __init__(self):
-        self._client = None
+    def __init__(self, client=None, bucket_name=None):
+        # ``client`` lets tests pass utils.fake_gcs.FakeClient instead of a real one
+        self._client = client
+        self._bucket_name = bucket_name
         self._bucket = None
         self._initialized = False
-        
+    
     def _initialize(self):
         """Initialize Google Cloud Storage client if not already initialized"""
         if self._initialized:
             return True
-            
+        
         try:
-            # Initialize GCS client
-            if hasattr(settings, 'GCS_CREDENTIALS') and settings.GCS_CREDENTIALS:
-                # Use JSON credentials
-                self._client = storage.Client.from_service_account_info(
-                    settings.GCS_CREDENTIALS,
-                    project=settings.GCS_PROJECT_ID
-                )
-            elif hasattr(settings, 'GOOGLE_APPLICATION_CREDENTIALS'):
-                # Use service account file
-                self._client = storage.Client.from_service_account_json(
-                    settings.GOOGLE_APPLICATION_CREDENTIALS,
-                    project=settings.GCS_PROJECT_ID
-                )
-            else:
-                # Use default credentials (if running on GCP)
-                self._client = storage.Client(project=settings.GCS_PROJECT_ID)
+            if self._client is None:
+                # Imported lazily: google-cloud-storage is slow to import and
+                # only needed when GCS is actually used
+                from google.cloud import storage
+                
+                if hasattr(settings, 'GCS_CREDENTIALS') and settings.GCS_CREDENTIALS:
+                    # Use JSON credentials
+                    self._client = storage.Client.from_service_account_info(
+                        settings.GCS_CREDENTIALS,
+                        project=settings.GCS_PROJECT_ID
+                    )
+                elif hasattr(settings, 'GOOGLE_APPLICATION_CREDENTIALS'):
+                    # Use service account file
+                    self._client = storage.Client.from_service_account_json(
+                        settings.GOOGLE_APPLICATION_CREDENTIALS,
+                        project=settings.GCS_PROJECT_ID
+                    )
+                else:
+                    # Use default credentials (if running on GCP)
+                    self._client = storage.Client(project=settings.GCS_PROJECT_ID)
             
             # Get bucket
-            self._bucket = self._client.bucket(settings.GCS_BUCKET_NAME)
+            bucket_name = self._bucket_name or settings.GCS_BUCKET_NAME
+            self._bucket = self._client.bucket(bucket_name)
             self._initialized = True
-            print(f"✅ Google Cloud Storage initialized: {settings.GCS_BUCKET_NAME}")
+            print(f"✅ Google Cloud Storage initialized: {bucket_name}")
             return True
-            
+        
         except Exception as e:
             print(f"❌ Failed to initialize Google Cloud Storage: {str(e)}")
             return False
     
-    def upload_file(self, file_obj, filename):
-        """Upload a file to Google Cloud Storage"""
+    def upload_file(self, file_obj, filename, content_type=None, object_name=None):
+        """Upload a file to Google Cloud Storage
+        
+        Objects stay private; the returned URL is a signed, expiring URL.
+        Large files are uploaded resumably in chunks. ``object_name`` fixes
+        the object's name (e.g. a content-addressed blob name) instead of a
+        random one.
+        """
         if not self._initialize():
             return None
-            
+        
         try:
             # Create a unique filename
             file_extension = os.path.splitext(filename)[1]
-            unique_filename = f"resumes/{uuid.uuid4()}{file_extension}"
+            unique_filename = object_name or f"resumes/{uuid.uuid4()}{file_extension}"
+            content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
             
             # Create a blob in the bucket
             blob = self._bucket.blob(unique_filename)
             
-            # Upload file
+            file_obj.seek(0, os.SEEK_END)
+            size = file_obj.tell()
             file_obj.seek(0)  # Reset file pointer
-            blob.upload_from_file(file_obj, content_type='application/pdf')
             
-            # Make the blob publicly accessible
-            blob.make_public()
+            if size > GCS_RESUMABLE_THRESHOLD:
+                # Resumable upload: an interrupted chunk is retried, not the whole file
+                blob.chunk_size = GCS_UPLOAD_CHUNK_SIZE
+            
+            blob.upload_from_file(file_obj, content_type=content_type, size=size)
             
             return {
                 'filename': unique_filename,
-                'url': blob.public_url,
-                'size': blob.size
+                'url': self._signed_url(blob),
+                'size': size
             }
         except Exception as e:
             print(f"❌ Error uploading file to GCS: {str(e)}")
             return None
     
+    def _signed_url(self, blob, expires_in=None):
+        return blob.generate_signed_url(
+            version='v4',
+            expiration=timedelta(seconds=expires_in or GCS_SIGNED_URL_EXPIRY_SECONDS),
+            method='GET'
+        )
+    
     def delete_file(self, filename):
         """Delete a file from Google Cloud Storage"""
+        return self.delete_files([filename])
+    
+    def delete_files(self, filenames):
+        """Delete many files in a single batched request"""
         if not self._initialize():
             return False
-            
+        filenames = list(filenames)
+        
         try:
-            blob = self._bucket.blob(filename)
-            blob.delete()
-            print(f"✅ File deleted from GCS: {filename}")
+            for start in range(0, len(filenames), GCS_BATCH_SIZE):
+                with self._client.batch():
+                    for filename in filenames[start:start + GCS_BATCH_SIZE]:
+                        self._bucket.blob(filename).delete()
+            print(f"✅ {len(filenames)} file(s) deleted from GCS")
             return True
         except Exception as e:
-            print(f"❌ Error deleting file from GCS: {str(e)}")
+            print(f"❌ Error deleting files from GCS: {str(e)}")
             return False
     
-    def get_file_url(self, filename):
-        """Get public URL for a file"""
+    def get_file_url(self, filename, expires_in=None):
+        """Get a signed, expiring URL for a file (no per-object ACL change needed)"""
         if not self._initialize():
             return None
-            
+        
         try:
             blob = self._bucket.blob(filename)
-            return blob.public_url
+            return self._signed_url(blob, expires_in)
         except Exception as e:
             print(f"❌ Error getting file URL from GCS: {str(e)}")
             return None
     
-    def download_file(self, filename):
-        """Download a file from Google Cloud Storage to temporary file"""
+    def download_file(self, filename, content_hash=None):
+        """Download a file from Google Cloud Storage into the local originals cache
+        
+        Returns the path of the cached copy; it is shared and must not be
+        deleted by the caller. Repeat downloads are served from disk.
+        """
         if not self._initialize():
             return None
-            
+        
         try:
-            blob = self._bucket.blob(filename)
-            
-            # Create a temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            blob.download_to_filename(temp_file.name)
-            
-            print(f"✅ File downloaded from GCS: {filename}")
-            return temp_file.name
+            key = content_hash or key_for_name(f'gcs:{filename}')
+            path = originals_cache().get_or_fetch(
+                key, lambda file_obj: self.download_to_file(filename, file_obj)
+            )
+            print(f"✅ File available locally: {filename}")
+            return path
         except Exception as e:
             print(f"❌ Error downloading file from GCS: {str(e)}")
             return None
     
+    def download_to_file(self, filename, file_obj):
+        """Stream a file's bytes into an open file object (raises on failure)"""
+        if not self._initialize():
+            raise IOError('Google Cloud Storage is not configured')
+        self._bucket.blob(filename).download_to_file(file_obj)
+    
     def file_exists(self, filename):
         """Check if a file exists in Google Cloud Storage"""
+        return self.files_exist([filename]).get(filename, False)
+    
+    def files_exist(self, filenames):
+        """Check many files at once with one listing per directory
+        
+        Each listing is narrowed to the longest prefix shared by the names
+        being checked, so a single file costs one small request, and is
+        capped at one page. Names sorting after the last object of a capped
+        listing are checked one by one, so a large folder is never listed in
+        full. Returns a dict of filename -> bool.
+        """
+        result = {filename: False for filename in filenames}
         if not self._initialize():
-            return False
-            
+            return result
+        
         try:
-            blob = self._bucket.blob(filename)
-            return blob.exists()
+            directories = {}
+            for filename in filenames:
+                directories.setdefault(os.path.dirname(filename), set()).add(filename)
+            
+            for wanted in directories.values():
+                prefix = os.path.commonprefix(sorted(wanted))
+                listed = [
+                    blob.name for blob in
+                    self._client.list_blobs(self._bucket, prefix=prefix, max_results=GCS_LISTING_LIMIT)
+                ]
+                for name in listed:
+                    if name in wanted:
+                        result[name] = True
+                
+                if len(listed) == GCS_LISTING_LIMIT:
+                    # Listings are in name order; later names were not reached
+                    for filename in wanted:
+                        if filename > listed[-1]:
+                            result[filename] = self._bucket.blob(filename).exists()
+            return result
         except Exception as e:
             print(f"❌ Error checking file existence in GCS: {str(e)}")
-            return False
+            return result
 
 # Create a global instance
-gcs_storage = GoogleCloudStorage()
\ No newline at end of file
+gcs_storage = GoogleCloudStorage()
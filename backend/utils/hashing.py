@@ -0,0 +1,53 @@
+# utils/hashing.py
+import hashlib
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def compute_sha256(file_obj):
+    """Return the hex SHA-256 digest of a file-like object's bytes.
+
+    The file is read in chunks and rewound afterwards so callers can keep
+    using it (e.g. for text extraction or storage upload).
+    """
+    hasher = hashlib.sha256()
+
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+
+    if hasattr(file_obj, 'chunks'):
+        # Django File / UploadedFile objects
+        for chunk in file_obj.chunks(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    else:
+        for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+
+    return hasher.hexdigest()
+
+
+def read_and_hash(file_obj):
+    """Read a file-like object in a single pass, returning ``(bytes, sha256 hex digest)``.
+
+    Used for uploads that are parsed and stored from the same in-memory
+    bytes, so neither step has to read the file again.
+    """
+    hasher = hashlib.sha256()
+    chunks = []
+
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+
+    if hasattr(file_obj, 'chunks'):
+        iterator = file_obj.chunks(HASH_CHUNK_SIZE)
+    else:
+        iterator = iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b'')
+
+    for chunk in iterator:
+        hasher.update(chunk)
+        chunks.append(chunk)
+
+    return b''.join(chunks), hasher.hexdigest()
@@ -0,0 +1,215 @@
+# utils/management/commands/benchmark_queries.py
+import random
+import re
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from evaluations.models import Evaluation
+from jobs.models import HIGH_MATCH_SCORE_THRESHOLD, JobDescription
+from resumes.models import Resume
+
+User = get_user_model()
+
+# Models whose Meta.indexes are dropped for the --compare run
+INDEXED_MODELS = [Evaluation, Resume, JobDescription]
+
+# Plan lines that mean a whole table is read, per database vendor
+FULL_SCAN_PATTERNS = {
+    'sqlite': r'^SCAN {table}$',
+    'postgresql': r'Seq Scan on {table}\b',
+}
+
+# Plan lines that mean rows are sorted instead of read in index order
+SORT_PATTERNS = {
+    'sqlite': r'USE TEMP B-TREE FOR .*ORDER BY',
+    'postgresql': r'\bSort\b',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large throwaway dataset, then time the hot ranking and filter '
+        'queries and capture their EXPLAIN plans. Fails when a query the '
+        'indexes are meant to serve reads a whole table or sorts instead. '
+        'Everything runs in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=500, help='Job descriptions to seed')
+        parser.add_argument('--students', type=int, default=5000, help='Students (one resume each) to seed')
+        parser.add_argument(
+            '--evaluations-per-job',
+            type=int,
+            default=100,
+            help='Evaluations to seed for each job'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Run each query this many times and keep the median')
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Also run with the Meta.indexes of the evaluation, resume and job models dropped'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated data')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            self.stderr.write(f'Plans are not checked on {connection.vendor}; only timings are reported')
+        if options['compare'] and not connection.features.can_rollback_ddl:
+            raise CommandError(f'--compare drops indexes and needs transactional DDL, which {connection.vendor} lacks')
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            job_id, student_id = self.seed(options)
+            self.analyze()
+            self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+            queries = self.queries(job_id, student_id)
+            indexed = [self.measure(query, options['repeat']) for query in queries]
+            unindexed = None
+            if options['compare']:
+                self.drop_indexes()
+                self.analyze()
+                unindexed = [self.measure(query, options['repeat']) for query in queries]
+            transaction.set_rollback(True)
+
+        failures = []
+        for position, (label, tables, index_ordered, run) in enumerate(queries):
+            ms, plan = indexed[position]
+            line = f'{label}: {ms:.2f} ms'
+            if unindexed:
+                line += f' (without indexes {unindexed[position][0]:.2f} ms)'
+            self.stdout.write(line)
+            for row in plan:
+                self.stdout.write(f'    {row}')
+
+            for table in tables:
+                if self.plan_matches(plan, FULL_SCAN_PATTERNS, table=table):
+                    failures.append(f'{label}: full scan of {table}')
+            if index_ordered and self.plan_matches(plan, SORT_PATTERNS):
+                failures.append(f'{label}: sorted instead of read in index order')
+
+        if failures:
+            raise CommandError('Query plan regressions:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS(f'{len(queries)} queries use their indexes'))
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        prefix = f'bench-{uuid.uuid4().hex[:8]}'
+
+        owner = User.objects.create(username=f'{prefix}-owner', role='placement_team', password='!')
+        students = User.objects.bulk_create([
+            User(username=f'{prefix}-{i}', role='student', password='!')
+            for i in range(options['students'])
+        ], batch_size=1000)
+        resumes = Resume.objects.bulk_create([
+            Resume(
+                user=student,
+                file_name='resume.pdf',
+                file_size=1024,
+                processing_status=rng.choice(['processed'] * 8 + ['uploaded', 'error'])
+            )
+            for student in students
+        ], batch_size=1000)
+        jobs = JobDescription.objects.bulk_create([
+            JobDescription(
+                title=f'Job {i}',
+                company_name=f'Company {i % 50}',
+                job_description_file='job_descriptions/job.txt',
+                uploaded_by=owner,
+                priority=rng.choice(['high', 'medium', 'medium', 'low']),
+                is_active=rng.random() < 0.8
+            )
+            for i in range(options['jobs'])
+        ], batch_size=1000)
+
+        per_job = min(options['evaluations_per_job'], len(resumes))
+        evaluations = []
+        for job in jobs:
+            for resume in rng.sample(resumes, per_job):
+                evaluations.append(Evaluation(
+                    resume=resume,
+                    job_description=job,
+                    overall_score=rng.randint(0, 100)
+                ))
+            if len(evaluations) >= 5000:
+                Evaluation.objects.bulk_create(evaluations)
+                evaluations = []
+        Evaluation.objects.bulk_create(evaluations)
+
+        return jobs[0].id, students[0].id
+
+    def queries(self, job_id, student_id):
+        """(label, tables that must not be fully scanned, expects index order, run)"""
+        return [
+            ('candidates page', ['evaluations_evaluation'], True, lambda: list(
+                Evaluation.objects.filter(job_description_id=job_id).order_by('-overall_score', '-id')[:51]
+            )),
+            ('export above a score', ['evaluations_evaluation'], True, lambda: list(
+                Evaluation.objects.filter(job_description_id=job_id, overall_score__gte=50).order_by('-overall_score')
+            )),
+            ('evaluation list page', ['evaluations_evaluation'], True, lambda: list(
+                Evaluation.objects.order_by('-overall_score', '-id')[:51]
+            )),
+            ('high score count', ['evaluations_evaluation'], False, lambda: (
+                Evaluation.objects.filter(overall_score__gte=HIGH_MATCH_SCORE_THRESHOLD).count()
+            )),
+            ('student evaluation page', ['evaluations_evaluation', 'resumes_resume'], False, lambda: list(
+                Evaluation.objects.filter(resume__user_id=student_id).order_by('-overall_score', '-id')[:51]
+            )),
+            ('student high score count', ['evaluations_evaluation', 'resumes_resume'], False, lambda: (
+                Evaluation.objects.filter(
+                    resume__user_id=student_id, overall_score__gte=HIGH_MATCH_SCORE_THRESHOLD
+                ).count()
+            )),
+            ('student processed resumes', ['resumes_resume'], False, lambda: (
+                Resume.objects.filter(user_id=student_id, processing_status='processed').count()
+            )),
+            ('high priority active jobs', ['jobs_jobdescription'], False, lambda: (
+                JobDescription.objects.filter(is_active=True, priority='high').count()
+            )),
+        ]
+
+    def measure(self, query, repeat):
+        """Median time in ms and the EXPLAIN plan of the query's last statement"""
+        label, tables, index_ordered, run = query
+        timings = []
+        for _ in range(max(repeat, 1)):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), self.explain(captured.captured_queries[-1]['sql'])
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [' '.join(str(value) for value in row) for row in rows]
+
+    def plan_matches(self, plan, patterns, **names):
+        pattern = patterns.get(connection.vendor)
+        if pattern is None:
+            return False
+        pattern = pattern.format(**{key: re.escape(value) for key, value in names.items()})
+        return any(re.search(pattern, row.strip()) for row in plan)
+
+    def analyze(self):
+        # Fresh planner statistics for the seeded rows
+        if connection.vendor in FULL_SCAN_PATTERNS:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
@@ -0,0 +1,27 @@
+# utils/management/commands/originals_cache.py
+from django.core.management.base import BaseCommand
+
+from utils.disk_cache import originals_cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss statistics for the local cache of remote originals, or trim/clear it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evict', action='store_true', help='Trim the cache to its byte budget')
+        parser.add_argument('--clear', action='store_true', help='Remove every cached original')
+
+    def handle(self, *args, **options):
+        cache = originals_cache()
+        if options['clear']:
+            cache.clear()
+        elif options['evict']:
+            self.stdout.write(f'{cache.evict()} entries evicted')
+
+        stats = cache.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.1f} of "
+            f"{stats['max_bytes'] / 1024 / 1024:.0f} MB; {stats['hits']} hits, "
+            f"{stats['misses']} misses (hit rate {stats['hit_rate']:.0%}), "
+            f"{stats['evictions']} evictions"
+        ))
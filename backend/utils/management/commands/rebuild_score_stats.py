@@ -0,0 +1,25 @@
+# utils/management/commands/rebuild_score_stats.py
+from django.core.management.base import BaseCommand
+
+from evaluations.score_stats import rebuild_score_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the per-job score statistics (counters, histogram, mean '
+        'and max) from the evaluations. They are normally kept up to date on '
+        'every evaluation write; run this after bulk changes that bypass it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job',
+            type=int,
+            action='append',
+            dest='jobs',
+            help='Only rebuild this job (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_score_stats(options['jobs'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt score statistics for {rebuilt} jobs'))
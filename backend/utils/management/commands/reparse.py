@@ -0,0 +1,94 @@
+# utils/management/commands/reparse.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs import utils as job_utils
+from jobs.models import JobDescription
+from resumes import utils as resume_utils
+from resumes.models import Resume
+from utils.versioning import bump_model_version
+
+TARGETS = {
+    'resumes': (Resume, resume_utils.parse_resume_content, resume_utils.apply_parsed_fields,
+                resume_utils.PARSED_FIELDS, resume_utils.PARSER_VERSION, []),
+    'jobs': (JobDescription, job_utils.parse_job_description, job_utils.apply_parsed_fields,
+             job_utils.PARSED_FIELDS, job_utils.PARSER_VERSION, ['title']),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-run the resume / job description parsers over the stored raw_text. '
+        'Files are not downloaded again; only changed fields are written back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--outdated',
+            action='store_true',
+            help='Only reparse rows produced by an older parser version'
+        )
+        parser.add_argument(
+            '--model',
+            choices=['resumes', 'jobs', 'all'],
+            default='all'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Parse and count changes without writing them'
+        )
+
+    def handle(self, *args, **options):
+        names = ['resumes', 'jobs'] if options['model'] == 'all' else [options['model']]
+        for name in names:
+            scanned, updated = self.reparse(name, options)
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: reparsed {scanned} rows, {updated} changed'
+                f"{' (dry run)' if options['dry_run'] else ''}"
+            ))
+
+    def reparse(self, name, options):
+        model, parse, apply_parsed_fields, parsed_fields, version, extra_fields = TARGETS[name]
+        chunk_size = options['chunk_size']
+
+        queryset = model.objects.exclude(raw_text='')
+        if options['outdated']:
+            queryset = queryset.filter(parser_version__lt=version)
+        queryset = queryset.only(
+            'id', 'raw_text', 'parser_version', *parsed_fields, *extra_fields
+        ).order_by('pk')
+
+        scanned = updated = 0
+        last_pk = 0
+        while True:
+            # Keyset over the primary key so rows updated by the previous chunk
+            # never shift the window (and no cursor stays open while writing).
+            chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            scanned += len(chunk)
+
+            changed_rows = []
+            changed_fields = set()
+            for row in chunk:
+                fields = apply_parsed_fields(row, parse(row.raw_text))
+                if fields:
+                    changed_rows.append(row)
+                    changed_fields.update(fields)
+
+            if changed_rows and not options['dry_run']:
+                # bulk_update() does not apply auto_now
+                now = timezone.now()
+                for row in changed_rows:
+                    row.updated_at = now
+                model.objects.bulk_update(changed_rows, [*sorted(changed_fields), 'updated_at'])
+                bump_model_version(model)
+            updated += len(changed_rows)
+
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name}: {scanned} scanned, {updated} changed')
+
+        return scanned, updated
@@ -0,0 +1,44 @@
+# utils/management/commands/retry_uploads.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from jobs.models import JobDescription
+from resumes.models import Resume
+from utils.write_behind import copy_to_remote
+
+# Models stored through utils.write_behind, with their file field
+UPLOADED_FILES = [(Resume, 'file'), (JobDescription, 'job_description_file')]
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy uploads that are still only on local disk to the remote storage '
+        'backend: failed copies, and pending ones left behind by a restarted worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pending-minutes',
+            type=int,
+            default=10,
+            help='Also retry pending uploads older than this many minutes'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['pending_minutes'])
+
+        copied = failed = 0
+        for model, field_name in UPLOADED_FILES:
+            queryset = model.objects.exclude(local_path='').filter(
+                Q(storage_status='failed') | Q(storage_status='pending', created_at__lt=cutoff)
+            )
+            for pk in queryset.order_by('pk').values_list('pk', flat=True):
+                if copy_to_remote(model._meta.label, pk, field_name):
+                    copied += 1
+                else:
+                    failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{copied} uploads copied, {failed} still failing'))
@@ -0,0 +1,86 @@
+# utils/management/commands/snapshot_embeddings.py
+import os
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from embedding_snapshot import (
+    compact, current_seq, pending_changes, read_header, reset_journal,
+    snapshot_path, write_snapshot
+)
+from embedding_writer import interprocess_lock
+from llm_config import CHROMA_PERSIST_DIRECTORY
+
+COLLECTIONS = ['resumes', 'job_descriptions']
+
+
+class Command(BaseCommand):
+    help = (
+        'Write memory-mapped embedding snapshots that workers load at startup. '
+        'By default the pending journal is folded into the existing snapshot; '
+        'use --rebuild to export every vector from Chroma instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection',
+            choices=COLLECTIONS + ['all'],
+            default='all'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Read all embeddings from Chroma (needed for the first snapshot)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        names = COLLECTIONS if options['collection'] == 'all' else [options['collection']]
+        os.makedirs(CHROMA_PERSIST_DIRECTORY, exist_ok=True)
+        lock_path = os.path.join(CHROMA_PERSIST_DIRECTORY, '.write.lock')
+
+        client = self.chroma_client() if options['rebuild'] else None
+        for name in names:
+            # Same lock as the embedding writer, so no upsert lands between
+            # reading the vectors and resetting the journal
+            with interprocess_lock(lock_path):
+                if client is not None:
+                    self.rebuild(client, name, options['chunk_size'])
+                else:
+                    pending = pending_changes(CHROMA_PERSIST_DIRECTORY, name)
+                    self.stdout.write(f'{name}: folding {pending} journal entries')
+                    compact(CHROMA_PERSIST_DIRECTORY, name)
+
+            header = read_header(snapshot_path(CHROMA_PERSIST_DIRECTORY, name))
+            if header is None:
+                self.stdout.write(f'{name}: no embeddings stored yet')
+                continue
+            version, dim, count = header
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: snapshot version {version}, {count} vectors of dimension {dim}'
+            ))
+
+    def chroma_client(self):
+        try:
+            import chromadb
+        except ImportError:
+            raise CommandError('chromadb is required for --rebuild')
+        return chromadb.PersistentClient(path=CHROMA_PERSIST_DIRECTORY)
+
+    def rebuild(self, client, name, chunk_size):
+        collection = client.get_or_create_collection(name=name)
+
+        ids, vectors = [], []
+        offset = 0
+        while True:
+            page = collection.get(include=['embeddings'], limit=chunk_size, offset=offset)
+            if not page['ids']:
+                break
+            ids.extend(page['ids'])
+            vectors.extend(page['embeddings'])
+            offset += len(page['ids'])
+
+        version = current_seq(CHROMA_PERSIST_DIRECTORY, name)
+        if ids:
+            write_snapshot(CHROMA_PERSIST_DIRECTORY, name, ids, np.asarray(vectors), version)
+        reset_journal(CHROMA_PERSIST_DIRECTORY, name, version)
@@ -0,0 +1,175 @@
+# utils/management/commands/sqlite_stress.py
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+# One write transaction looks like an evaluation being saved: read the
+# job's counters, append a log row, bump the counters
+SCHEMA = [
+    'CREATE TABLE stress_stats (job INTEGER PRIMARY KEY, n INTEGER NOT NULL)',
+    'CREATE TABLE stress_log (id INTEGER PRIMARY KEY, job INTEGER NOT NULL, payload TEXT, created REAL)',
+    'CREATE INDEX stress_log_job ON stress_log (job)',
+]
+PAYLOAD = 'x' * 1024
+STRESS_ALIAS = 'sqlite_stress'
+
+
+def run_worker(path, tuned, start_at, end_at, jobs, seed):
+    """Write (and read) against ``path`` until ``end_at``; runs in a child process"""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    from django.db import OperationalError, connections, transaction
+    from django.db.backends.signals import connection_created
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+    from utils.sqlite_tuning import apply_pragmas, tune_sqlite_connection
+
+    # A connection of its own to the scratch database, tuned or not
+    connection_created.disconnect(tune_sqlite_connection)
+    options = dict(connections['default'].settings_dict.get('OPTIONS', {}))
+    if tuned:
+        options['transaction_mode'] = 'IMMEDIATE'
+    else:
+        options.pop('transaction_mode', None)
+    connection = connections[STRESS_ALIAS] = DatabaseWrapper(
+        {**connections['default'].settings_dict, 'NAME': path, 'OPTIONS': options},
+        STRESS_ALIAS
+    )
+
+    rng = random.Random(seed)
+    writes = reads = errors = 0
+    latencies = []
+    with connection.cursor() as cursor:
+        if tuned:
+            apply_pragmas(cursor)
+        time.sleep(max(start_at - time.time(), 0))
+
+        while time.time() < end_at:
+            job = rng.randrange(jobs)
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(using=STRESS_ALIAS):
+                    cursor.execute('SELECT n FROM stress_stats WHERE job = %s', [job])
+                    cursor.fetchone()
+                    cursor.execute(
+                        'INSERT INTO stress_log (job, payload, created) VALUES (%s, %s, %s)',
+                        [job, PAYLOAD, time.time()]
+                    )
+                    cursor.execute('UPDATE stress_stats SET n = n + 1 WHERE job = %s', [job])
+                writes += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+            except OperationalError:
+                # "database is locked"; the transaction was rolled back
+                errors += 1
+
+            try:
+                cursor.execute('SELECT COUNT(*) FROM stress_log WHERE job = %s', [job])
+                cursor.fetchone()
+                reads += 1
+            except OperationalError:
+                errors += 1
+    connection.close()
+    return writes, reads, errors, latencies
+
+
+def create_database(path, jobs, wal):
+    with sqlite3.connect(path) as db:
+        if wal:
+            # As on a deployed database, where the first connection switched it
+            db.execute('PRAGMA journal_mode = WAL')
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.executemany('INSERT INTO stress_stats (job, n) VALUES (?, 0)', [(job,) for job in range(jobs)])
+    db.close()
+
+
+def run_stress(path, tuned, workers, seconds, jobs):
+    """Run ``workers`` processes against a database made by ``create_database``
+
+    Returns totals: writes, reads, errors ("database is locked"), write
+    latencies in ms, and the counter sum and log row count, which match
+    ``writes`` when no committed write was lost.
+    """
+    context = multiprocessing.get_context()
+    # Time for the workers to start (and boot Django under spawn)
+    start_at = time.time() + (1 if context.get_start_method() == 'fork' else 5)
+    end_at = start_at + seconds
+    arguments = [(path, tuned, start_at, end_at, jobs, seed) for seed in range(workers)]
+    with context.Pool(workers) as pool:
+        results = pool.starmap(run_worker, arguments)
+
+    with sqlite3.connect(path) as db:
+        counted = db.execute('SELECT COALESCE(SUM(n), 0) FROM stress_stats').fetchone()[0]
+        logged = db.execute('SELECT COUNT(*) FROM stress_log').fetchone()[0]
+    db.close()
+    return {
+        'writes': sum(result[0] for result in results),
+        'reads': sum(result[1] for result in results),
+        'errors': sum(result[2] for result in results),
+        'latencies': sorted(latency for result in results for latency in result[3]),
+        'counted': counted,
+        'logged': logged,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent writer processes against a scratch SQLite database, '
+        'once with the default settings (rollback journal, BEGIN DEFERRED) '
+        'and once with utils.sqlite_tuning (WAL, busy_timeout, BEGIN '
+        'IMMEDIATE), and compare throughput and "database is locked" errors. '
+        'The configured database is not touched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent worker processes')
+        parser.add_argument('--seconds', type=float, default=5, help='Length of each run')
+        parser.add_argument('--jobs', type=int, default=50, help='Distinct counter rows the writers contend on')
+        parser.add_argument(
+            '--mode',
+            choices=['both', 'default', 'tuned'],
+            default='both',
+            help='Which configuration to run'
+        )
+
+    def handle(self, *args, **options):
+        modes = ['default', 'tuned'] if options['mode'] == 'both' else [options['mode']]
+        # Children inherit no open connections
+        connections.close_all()
+
+        rates = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for mode in modes:
+                path = os.path.join(directory, f'{mode}.sqlite3')
+                create_database(path, options['jobs'], wal=mode == 'tuned')
+                rates[mode] = self.run(mode, path, options)
+
+        if len(rates) == 2 and rates['default']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Tuned: {rates['tuned'] / rates['default']:.1f}x the committed writes per second"
+            ))
+
+    def run(self, mode, path, options):
+        result = run_stress(path, mode == 'tuned', options['workers'], options['seconds'], options['jobs'])
+        writes, latencies = result['writes'], result['latencies']
+        if result['counted'] != result['logged'] or result['logged'] != writes:
+            raise CommandError(
+                f"{mode}: {writes} commits, but {result['logged']} log rows and counters at {result['counted']}"
+            )
+
+        rate = writes / options['seconds']
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+        self.stdout.write(
+            f"{mode}: {rate:.0f} writes/s, {result['reads'] / options['seconds']:.0f} reads/s, "
+            f"{result['errors']} locked errors, median write {statistics.median(latencies) if latencies else 0:.1f} ms, "
+            f"p95 {p95:.1f} ms ({options['workers']} workers, {options['seconds']:g}s)"
+        )
+        return rate
@@ -0,0 +1,99 @@
+# utils/management/commands/startup_profile.py
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Boots Django the way a worker does (settings, app registry, every URLconf
+# and view module) and prints the elapsed time on stdout.
+BOOT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+for module in sys.argv[1:]:
+    __import__(module)
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(output):
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us, depth) rows"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure worker boot time in a fresh interpreter and report which '
+        'modules cost the most to import. Fails when boot time exceeds the '
+        'threshold, so it can guard against import-time regressions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=getattr(settings, 'STARTUP_TIME_BUDGET_MS', 1000),
+            help='Maximum boot time in milliseconds'
+        )
+        parser.add_argument('--top', type=int, default=15, help='Number of modules to list')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Boot this many times and keep the fastest run'
+        )
+        parser.add_argument(
+            '--module',
+            action='append',
+            default=[],
+            help='Also import this module during boot (repeatable), e.g. llm_services'
+        )
+
+    def handle(self, *args, **options):
+        runs = [self.boot(options['module']) for _ in range(max(options['repeat'], 1))]
+        boot_ms, rows = min(runs, key=lambda run: run[0])
+
+        self.stdout.write(f"Slowest imports (cumulative ms, fastest of {len(runs)} runs):")
+        for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:options['top']]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f}  {name}')
+
+        packages = {}
+        for name, self_us, cumulative_us, depth in rows:
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0) + self_us
+        self.stdout.write('Import cost by top-level package (self ms):')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f}  {package}')
+
+        summary = f"Boot time: {boot_ms:.0f} ms (threshold {options['threshold']:.0f} ms)"
+        if boot_ms > options['threshold']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def boot(self, modules):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'resume_checker.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT, *modules],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Boot failed:\n{result.stderr[-2000:]}')
+
+        boot_ms = float(result.stdout.strip().splitlines()[-1]) * 1000
+        return boot_ms, parse_importtime(result.stderr)
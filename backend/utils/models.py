@@ -0,0 +1,24 @@
+# utils/models.py
+from django.db import models
+
+class StoredBlob(models.Model):
+    """One stored copy of a file's bytes, shared by every row that uploaded them"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    backend = models.CharField(max_length=20)  # settings.FILE_STORAGE_BACKEND it was stored on
+    storage_name = models.CharField(max_length=500)
+    url = models.URLField(max_length=500, blank=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)  # rows pointing at this blob
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+class ResourceVersion(models.Model):
+    """Write counter for one group of API resources; read endpoints derive their ETags from it"""
+    name = models.CharField(max_length=50, unique=True)  # e.g. 'jobs', see utils.versioning
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,127 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination for the list endpoints
+
+Pages are selected with a ``WHERE`` on the last row's ordering key, e.g.
+``(overall_score, id) < (72, 1041)``, rather than an ``OFFSET``, so every
+page costs the same however deep it is and rows inserted meanwhile do not
+shift pages. The ordering must end in a unique field (``id``).
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+
+    def __init__(self, ordering, page_size=None):
+        # e.g. ('-overall_score', '-id')
+        self.ordering = tuple(ordering)
+        if page_size:
+            self.page_size = page_size
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = cursor['v'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise ParseError('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ParseError('Invalid cursor')
+        return values, reverse
+
+    def encode_cursor(self, obj, reverse=False):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            values.append(value)
+        cursor = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(cursor.encode('ascii')).decode('ascii')
+
+    def _after(self, values, reverse):
+        """Rows strictly after the cursor in the (possibly reversed) ordering"""
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            clause = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[index]})
+            for previous, value in zip(self.ordering[:index], values):
+                clause &= Q(**{previous.lstrip('-'): value})
+            clauses.append(clause)
+        return reduce(or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            # A tampered cursor can decode fine but hold values the fields reject
+            try:
+                queryset = queryset.filter(self._after(values, reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise ParseError('Invalid cursor')
+
+        # One extra row tells whether there is another page in this direction
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_cursor = self.previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                self.next_cursor = self.encode_cursor(rows[-1])
+            if values is not None and (has_more or not reverse):
+                self.previous_cursor = self.encode_cursor(rows[0], reverse=True)
+        return rows
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -0,0 +1,595 @@
+import base64
+import io
+import json
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import IntegrityError, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from evaluations.models import Evaluation
+from evaluations.serializer import EvaluationSerializer
+from jobs.models import JobDescription
+from resumes.models import Resume
+from resumes.utils import PARSER_VERSION, parse_resume_content
+from resumes.serializer import ResumeSerializer
+from utils import blob_store, gcs_storage, write_behind
+from utils.disk_cache import DiskCache
+from utils.fieldsets import sparse_queryset
+from utils.fake_gcs import FakeBlob, FakeClient
+from utils.gcs_storage import GoogleCloudStorage
+from utils.pagination import KeysetPagination
+from utils.versioning import bump_versions
+from utils.management.commands.sqlite_stress import create_database, run_stress
+from utils.models import StoredBlob
+from utils.write_behind import copy_to_remote, local_storage, remote_backend, save_local, schedule_remote_copy
+
+User = get_user_model()
+
+
+class SqliteTuningTests(SimpleTestCase):
+    """A connection to a database file configured like the default one"""
+    alias = 'tuning_test'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'tuning.sqlite3')
+        self.connection = connections[self.alias] = DatabaseWrapper(
+            {**connections['default'].settings_dict, 'NAME': self.path},
+            self.alias
+        )
+        self.addCleanup(self.close_connection)
+
+    def close_connection(self):
+        self.connection.close()
+        del connections[self.alias]
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_hook_sets_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode').lower(), 'wal')
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_BUSY_TIMEOUT_MS)
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+
+    def test_transactions_begin_immediate(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (x INTEGER)')
+
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        with CaptureQueriesContext(self.connection) as captured:
+            with transaction.atomic(using=self.alias):
+                with self.connection.cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*) FROM t')
+                # Even a transaction that has only read holds the write lock
+                with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+                    other.execute('BEGIN IMMEDIATE')
+        self.assertEqual(captured.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+
+class SqliteStressTests(SimpleTestCase):
+    def test_concurrent_writers_never_see_locked_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stress.sqlite3')
+            create_database(path, jobs=10, wal=True)
+            result = run_stress(path, tuned=True, workers=4, seconds=1, jobs=10)
+
+        self.assertEqual(result['errors'], 0)
+        self.assertGreater(result['writes'], 0)
+        self.assertEqual(result['logged'], result['writes'])
+        self.assertEqual(result['counted'], result['writes'])
+
+
+class GoogleCloudStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.gcs = GoogleCloudStorage(client=self.client, bucket_name='test')
+        self.bucket = self.client.bucket('test')
+
+    def test_upload_returns_signed_url_without_making_public(self):
+        with mock.patch.object(FakeBlob, 'make_public') as make_public:
+            result = self.gcs.upload_file(io.BytesIO(b'%PDF-1.4'), 'cv.pdf')
+
+        make_public.assert_not_called()
+        self.assertEqual(self.client.requests, 1)
+        self.assertIn('X-Goog-Signature=', result['url'])
+        self.assertEqual(self.bucket.objects[result['filename']], b'%PDF-1.4')
+
+    def test_large_upload_is_resumable(self):
+        size = gcs_storage.GCS_RESUMABLE_THRESHOLD + 1
+        result = self.gcs.upload_file(io.BytesIO(b'x' * size), 'big.pdf')
+
+        chunks = -(-size // gcs_storage.GCS_UPLOAD_CHUNK_SIZE)
+        self.assertEqual(self.client.requests, 1 + chunks)  # session start + chunks
+        self.assertEqual(len(self.bucket.objects[result['filename']]), size)
+
+    def test_small_upload_is_single_request(self):
+        self.gcs.upload_file(io.BytesIO(b'x' * 1024), 'small.pdf')
+        self.assertEqual(self.client.requests, 1)
+
+    def test_delete_files_is_one_batched_request(self):
+        names = [f'resumes/{i}.pdf' for i in range(50)]
+        for name in names:
+            self.bucket.objects[name] = b'x'
+
+        self.assertTrue(self.gcs.delete_files(names))
+        self.assertEqual(self.client.requests, 1)
+        self.assertEqual(self.bucket.objects, {})
+
+    def test_files_exist_is_one_listing(self):
+        for i in range(50):
+            self.bucket.objects[f'resumes/{i}.pdf'] = b'x'
+
+        result = self.gcs.files_exist(['resumes/3.pdf', 'resumes/40.pdf', 'resumes/missing.pdf'])
+        self.assertEqual(result, {'resumes/3.pdf': True, 'resumes/40.pdf': True, 'resumes/missing.pdf': False})
+        self.assertEqual(self.client.requests, 1)
+
+    def test_files_exist_does_not_list_a_large_folder(self):
+        for i in range(5000):
+            self.bucket.objects[f'resumes/{i:05d}.pdf'] = b'x'
+
+        wanted = ['resumes/00001.pdf', 'resumes/04000.pdf', 'resumes/09999.pdf']
+        with mock.patch.object(gcs_storage, 'GCS_LISTING_LIMIT', 10):
+            result = self.gcs.files_exist(wanted)
+
+        self.assertEqual(result, {'resumes/00001.pdf': True, 'resumes/04000.pdf': True, 'resumes/09999.pdf': False})
+        # One capped listing, then the two names beyond it checked individually
+        self.assertEqual(self.client.requests, 3)
+
+
+@override_settings(FILE_STORAGE_BACKEND='local', WRITE_BEHIND_MAX_RETRIES=2, WRITE_BEHIND_RETRY_BACKOFF_SECONDS=0.5)
+class WriteBehindTests(TestCase):
+    def setUp(self):
+        spool = tempfile.TemporaryDirectory()
+        remote = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        self.addCleanup(remote.cleanup)
+        directories = override_settings(WRITE_BEHIND_ROOT=spool.name, LOCAL_REMOTE_STORAGE_ROOT=remote.name)
+        directories.enable()
+        self.addCleanup(directories.disable)
+        for patcher in [
+            mock.patch.object(write_behind, '_local_storage', None),
+            # copy_to_remote closes its thread's connection; keep the test's open
+            mock.patch.object(write_behind, 'connection'),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.resume = Resume.objects.create(
+            user=User.objects.create(username='student'),
+            file_name='cv.pdf',
+            file_size=8,
+            content_hash='ab' * 32,
+            local_path=save_local('resumes/cv.pdf', ContentFile(b'%PDF-1.4')),
+            storage_status='pending'
+        )
+
+    def copy(self):
+        return copy_to_remote(Resume._meta.label, self.resume.id)
+
+    def test_copy_is_queued_when_the_transaction_commits(self):
+        with mock.patch.object(write_behind._copy_executor, 'submit') as submit:
+            with self.captureOnCommitCallbacks() as callbacks:
+                with transaction.atomic():
+                    schedule_remote_copy(Resume, self.resume.id)
+                submit.assert_not_called()
+            submit.assert_not_called()
+
+            self.assertEqual(len(callbacks), 1)
+            callbacks[0]()
+        submit.assert_called_once_with(copy_to_remote, 'resumes.Resume', self.resume.id, 'file')
+
+    def test_nothing_is_queued_when_the_transaction_rolls_back(self):
+        with mock.patch.object(write_behind._copy_executor, 'submit') as submit:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with transaction.atomic():
+                    schedule_remote_copy(Resume, self.resume.id)
+                    transaction.set_rollback(True)
+        self.assertEqual(callbacks, [])
+        submit.assert_not_called()
+
+    def test_transient_failures_are_retried_with_backoff(self):
+        save = write_behind.StorageBackend.save
+        failures = [IOError('timeout'), IOError('timeout')]
+
+        def flaky_save(backend, name, content):
+            if failures:
+                raise failures.pop(0)
+            return save(backend, name, content)
+
+        with mock.patch.object(write_behind.StorageBackend, 'save', autospec=True, side_effect=flaky_save), \
+                mock.patch.object(write_behind.time, 'sleep') as sleep, \
+                self.assertLogs('utils.write_behind', level='WARNING'):
+            self.assertTrue(self.copy())
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [0.5, 1.0])
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.storage_status, 'uploaded')
+        self.assertEqual(self.resume.local_path, '')
+        self.assertTrue(remote_backend().storage.exists(self.resume.remote_name))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+
+    def test_exhausted_retries_mark_failed_and_keep_the_local_copy(self):
+        with mock.patch.object(write_behind.StorageBackend, 'save', side_effect=IOError('down')) as save, \
+                mock.patch.object(write_behind.time, 'sleep') as sleep, \
+                self.assertLogs('utils.write_behind', level='ERROR'):
+            self.assertFalse(self.copy())
+
+        self.assertEqual(save.call_count, 3)  # first try and two retries
+        self.assertEqual(sleep.call_count, 2)
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.storage_status, 'failed')
+        self.assertTrue(local_storage().exists(self.resume.local_path))
+        self.assertFalse(StoredBlob.objects.exists())
+
+
+@override_settings(FILE_STORAGE_BACKEND='local')
+class BlobStoreTests(TestCase):
+    def setUp(self):
+        remote = tempfile.TemporaryDirectory()
+        self.addCleanup(remote.cleanup)
+        directory = override_settings(LOCAL_REMOTE_STORAGE_ROOT=remote.name)
+        directory.enable()
+        self.addCleanup(directory.disable)
+        self.storage = remote_backend().storage
+
+    def upload(self, name):
+        return remote_backend().save(name, ContentFile(b'%PDF-1.4'))
+
+    def test_stored_file_is_deleted_after_the_commit(self):
+        blob, created = blob_store.acquire_blob('ab' * 32, 'cv.pdf', 8, self.upload)
+        self.assertTrue(created)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            blob_store.release_blob(blob.id)
+            self.assertFalse(StoredBlob.objects.exists())
+            self.assertTrue(self.storage.exists(blob.storage_name))
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(self.storage.exists(blob.storage_name))
+
+    def test_file_is_kept_when_a_new_blob_took_its_name(self):
+        blob, _ = blob_store.acquire_blob('ab' * 32, 'cv.pdf', 8, self.upload)
+        with self.captureOnCommitCallbacks() as callbacks:
+            blob_store.release_blob(blob.id)
+        again, created = blob_store.acquire_blob('ab' * 32, 'cv.pdf', 8, lambda name: (blob.storage_name, ''))
+        self.assertTrue(created)
+
+        callbacks[0]()
+        self.assertTrue(self.storage.exists(again.storage_name))
+
+    def test_create_is_retried_when_the_winning_blob_is_released(self):
+        create = StoredBlob.objects.create
+        conflicts = [IntegrityError('UNIQUE constraint failed')]
+
+        def racing_create(**kwargs):
+            if conflicts:
+                raise conflicts.pop()
+            return create(**kwargs)
+
+        with mock.patch.object(StoredBlob.objects, 'create', side_effect=racing_create):
+            blob, created = blob_store.acquire_blob('ab' * 32, 'cv.pdf', 8, self.upload)
+        self.assertTrue(created)
+        self.assertTrue(self.storage.exists(blob.storage_name))
+
+    def test_upload_is_deleted_when_the_blob_cannot_be_recorded(self):
+        with mock.patch.object(StoredBlob.objects, 'create', side_effect=IntegrityError('UNIQUE constraint failed')):
+            with self.assertRaises(RuntimeError):
+                blob_store.acquire_blob('ab' * 32, 'cv.pdf', 8, self.upload)
+        self.assertEqual(self.storage.listdir('blobs/ab')[1], [])
+
+
+class DiskCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def fetch(self, destination):
+        destination.write(b'original')
+
+    def test_hits_take_no_lock_and_write_nothing(self):
+        cache = DiskCache(self.directory, max_bytes=1024)
+        cache.get_or_fetch('ab' * 32, self.fetch)
+
+        with mock.patch.object(DiskCache, '_global_lock') as global_lock, \
+                mock.patch.object(DiskCache, '_write_stats') as write_stats:
+            for _ in range(100):
+                cache.get_or_fetch('ab' * 32, self.fetch)
+        global_lock.assert_not_called()
+        write_stats.assert_not_called()
+        self.assertEqual(cache.stats()['hits'], 100)
+
+    def test_file_larger_than_the_budget_is_still_returned(self):
+        cache = DiskCache(self.directory, max_bytes=4)
+        path = cache.get_or_fetch('ab' * 32, self.fetch)
+        with open(path, 'rb') as cached:
+            self.assertEqual(cached.read(), b'original')
+
+        # It goes on the next miss, which keeps its own entry instead
+        other = cache.get_or_fetch('cd' * 32, self.fetch)
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(other))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entries_are_only_scanned_when_over_budget(self):
+        cache = DiskCache(self.directory, max_bytes=20)
+        cache.get_or_fetch('ab' * 32, self.fetch)
+
+        with mock.patch.object(DiskCache, '_entries', wraps=cache._entries) as entries:
+            cache.get_or_fetch('cd' * 32, self.fetch)
+            entries.assert_not_called()
+            cache.get_or_fetch('ef' * 32, self.fetch)
+            entries.assert_called()
+        self.assertEqual(cache.size(), 16)
+        self.assertFalse(os.path.exists(cache.path_for('ab' * 32)))
+
+    def test_counts_of_every_process_are_added_up(self):
+        # One DiskCache per worker process
+        first, second = DiskCache(self.directory, 1024), DiskCache(self.directory, 1024)
+        first.get_or_fetch('ab' * 32, self.fetch)
+        second.get_or_fetch('ab' * 32, self.fetch)
+        second.get_or_fetch('cd' * 32, self.fetch)
+        first.stats()
+        second.stats()
+
+        # Counts outlive the process that made them
+        first._fold_counts()
+        stats = DiskCache(self.directory, 1024).stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertEqual(stats['hit_rate'], 0.333)
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, 'stats'))), 1)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(username='student')
+        self.resumes = [
+            Resume.objects.create(user=user, file_name=f'cv{index}.pdf', file_size=8)
+            for index in range(7)
+        ]
+        # Four rows share a timestamp, so only the id orders them
+        now = timezone.now()
+        Resume.objects.filter(id__in=[resume.id for resume in self.resumes[:4]]).update(created_at=now)
+        Resume.objects.filter(id__in=[resume.id for resume in self.resumes[4:]]).update(
+            created_at=now - timezone.timedelta(days=1)
+        )
+
+    def page(self, url='/api/resumes/?page_size=3'):
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        request = Request(APIRequestFactory().get(url))
+        rows = paginator.paginate_queryset(Resume.objects.all(), request)
+        return [row.id for row in rows], paginator
+
+    def test_equal_timestamps_are_ordered_by_id(self):
+        ids = [resume.id for resume in self.resumes]
+        expected = sorted(ids[:4], reverse=True) + sorted(ids[4:], reverse=True)
+
+        seen = []
+        url = '/api/resumes/?page_size=3'
+        while url:
+            rows, paginator = self.page(url)
+            seen += rows
+            url = paginator.get_next_link()
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_the_same_rows(self):
+        first, paginator = self.page()
+        second, paginator = self.page(paginator.get_next_link())
+        self.assertNotEqual(first, second)
+
+        back, paginator = self.page(paginator.get_previous_link())
+        self.assertEqual(back, first)
+        self.assertIsNone(paginator.get_previous_link())
+        forward, _ = self.page(paginator.get_next_link())
+        self.assertEqual(forward, second)
+
+    def test_malformed_or_tampered_cursor_is_a_bad_request(self):
+        def encode(cursor):
+            return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+        for cursor in [
+            'not-a-cursor',
+            encode(['no', 'dict']),
+            encode({'v': [timezone.now().isoformat()]}),
+            encode({'v': ['yesterday', 5]}),
+            encode({'v': [timezone.now().isoformat(), 'abc']}),
+            encode({'v': [{'nested': 1}, None]}),
+        ]:
+            with self.subTest(cursor=cursor), self.assertRaises(ParseError):
+                self.page(f'/api/resumes/?cursor={cursor}')
+
+    def test_bad_cursor_response_is_400(self):
+        client = APIClient()
+        client.force_authenticate(self.resumes[0].user)
+        response = client.get('/api/resumes/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(username='student', email='student@example.com')
+        self.resume = Resume.objects.create(user=user, file_name='cv.pdf', file_size=8,
+                                            raw_text='Python developer', skills=['python'])
+        job = JobDescription.objects.create(title='Backend', company_name='Acme', uploaded_by=user,
+                                            raw_text='Python developer')
+        Evaluation.objects.create(resume=self.resume, job_description=job, overall_score=72)
+
+    def serialize(self, serializer_class, queryset, query=''):
+        request = Request(APIRequestFactory().get(f'/api/?{query}'))
+        with CaptureQueriesContext(connections['default']) as queries:
+            rows = list(sparse_queryset(queryset, serializer_class, request))
+            data = serializer_class(rows, many=True, context={'request': request}).data
+        return data[0], [captured['sql'] for captured in queries.captured_queries]
+
+    def test_without_parameters_everything_is_returned(self):
+        data, _ = self.serialize(ResumeSerializer, Resume.objects.all())
+        self.assertEqual(data['raw_text'], 'Python developer')
+        self.assertEqual(data['user_details']['email'], 'student@example.com')
+
+    def test_fields_keeps_only_the_listed_fields(self):
+        data, sql = self.serialize(ResumeSerializer, Resume.objects.all(), 'fields=id,file_name,skills')
+        self.assertEqual(set(data), {'id', 'file_name', 'skills'})
+        # Columns that are not returned are deferred
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('raw_text', sql[0])
+        self.assertNotIn('"sections"', sql[0])
+        self.assertIn('"skills"', sql[0])
+
+    def test_unknown_fields_are_ignored(self):
+        data, _ = self.serialize(ResumeSerializer, Resume.objects.all(), 'fields=id,no_such_field')
+        self.assertEqual(set(data), {'id'})
+
+    def test_expand_adds_expandable_fields(self):
+        data, _ = self.serialize(ResumeSerializer, Resume.objects.all(), 'expand=user_details')
+        self.assertEqual(data['user_details']['username'], 'student')
+        self.assertNotIn('raw_text', data)
+        self.assertIn('skills', data)
+
+        data, _ = self.serialize(ResumeSerializer, Resume.objects.all(), 'fields=id&expand=raw_text')
+        self.assertEqual(set(data), {'id', 'raw_text'})
+
+    def test_nested_fields_are_joined_in_one_query(self):
+        data, sql = self.serialize(
+            EvaluationSerializer, Evaluation.objects.all(),
+            'fields=id,overall_score,resume_details.file_name,resume_details.user_details'
+        )
+        self.assertEqual(data['resume_details'], {
+            'file_name': 'cv.pdf',
+            'user_details': {'id': self.resume.user_id, 'username': 'student', 'email': 'student@example.com',
+                             'first_name': '', 'last_name': '', 'role': self.resume.user.role},
+        })
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('raw_text', sql[0])
+        self.assertNotIn('detailed_feedback', sql[0])
+
+
+class VersionedResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.owner = User.objects.create(username='placement', role='placement_team')
+        self.job = JobDescription.objects.create(title='Backend', company_name='Acme', uploaded_by=self.owner,
+                                                 raw_text='Python developer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_matching_etag_gets_304_without_building(self):
+        response = self.client.get('/api/jobs/stats/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with mock.patch('jobs.views.count_jobs') as count_jobs, self.assertNumQueries(1):
+            response = self.client.get('/api/jobs/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        count_jobs.assert_not_called()
+
+        # As handed back by a proxy that weakened it
+        response = self.client.get('/api/jobs/stats/', HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, 304)
+
+    def test_body_is_cached_under_the_etag(self):
+        first = self.client.get('/api/jobs/stats/')
+        with mock.patch('jobs.views.count_jobs') as count_jobs:
+            second = self.client.get('/api/jobs/stats/')
+        count_jobs.assert_not_called()
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_job_save_and_delete_change_the_etag(self):
+        first = self.client.get('/api/jobs/stats/')
+
+        JobDescription.objects.create(title='Frontend', company_name='Acme', uploaded_by=self.owner,
+                                      raw_text='React developer')
+        second = self.client.get('/api/jobs/stats/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['total_jobs'], first.data['total_jobs'] + 1)
+
+        self.job.delete()
+        third = self.client.get('/api/jobs/stats/', HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.data['total_jobs'], first.data['total_jobs'])
+        self.assertNotEqual(third['ETag'], first['ETag'])  # the version moved on
+
+    def test_evaluation_writes_change_evaluation_and_job_list_etags(self):
+        resume = Resume.objects.create(user=self.owner, file_name='cv.pdf', file_size=8)
+        stats = self.client.get('/api/evaluations/stats/')
+        jobs = self.client.get('/api/jobs/')
+
+        evaluation = Evaluation.objects.create(resume=resume, job_description=self.job, overall_score=90)
+        response = self.client.get('/api/evaluations/stats/', HTTP_IF_NONE_MATCH=stats['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_evaluations'], stats.data['total_evaluations'] + 1)
+        self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=jobs['ETag']).status_code, 200)
+
+        stats = response
+        evaluation.delete()
+        response = self.client.get('/api/evaluations/stats/', HTTP_IF_NONE_MATCH=stats['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_evaluations'], 0)
+
+    def test_bump_versions_without_signals(self):
+        first = self.client.get('/api/jobs/stats/')
+        JobDescription.objects.filter(pk=self.job.pk).update(priority='high')
+        # update() sends no signal; the caller bumps the group itself
+        self.assertEqual(self.client.get('/api/jobs/stats/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        bump_versions('jobs')
+        self.assertEqual(self.client.get('/api/jobs/stats/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+
+class ReparseCommandTests(TestCase):
+    text = 'Priya Sharma\n\nExperience\nBackend developer at Acme\n'
+
+    def setUp(self):
+        user = User.objects.create(username='student')
+        self.long_ago = timezone.now() - timezone.timedelta(days=30)
+        current = parse_resume_content(self.text)
+        self.outdated = Resume.objects.create(user=user, file_name='old.pdf', file_size=8, raw_text=self.text,
+                                              parser_version=PARSER_VERSION - 1)
+        self.current = Resume.objects.create(user=user, file_name='new.pdf', file_size=8, raw_text=self.text,
+                                             parser_version=PARSER_VERSION,
+                                             **{field: current[field] for field in current})
+        Resume.objects.update(updated_at=self.long_ago)
+
+    def reparse(self, *args):
+        out = io.StringIO()
+        call_command('reparse', '--model', 'resumes', *args, stdout=out)
+        return out.getvalue()
+
+    def test_outdated_rows_are_parsed_again_and_marked_updated(self):
+        self.assertIn('reparsed 1 rows, 1 changed', self.reparse('--outdated'))
+
+        self.outdated.refresh_from_db()
+        self.assertEqual(self.outdated.parser_version, PARSER_VERSION)
+        self.assertEqual(self.outdated.experience, [{'description': 'Backend developer at Acme'}])
+        self.assertGreater(self.outdated.updated_at, self.long_ago)
+        self.current.refresh_from_db()
+        self.assertEqual(self.current.updated_at, self.long_ago)
+
+    def test_unchanged_rows_are_not_written(self):
+        self.assertIn('reparsed 2 rows, 1 changed', self.reparse('--chunk-size', '1'))
+        self.current.refresh_from_db()
+        self.assertEqual(self.current.updated_at, self.long_ago)
+
+    def test_dry_run_writes_nothing(self):
+        self.assertIn('1 changed (dry run)', self.reparse('--outdated', '--dry-run'))
+        self.outdated.refresh_from_db()
+        self.assertEqual(self.outdated.parser_version, PARSER_VERSION - 1)
+        self.assertEqual(self.outdated.updated_at, self.long_ago)
@@ -0,0 +1,95 @@
+# utils/versioning.py
+"""
+Version stamps and conditional GETs for read-mostly endpoints
+
+Each resource group ('jobs', 'resumes', 'evaluations') has a counter in
+``ResourceVersion`` that is bumped in the same transaction as any write to
+its model. A read endpoint's ETag is a hash of the counters it depends
+on, the requesting user and the full URL, so:
+
+- a request whose ``If-None-Match`` matches gets ``304 Not Modified`` after
+  a single primary-key lookup, without running the endpoint's queries;
+- otherwise the response body is looked up in the cache under that ETag
+  and only built from the database on a miss.
+
+Writes made with ``QuerySet.update()`` / ``bulk_create()`` skip model
+signals and must call ``bump_versions`` themselves.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from utils.models import ResourceVersion
+
+# Model -> resource group whose version its writes bump
+VERSIONED_MODELS = {
+    'jobs.JobDescription': 'jobs',
+    'resumes.Resume': 'resumes',
+    'evaluations.Evaluation': 'evaluations',
+}
+
+
+def bump_versions(*names):
+    with transaction.atomic():
+        for name in names:
+            if not ResourceVersion.objects.filter(name=name).update(version=F('version') + 1):
+                version, created = ResourceVersion.objects.get_or_create(name=name, defaults={'version': 1})
+                if not created:
+                    ResourceVersion.objects.filter(name=name).update(version=F('version') + 1)
+
+
+def bump_model_version(model):
+    """Bump the group of a model written with ``update()`` / ``bulk_create()``"""
+    name = VERSIONED_MODELS.get(model._meta.label)
+    if name:
+        bump_versions(name)
+
+
+def bump_on_write(sender, instance, **kwargs):
+    """post_save / post_delete receiver for the models in VERSIONED_MODELS"""
+    bump_model_version(sender)
+
+
+def current_versions(names):
+    versions = dict(ResourceVersion.objects.filter(name__in=names).values_list('name', 'version'))
+    return [versions.get(name, 0) for name in names]
+
+
+def versioned_etag(request, names):
+    user = request.user
+    parts = [
+        request.build_absolute_uri(),
+        request.META.get('HTTP_ACCEPT', ''),
+        f'{user.pk}:{getattr(user, "role", "")}',
+        *(f'{name}={version}' for name, version in zip(names, current_versions(names))),
+    ]
+    return '"%s"' % hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def versioned_response(request, names, build):
+    """Response for a read that only changes when the ``names`` resources are written
+
+    ``build()`` returns the response data; it is called only when the
+    client's copy is stale and the body is not already cached.
+    """
+    etag = versioned_etag(request, names)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+    # Proxies that compress responses may hand the ETag back weakened (W/"...")
+    client_etags = [tag.removeprefix('W/') for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))]
+    if etag in client_etags or '*' in client_etags:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = f'versioned-response:{etag.strip(chr(34))}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, getattr(settings, 'VERSIONED_RESPONSE_CACHE_SECONDS', 300))
+    return Response(data, headers=headers)
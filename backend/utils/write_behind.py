@@ -0,0 +1,244 @@
+# utils/write_behind.py
+"""
+Write-behind file storage
+
+Uploads are written to local disk and the row is committed straight away;
+the copy to the remote backend (Cloudinary, Google Cloud Storage or a local
+stand-in) happens on a background thread after the transaction commits,
+with retries. Models using this keep four fields: ``local_path``,
+``remote_name``, ``remote_url`` and ``storage_status``, plus ``content_hash``
+and a ``blob`` foreign key for the shared copy in ``utils.blob_store``.
+"""
+
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import connection, transaction
+
+from utils.disk_cache import key_for_name, originals_cache
+from utils.versioning import bump_model_version
+
+logger = logging.getLogger(__name__)
+
+STORAGE_STATUS_CHOICES = [
+    ('pending', 'Pending'),      # only on local disk, copy queued
+    ('uploaded', 'Uploaded'),    # copy confirmed on the remote backend
+    ('failed', 'Failed'),        # retries exhausted, local copy kept
+]
+
+_copy_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'WRITE_BEHIND_WORKERS', 2),
+    thread_name_prefix='write-behind'
+)
+
+CACHE_COPY_CHUNK_SIZE = 64 * 1024
+
+_local_storage = None
+
+
+def local_storage():
+    """Storage holding files until their remote copy is confirmed"""
+    global _local_storage
+    if _local_storage is None:
+        _local_storage = FileSystemStorage(location=settings.WRITE_BEHIND_ROOT)
+    return _local_storage
+
+
+class StorageBackend:
+    """Remote backend backed by a Django storage (Cloudinary, or a local stand-in in tests)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def save(self, name, content):
+        stored_name = self.storage.save(name, content)
+        return stored_name, self.storage.url(stored_name)
+
+    def copy_to(self, name, destination):
+        with self.storage.open(name, 'rb') as source:
+            shutil.copyfileobj(source, destination, CACHE_COPY_CHUNK_SIZE)
+
+    def delete(self, name):
+        self.storage.delete(name)
+
+    def signed_url(self, name, expires_in):
+        # Cloudinary and filesystem URLs do not expire; storages that sign
+        # their URLs (e.g. S3 with query-string auth) do so in url()
+        return self.storage.url(name)
+
+
+class GCSBackend:
+    """Remote backend using utils.gcs_storage"""
+
+    def save(self, name, content):
+        from utils.gcs_storage import gcs_storage
+
+        result = gcs_storage.upload_file(content, name, object_name=name)
+        if not result:
+            raise IOError(f'Upload of {name} to Google Cloud Storage failed')
+        return result['filename'], result['url']
+
+    def copy_to(self, name, destination):
+        from utils.gcs_storage import gcs_storage
+
+        gcs_storage.download_to_file(name, destination)
+
+    def delete(self, name):
+        from utils.gcs_storage import gcs_storage
+
+        if not gcs_storage.delete_file(name):
+            raise IOError(f'Deleting {name} from Google Cloud Storage failed')
+
+    def signed_url(self, name, expires_in):
+        from utils.gcs_storage import gcs_storage
+
+        return gcs_storage.get_file_url(name, expires_in)
+
+
+def remote_backend():
+    """Backend selected by ``settings.FILE_STORAGE_BACKEND``"""
+    return backend_named(getattr(settings, 'FILE_STORAGE_BACKEND', 'cloudinary'))
+
+
+def backend_named(backend):
+    if backend == 'cloudinary':
+        return StorageBackend(default_storage)
+    if backend == 'gcs':
+        return GCSBackend()
+    if backend == 'local':
+        return StorageBackend(FileSystemStorage(
+            location=settings.LOCAL_REMOTE_STORAGE_ROOT,
+            base_url=settings.LOCAL_REMOTE_STORAGE_URL
+        ))
+    raise ValueError(f'Unknown FILE_STORAGE_BACKEND: {backend}')
+
+
+def save_local(name, content):
+    """Write an upload to local disk and return its name in ``local_storage()``"""
+    return local_storage().save(name, content)
+
+
+def open_stored_file(obj, field_name='file'):
+    """Open a file from its local copy if it has one, otherwise from remote storage
+
+    Remote originals are fetched once into the local originals cache, so
+    reprocessing the same file again reads it from disk.
+    """
+    if obj.local_path and local_storage().exists(obj.local_path):
+        return local_storage().open(obj.local_path, 'rb')
+
+    field_file = getattr(obj, field_name)
+    name = field_file.name if field_file else obj.remote_name
+    if not name:
+        return field_file
+
+    def fetch(destination):
+        if field_file:
+            with field_file.open('rb') as source:
+                shutil.copyfileobj(source, destination, CACHE_COPY_CHUNK_SIZE)
+        else:
+            remote_backend().copy_to(obj.remote_name, destination)
+
+    key = obj.content_hash or key_for_name(name)
+    path = originals_cache().get_or_fetch(key, fetch)
+    return File(open(path, 'rb'), name=os.path.basename(name))
+
+
+def _on_default_storage(backend):
+    return isinstance(backend, StorageBackend) and backend.storage is default_storage
+
+
+def point_at_blob(model, pk, blob, field_name='file'):
+    """Point an object at a stored blob it holds a reference to"""
+    updates = {
+        'blob': blob,
+        'local_path': '',
+        'remote_name': blob.storage_name,
+        'remote_url': blob.url,
+        'storage_status': 'uploaded',
+    }
+    if _on_default_storage(backend_named(blob.backend)):
+        # The model's own FileField lives on the default storage
+        updates[field_name] = blob.storage_name
+    model.objects.filter(pk=pk).update(**updates)
+    bump_model_version(model)
+
+
+def copy_to_remote(model_label, pk, field_name='file'):
+    """Copy one object's local file to the remote backend, retrying transient failures
+
+    The copy goes through the blob store, so bytes that are already stored
+    remotely are not uploaded again. On success the object points at the
+    remote copy and the local file is removed. After the last retry the
+    object is marked ``failed`` and the local copy is kept for
+    ``manage.py retry_uploads``.
+    """
+    from utils.blob_store import acquire_blob
+
+    model = apps.get_model(model_label)
+    max_retries = getattr(settings, 'WRITE_BEHIND_MAX_RETRIES', 5)
+    backoff = getattr(settings, 'WRITE_BEHIND_RETRY_BACKOFF_SECONDS', 2)
+
+    try:
+        obj = model.objects.only('pk', 'local_path', 'storage_status', 'content_hash', 'blob').get(pk=pk)
+        if obj.storage_status == 'uploaded' or obj.blob_id or not obj.local_path:
+            return True
+
+        backend = remote_backend()
+
+        def upload(name):
+            for attempt in range(max_retries + 1):
+                try:
+                    with local_storage().open(obj.local_path, 'rb') as local_file:
+                        return backend.save(name, local_file)
+                except Exception as e:
+                    if attempt == max_retries:
+                        raise
+                    logger.warning(f"Copy of {model_label} {pk} failed (attempt {attempt + 1}), retrying: {str(e)}")
+                    time.sleep(backoff * 2 ** attempt)
+
+        try:
+            if obj.content_hash:
+                size = local_storage().size(obj.local_path)
+                blob, created = acquire_blob(obj.content_hash, obj.local_path, size, upload)
+            else:
+                remote_name, remote_url = upload(obj.local_path)
+        except Exception as e:
+            logger.error(f"Giving up copying {model_label} {pk} to remote storage: {str(e)}")
+            model.objects.filter(pk=pk).update(storage_status='failed')
+            bump_model_version(model)
+            return False
+
+        if obj.content_hash:
+            point_at_blob(model, pk, blob, field_name)
+        else:
+            updates = {
+                'local_path': '',
+                'remote_name': remote_name,
+                'remote_url': remote_url,
+                'storage_status': 'uploaded',
+            }
+            if _on_default_storage(backend):
+                updates[field_name] = remote_name
+            model.objects.filter(pk=pk).update(**updates)
+            bump_model_version(model)
+
+        local_storage().delete(obj.local_path)
+        return True
+    finally:
+        connection.close()
+
+
+def schedule_remote_copy(model, pk, field_name='file'):
+    """Queue the remote copy once the current transaction commits"""
+    model_label = model._meta.label
+    transaction.on_commit(
+        lambda: _copy_executor.submit(copy_to_remote, model_label, pk, field_name)
+    )
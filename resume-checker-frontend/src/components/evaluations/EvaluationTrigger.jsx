@@ -34,12 +34,12 @@ const EvaluationTrigger = ({ onEvaluationComplete }) => {
   const loadData = async () => {
     try {
       const [resumesData, jobsData] = await Promise.all([
-        resumeService.getResumes(),
-        jobService.getJobs()
+        resumeService.getResumes({ page_size: 200 }),
+        jobService.getJobs({ page_size: 200 })
       ]);
 
-      setResumes(Array.isArray(resumesData) ? resumesData : []);
-      setJobs(Array.isArray(jobsData) ? jobsData : []);
+      setResumes(resumesData.results || []);
+      setJobs(jobsData.results || []);
     } catch (err) {
       console.error('Error loading data:', err);
       setError('Failed to load data. Please try again.');
@@ -65,7 +65,16 @@ import { jobService } from '../../services/jobServices';
 import { evaluationService } from '../../services/evaluationServices';
 import { resumeService } from '../../services/resumeServices';
 
-const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) => {
+const JobList = ({
+  jobs,
+  loading,
+  error,
+  onRefresh,
+  hasMore = false,
+  loadingMore = false,
+  onLoadMore,
+  isStudentView = false
+}) => {
   const [page, setPage] = useState(0);
   const [rowsPerPage, setRowsPerPage] = useState(10);
   const [searchTerm, setSearchTerm] = useState('');
@@ -78,6 +87,7 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
   const [candidatesDialog, setCandidatesDialog] = useState(false);
   const [candidatesLoading, setCandidatesLoading] = useState(false);
   const [matchedCandidates, setMatchedCandidates] = useState(null);
+  const [candidatesLoadingMore, setCandidatesLoadingMore] = useState(false);
   
   // State for first round shortlisting
   const [shortlistCount, setShortlistCount] = useState('');
@@ -100,9 +110,9 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
   
   const loadStudentData = async () => {
     try {
-      // Load student's resumes
-      const resumeData = await resumeService.getResumes();
-      setResumes(Array.isArray(resumeData) ? resumeData : []);
+      // Load student's resumes (one page covers a student's own uploads)
+      const resumePage = await resumeService.getResumes({ page_size: 200 });
+      setResumes(resumePage.results || []);
       
       // Check application status for each job
       const statuses = {};
@@ -246,6 +256,23 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
     handleMenuClose();
   };
 
+  // Append the next page of candidates (highest scores come first)
+  const handleLoadMoreCandidates = async () => {
+    if (!matchedCandidates?.next) return;
+    setCandidatesLoadingMore(true);
+    try {
+      const data = await jobService.getMatchedCandidates(matchedCandidates.job.id, matchedCandidates.next);
+      setMatchedCandidates(prev => ({
+        ...data,
+        candidates: [...prev.candidates, ...data.candidates]
+      }));
+    } catch (error) {
+      console.error('Failed to load more candidates:', error);
+    } finally {
+      setCandidatesLoadingMore(false);
+    }
+  };
+
   const handleCloseCandidatesDialog = () => {
     setCandidatesDialog(false);
     setMatchedCandidates(null);
@@ -508,6 +535,14 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
               onPageChange={handleChangePage}
               onRowsPerPageChange={handleChangeRowsPerPage}
             />
+
+            {hasMore && (
+              <Box textAlign="center" mt={2}>
+                <Button variant="outlined" onClick={onLoadMore} disabled={loadingMore}>
+                  {loadingMore ? 'Loading...' : 'Load more jobs'}
+                </Button>
+              </Box>
+            )}
           </>
         )}
       </Box>
@@ -602,7 +637,7 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
                   <Card variant="outlined">
                     <CardContent sx={{ textAlign: 'center' }}>
                       <Typography variant="h3" color="success.main">
-                        {matchedCandidates.candidates?.filter(c => c.overall_score >= 70).length || 0}
+                        {matchedCandidates.score_stats?.high_match || 0}
                       </Typography>
                       <Typography variant="body2" color="text.secondary">
                         High Match (70%+)
@@ -622,10 +657,10 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
                     </Typography>
                     
                     {/* Alert when matched students are less than required */}
-                    {matchedCandidates.candidates.length < (matchedCandidates.job?.positions_required || 1) && (
+                    {matchedCandidates.total_candidates < (matchedCandidates.job?.positions_required || 1) && (
                       <Alert severity="warning" sx={{ mb: 2 }}>
                         <Typography variant="body2">
-                          <strong>Note:</strong> Only {matchedCandidates.candidates.length} matched candidate(s) available, 
+                          <strong>Note:</strong> Only {matchedCandidates.total_candidates} matched candidate(s) available, 
                           but {matchedCandidates.job?.positions_required || 1} position(s) required. 
                           All matched candidates will be shortlisted.
                         </Typography>
@@ -655,17 +690,17 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
                           value={shortlistCount}
                           onChange={(e) => {
                             // Auto-limit to available candidates
-                            const maxAvailable = matchedCandidates.candidates.length;
+                            const maxAvailable = matchedCandidates.total_candidates;
                             const value = parseInt(e.target.value) || 0;
                             setShortlistCount(value > maxAvailable ? maxAvailable.toString() : e.target.value);
                           }}
                           size="small"
-                          inputProps={{ min: 1, max: matchedCandidates.candidates.length }}
-                          placeholder={`Max: ${matchedCandidates.candidates.length}`}
+                          inputProps={{ min: 1, max: matchedCandidates.total_candidates }}
+                          placeholder={`Max: ${matchedCandidates.total_candidates}`}
                           helperText={
                             shortlistCount 
-                              ? `Top ${Math.min(parseInt(shortlistCount) || 0, matchedCandidates.candidates.length)} candidates will be shortlisted` 
-                              : `${matchedCandidates.candidates.length} candidates available`
+                              ? `Top ${Math.min(parseInt(shortlistCount) || 0, matchedCandidates.total_candidates)} candidates will be shortlisted` 
+                              : `${matchedCandidates.total_candidates} candidates available`
                           }
                         />
                       </Grid>
@@ -687,9 +722,9 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
                             variant="outlined"
                             color="secondary"
                             size="small"
-                            onClick={() => setShortlistCount(matchedCandidates.candidates.length.toString())}
+                            onClick={() => setShortlistCount(matchedCandidates.total_candidates.toString())}
                           >
-                            Select All ({matchedCandidates.candidates.length})
+                            Select All ({matchedCandidates.total_candidates})
                           </Button>
                         </Stack>
                       </Grid>
@@ -717,13 +752,13 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
                         <ListItemText
                           primary={
                             <Typography variant="subtitle1">
-                              {candidate.resume?.user_details?.username || 'Unknown Student'}
+                              {candidate.resume_details?.user_details?.username || 'Unknown Student'}
                             </Typography>
                           }
                           secondary={
                             <Box>
                               <Typography variant="body2" color="text.secondary">
-                                {candidate.resume?.file_name || 'Resume'}
+                                {candidate.resume_details?.file_name || 'Resume'}
                               </Typography>
                               <Typography variant="caption" color="text.secondary">
                                 Recommendation: {candidate.recommendation?.replace('_', ' ')}
@@ -735,6 +770,13 @@ const JobList = ({ jobs, loading, error, onRefresh, isStudentView = false }) =>
                       {index < matchedCandidates.candidates.length - 1 && <Divider />}
                     </React.Fragment>
                   ))}
+                  {matchedCandidates.next && (
+                    <Box textAlign="center" mt={1}>
+                      <Button variant="outlined" onClick={handleLoadMoreCandidates} disabled={candidatesLoadingMore}>
+                        {candidatesLoadingMore ? 'Loading...' : 'Load more candidates'}
+                      </Button>
+                    </Box>
+                  )}
                 </List>
               ) : (
                 <Box textAlign="center" py={4}>
@@ -1,5 +1,5 @@
 // src/components/resume/ResumeList.jsx
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import {
   Box,
   Card,
@@ -24,30 +24,34 @@ import {
 } from '@mui/icons-material';
 import { resumeService } from '../../services/resumeServices';
 import { toast } from 'react-toastify';
+import usePagedList from '../../utils/usePagedList';
 
 const ResumeList = ({ refreshTrigger }) => {
-  const [resumes, setResumes] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [deleteDialog, setDeleteDialog] = useState({ open: false, resume: null });
 
+  // One page of resumes at a time; "Load more" follows the next link
+  const fetchResumes = useCallback((pageUrl) => resumeService.getResumes({}, pageUrl), []);
+  const {
+    items: resumes,
+    setItems: setResumes,
+    hasMore,
+    loading,
+    loadingMore,
+    error,
+    reload: loadResumes,
+    loadMore
+  } = usePagedList(fetchResumes);
+
   useEffect(() => {
     loadResumes();
-  }, [refreshTrigger]);
+  }, [refreshTrigger, loadResumes]);
 
-  const loadResumes = async () => {
-    try {
-      setLoading(true);
-      const data = await resumeService.getResumes();
-      // Ensure data is an array
-      setResumes(Array.isArray(data) ? data : []);
-    } catch (error) {
+  useEffect(() => {
+    if (error) {
       console.error('Error loading resumes:', error);
       toast.error('Failed to load resumes');
-      setResumes([]); // Set empty array on error
-    } finally {
-      setLoading(false);
     }
-  };
+  }, [error]);
 
   const handleDelete = async (resume) => {
     setDeleteDialog({ open: false, resume: null });
@@ -222,6 +226,14 @@ const ResumeList = ({ refreshTrigger }) => {
         ))}
       </Grid>
 
+      {hasMore && (
+        <Box textAlign="center" mt={3}>
+          <Button variant="outlined" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more resumes'}
+          </Button>
+        </Box>
+      )}
+
       {/* Delete Confirmation Dialog */}
       <Dialog
         open={deleteDialog.open}
@@ -41,7 +41,8 @@ const Dashboard = () => {
     resumes: 0,
     jobs: 0,
     evaluations: 0,
-    averageScore: 0
+    averageScore: 0,
+    moreResumes: false
   });
   const [recentActivity, setRecentActivity] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -57,49 +58,43 @@ const Dashboard = () => {
 
       console.log('🔍 Loading dashboard data...');
 
-      // Load all data in parallel
-      const [resumesRes, jobsRes, evaluationsRes] = await Promise.all([
-        resumeService.getResumes().catch(err => {
+      // Load the newest page of each list for recent activity (asking only
+      // for the fields shown here) and the totals from the stats endpoints
+      const emptyPage = { results: [], next: null };
+      const [resumesRes, jobsRes, evaluationsRes, jobStats, evaluationStats] = await Promise.all([
+        resumeService.getResumes({ fields: 'id,file_name,created_at', page_size: 200 }).catch(err => {
           console.error('❌ Failed to load resumes:', err);
-          return { data: [] };
+          return emptyPage;
         }),
-        jobService.getJobs().catch(err => {
+        jobService.getJobs({ fields: 'id,title,company_name,created_at', page_size: 3 }).catch(err => {
           console.error('❌ Failed to load jobs:', err);
-          return { data: [] };
+          return emptyPage;
         }),
-        evaluationService.getEvaluations().catch(err => {
+        evaluationService.getEvaluations({ fields: 'id,overall_score,created_at', page_size: 3 }).catch(err => {
           console.error('❌ Failed to load evaluations:', err);
-          return { data: [] };
+          return emptyPage;
+        }),
+        jobService.getJobStats().catch(err => {
+          console.error('❌ Failed to load job stats:', err);
+          return {};
+        }),
+        evaluationService.getEvaluationStats().catch(err => {
+          console.error('❌ Failed to load evaluation stats:', err);
+          return {};
         })
       ]);
 
-      console.log('📊 API Responses:', {
-        resumes: resumesRes,
-        jobs: jobsRes,
-        evaluations: evaluationsRes
-      });
-
-      // Handle different response structures
-      const resumes = Array.isArray(resumesRes) ? resumesRes : (resumesRes.data || resumesRes.results || []);
-      const jobs = Array.isArray(jobsRes) ? jobsRes : (jobsRes.data || jobsRes.results || []);
-      const evaluations = Array.isArray(evaluationsRes) ? evaluationsRes : (evaluationsRes.data || evaluationsRes.results || []);
-
-      console.log('📈 Processed data:', {
-        resumes: resumes.length,
-        jobs: jobs.length,
-        evaluations: evaluations.length
-      });
-
-      // Calculate stats
-      const averageScore = evaluations.length > 0
-        ? Math.round(evaluations.reduce((sum, evaluation) => sum + (evaluation.overall_score || 0), 0) / evaluations.length)
-        : 0;
+      const resumes = resumesRes.results || [];
+      const jobs = jobsRes.results || [];
+      const evaluations = evaluationsRes.results || [];
 
       const newStats = {
+        // Resumes have no stats endpoint; a full first page is shown as "200+"
         resumes: resumes.length,
-        jobs: jobs.length,
-        evaluations: evaluations.length,
-        averageScore
+        moreResumes: Boolean(resumesRes.next),
+        jobs: jobStats.total_jobs || 0,
+        evaluations: evaluationStats.total_evaluations || 0,
+        averageScore: Math.round(evaluationStats.average_score || 0)
       };
 
       console.log('📊 New stats:', newStats);
@@ -228,7 +223,7 @@ const Dashboard = () => {
                 {stats.resumes > 0 ? (
                   <Box>
                     <Alert severity="success" icon={<CheckCircleIcon />} sx={{ mb: 2 }}>
-                      You have {stats.resumes} resume{stats.resumes > 1 ? 's' : ''} uploaded
+                      You have {stats.resumes}{stats.moreResumes ? '+' : ''} resume{stats.resumes > 1 ? 's' : ''} uploaded
                     </Alert>
                     <Button 
                       variant="contained" 
@@ -432,7 +427,7 @@ const Dashboard = () => {
         <Grid item xs={12} sm={6} md={3}>
           <StatCard
             title="Total Resumes"
-            value={stats.resumes}
+            value={`${stats.resumes}${stats.moreResumes ? '+' : ''}`}
             icon={<ResumeIcon sx={{ fontSize: 40 }} />}
             color="primary"
             onClick={() => navigate('/resumes')}
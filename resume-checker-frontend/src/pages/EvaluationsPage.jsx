@@ -1,5 +1,5 @@
 // src/pages/EvaluationsPage.jsx
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import {
   Box,
   Typography,
@@ -38,37 +38,45 @@ import {
 import EvaluationList from '../components/evaluations/EvaluationList';
 import { evaluationService } from '../services/evaluationServices';
 import { useAuth } from '../context/AuthContext';
+import usePagedList from '../utils/usePagedList';
 
 const EvaluationsPage = () => {
   const { user } = useAuth();
   const isStudent = user?.role === 'student';
   const isPlacementTeam = user?.role === 'placement_team' || user?.role === 'admin';
-  const [evaluations, setEvaluations] = useState([]);
+  const fetchEvaluations = useCallback((pageUrl) => evaluationService.getEvaluations({}, pageUrl), []);
+  const {
+    items: evaluations,
+    setItems: setEvaluations,
+    hasMore,
+    loading,
+    loadingMore,
+    error: loadError,
+    reload: loadEvaluations,
+    loadMore
+  } = usePagedList(fetchEvaluations);
+  const error = loadError
+    ? (loadError.response?.data?.error || 'Failed to load evaluations. Please try again.')
+    : null;
+  const [stats, setStats] = useState(null);
   const [applications, setApplications] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
   const [snackbar, setSnackbar] = useState({ open: false, message: '', severity: 'success' });
   const [showEvaluations, setShowEvaluations] = useState(false);
 
   useEffect(() => {
     loadEvaluations();
+    loadStats();
     if (isStudent) {
       loadApplications();
     }
-  }, [isStudent]);
+  }, [isStudent, loadEvaluations]);
 
-  const loadEvaluations = async () => {
+  // Totals come from the stats endpoint; only the list itself is paged
+  const loadStats = async () => {
     try {
-      setLoading(true);
-      setError(null);
-      const data = await evaluationService.getEvaluations();
-      setEvaluations(Array.isArray(data) ? data : []);
+      setStats(await evaluationService.getEvaluationStats());
     } catch (err) {
-      console.error('Error loading evaluations:', err);
-      setError(err.response?.data?.error || 'Failed to load evaluations. Please try again.');
-      setEvaluations([]); // Set empty array on error
-    } finally {
-      setLoading(false);
+      console.error('Error loading evaluation stats:', err);
     }
   };
 
@@ -83,6 +91,7 @@ const EvaluationsPage = () => {
 
   const handleEvaluationComplete = (newEvaluation) => {
     setEvaluations(prev => [newEvaluation, ...prev]);
+    loadStats();
     setSnackbar({
       open: true,
       message: 'Evaluation completed successfully!',
@@ -115,15 +124,14 @@ const EvaluationsPage = () => {
   };
 
   // Calculate statistics
+  const byRecommendation = stats?.by_recommendation || {};
   const statistics = {
-    total: evaluations?.length || 0,
-    averageScore: evaluations?.length > 0 
-      ? Math.round(evaluations.reduce((sum, evaluation) => sum + (evaluation.overall_score || 0), 0) / evaluations.length)
-      : 0,
-    highlyRecommended: evaluations?.filter(evaluation => evaluation.recommendation === 'highly_recommended').length || 0,
-    recommended: evaluations?.filter(evaluation => evaluation.recommendation === 'recommended').length || 0,
-    consider: evaluations?.filter(evaluation => evaluation.recommendation === 'consider').length || 0,
-    notRecommended: evaluations?.filter(evaluation => evaluation.recommendation === 'not_recommended').length || 0
+    total: stats?.total_evaluations || 0,
+    averageScore: Math.round(stats?.average_score || 0),
+    highlyRecommended: byRecommendation.highly_recommended || 0,
+    recommended: byRecommendation.recommended || 0,
+    consider: byRecommendation.consider || 0,
+    notRecommended: byRecommendation.not_recommended || 0
   };
 
   // Application statistics for students
@@ -338,6 +346,13 @@ const EvaluationsPage = () => {
               onRefresh={loadEvaluations}
               isStudentView={true}
             />
+            {hasMore && (
+              <Box display="flex" justifyContent="center" mt={2}>
+                <Button variant="outlined" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? 'Loading...' : 'Load more evaluations'}
+                </Button>
+              </Box>
+            )}
           </Paper>
         </>
       ) : (
@@ -382,7 +397,7 @@ const EvaluationsPage = () => {
           </Grid>
 
           {/* Recommendation Breakdown */}
-          {(evaluations?.length || 0) > 0 && (
+          {statistics.total > 0 && (
             <Paper elevation={2} sx={{ p: 3, mb: 4 }}>
               <Typography variant="h6" gutterBottom>
                 Recommendation Breakdown
@@ -447,7 +462,7 @@ const EvaluationsPage = () => {
           <Paper elevation={2} sx={{ p: 3 }}>
             <Box display="flex" justifyContent="space-between" alignItems="center" mb={2}>
               <Typography variant="h6">
-                All Evaluations ({evaluations?.length || 0})
+                All Evaluations ({statistics.total})
               </Typography>
               <Button
                 variant={showEvaluations ? "outlined" : "contained"}
@@ -472,6 +487,13 @@ const EvaluationsPage = () => {
                 error={error}
                 onRefresh={loadEvaluations}
               />
+              {hasMore && (
+                <Box display="flex" justifyContent="center" mt={2}>
+                  <Button variant="outlined" onClick={loadMore} disabled={loadingMore}>
+                    {loadingMore ? 'Loading...' : 'Load more evaluations'}
+                  </Button>
+                </Box>
+              )}
             </Collapse>
           </Paper>
         </>
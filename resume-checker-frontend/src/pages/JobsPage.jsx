@@ -1,5 +1,5 @@
 // src/pages/JobsPage.jsx
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import {
   Box,
   Typography,
@@ -12,34 +12,33 @@ import JobForm from '../components/jobs/JobForm';
 import JobList from '../components/jobs/JobList';
 import { jobService } from '../services/jobServices';
 import { useAuth } from '../context/AuthContext';
+import usePagedList from '../utils/usePagedList';
 
 const JobsPage = () => {
   const { user } = useAuth();
   const isStudent = user?.role === 'student';
   const [activeTab, setActiveTab] = useState(isStudent ? 0 : 0);
-  const [jobs, setJobs] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
   const [snackbar, setSnackbar] = useState({ open: false, message: '', severity: 'success' });
 
+  // One page of jobs at a time; "Load more" follows the next link
+  const fetchJobs = useCallback((pageUrl) => jobService.getJobs({}, pageUrl), []);
+  const {
+    items: jobs,
+    setItems: setJobs,
+    hasMore,
+    loading,
+    loadingMore,
+    error: loadError,
+    reload: loadJobs,
+    loadMore
+  } = usePagedList(fetchJobs);
+  const error = loadError
+    ? (loadError.response?.data?.error || 'Failed to load jobs. Please try again.')
+    : null;
+
   useEffect(() => {
     loadJobs();
-  }, []);
-
-  const loadJobs = async () => {
-    try {
-      setLoading(true);
-      setError(null);
-      const data = await jobService.getJobs();
-      setJobs(Array.isArray(data) ? data : []);
-    } catch (err) {
-      console.error('Error loading jobs:', err);
-      setError(err.response?.data?.error || 'Failed to load jobs. Please try again.');
-      setJobs([]); // Set empty array on error
-    } finally {
-      setLoading(false);
-    }
-  };
+  }, [loadJobs]);
 
   const handleTabChange = (event, newValue) => {
     setActiveTab(newValue);
@@ -101,6 +100,9 @@ const JobsPage = () => {
             loading={loading}
             error={error}
             onRefresh={loadJobs}
+            hasMore={hasMore}
+            loadingMore={loadingMore}
+            onLoadMore={loadMore}
             isStudentView={true}
           />
         </Box>
@@ -114,7 +116,7 @@ const JobsPage = () => {
               aria-label="job management tabs"
             >
               <Tab label="Create Job" {...a11yProps(0)} />
-              <Tab label={`All Jobs (${jobs?.length || 0})`} {...a11yProps(1)} />
+              <Tab label={`All Jobs (${jobs?.length || 0}${hasMore ? '+' : ''})`} {...a11yProps(1)} />
             </Tabs>
           </Box>
 
@@ -128,6 +130,9 @@ const JobsPage = () => {
               loading={loading}
               error={error}
               onRefresh={loadJobs}
+              hasMore={hasMore}
+              loadingMore={loadingMore}
+              onLoadMore={loadMore}
             />
           </TabPanel>
         </>
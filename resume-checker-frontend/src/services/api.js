@@ -37,4 +37,13 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints are cursor-paginated ({ next, previous, results }).
+// Fetches a single page: `url` is the endpoint, or a `next` / `previous`
+// link from an earlier page (which already carries the query string).
+export const fetchPage = async (url, { params } = {}) => {
+  const isLink = /^https?:\/\//.test(url);
+  const response = await api.get(url, isLink ? {} : { params });
+  return response.data;
+};
+
 export default api;
\ No newline at end of file
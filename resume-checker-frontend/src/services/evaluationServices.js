@@ -1,5 +1,5 @@
 // src/services/evaluationServices.js
-import api from './api';
+import api, { fetchPage } from './api';
 
 export const evaluationService = {
   evaluateResume: async (resumeId, jobId) => {
@@ -10,8 +10,13 @@ export const evaluationService = {
     return response.data;
   },
 
-  getEvaluations: async (filters = {}) => {
-    const response = await api.get('/evaluations/', { params: filters });
+  // One page ({ results, next, previous }); pass `pageUrl` to follow a next/previous link
+  getEvaluations: async (filters = {}, pageUrl = null) => {
+    return fetchPage(pageUrl || '/evaluations/', { params: filters });
+  },
+
+  getEvaluationStats: async () => {
+    const response = await api.get('/evaluations/stats/');
     return response.data;
   },
 
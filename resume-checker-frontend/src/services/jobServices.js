@@ -1,5 +1,5 @@
 // src/services/jobServices.js
-import api from './api';
+import api, { fetchPage } from './api';
 
 export const jobService = {
   createJob: async (jobData) => {
@@ -16,8 +16,13 @@ export const jobService = {
     return response.data;
   },
 
-  getJobs: async () => {
-    const response = await api.get('/jobs/');
+  // One page ({ results, next, previous }); pass `pageUrl` to follow a next/previous link
+  getJobs: async (params = {}, pageUrl = null) => {
+    return fetchPage(pageUrl || '/jobs/', { params });
+  },
+
+  getJobStats: async () => {
+    const response = await api.get('/jobs/stats/');
     return response.data;
   },
 
@@ -26,14 +31,13 @@ export const jobService = {
     return response.data;
   },
 
-  getMatchedCandidates: async (jobId) => {
-    const response = await api.get(`/jobs/${jobId}/candidates/`);
-    return response.data;
+  // One page of candidates, with the job and its stats; `pageUrl` follows a next/previous link
+  getMatchedCandidates: async (jobId, pageUrl = null) => {
+    return fetchPage(pageUrl || `/jobs/${jobId}/candidates/`);
   },
 
-  getAppliedResumes: async (jobId) => {
-    const response = await api.get(`/jobs/${jobId}/applied/`);
-    return response.data;
+  getAppliedResumes: async (jobId, pageUrl = null) => {
+    return fetchPage(pageUrl || `/jobs/${jobId}/applied/`);
   },
 
   exportCandidatesExcel: async (jobId, type = 'all', minScore = 0, limit = null, roundName = null) => {
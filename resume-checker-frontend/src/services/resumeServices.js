@@ -1,5 +1,5 @@
 // src/services/resumeServices.js
-import api from './api';
+import api, { fetchPage } from './api';
 
 export const resumeService = {
   uploadResume: async (file) => {
@@ -14,9 +14,9 @@ export const resumeService = {
     return response.data;
   },
 
-  getResumes: async () => {
-    const response = await api.get('/resumes/');
-    return response.data;
+  // One page ({ results, next, previous }); pass `pageUrl` to follow a next/previous link
+  getResumes: async (params = {}, pageUrl = null) => {
+    return fetchPage(pageUrl || '/resumes/', { params });
   },
 
   getResumeById: async (id) => {
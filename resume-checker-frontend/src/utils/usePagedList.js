@@ -0,0 +1,56 @@
+// src/utils/usePagedList.js
+import { useCallback, useState } from 'react';
+
+// Loads a cursor-paginated list one page at a time. `fetchPage(pageUrl)`
+// resolves to { results, next }; it is called with null for the first page
+// and with the `next` link to append the following one.
+const usePagedList = (fetchPage) => {
+  const [items, setItems] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [error, setError] = useState(null);
+
+  const reload = useCallback(async () => {
+    try {
+      setLoading(true);
+      setError(null);
+      const page = await fetchPage(null);
+      setItems(page.results || []);
+      setNext(page.next || null);
+    } catch (err) {
+      setError(err);
+      setItems([]);
+      setNext(null);
+    } finally {
+      setLoading(false);
+    }
+  }, [fetchPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!next) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchPage(next);
+      setItems(prev => [...prev, ...(page.results || [])]);
+      setNext(page.next || null);
+    } catch (err) {
+      setError(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [fetchPage, next]);
+
+  return {
+    items,
+    setItems,
+    hasMore: Boolean(next),
+    loading,
+    loadingMore,
+    error,
+    reload,
+    loadMore
+  };
+};
+
+export default usePagedList;